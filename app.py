@@ -1,20 +1,166 @@
-from flask import Flask, render_template, request, redirect, url_for, session, abort
-from flask_migrate import Migrate
-from models import db, GameInfo, Playground, Player, Drawing, MatchDetail
-from logic.loader import load_logic
+from flask import (
+    Blueprint, Flask, current_app, render_template, request, redirect, url_for, session, abort, g, jsonify, Response,
+    stream_with_context,
+)
+from flask.logging import default_handler
+import click
+import csv
+import hmac
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.exc import IntegrityError
+from models import (
+    db, GameInfo, Playground, Player,
+    event_pk, generate_game_id, generate_match_id, resolve_event_pk,
+)
+from assets import DIST_DIR, load_manifest
+from dbconfig import database_url, init_db, sqlite_pragmas
+from matches import finish_match, lock_match
+from player_stats import load_player_stats
+from ratings import event_ratings, find_people, link_people, rating_as_of, rebuild_ratings, season_of, season_top
+from scoring import VersionConflict, add_point, match_score, set_score, undo
+from eventstore import MemoryBackend, SQLBackend, create_event_store, new_event_state
+from export import DATASETS, FORMATS, MIMETYPES, parse_when, stream_export
+import importer
+import metrics
+from livefeed import Publisher, create_bus
+from pagecache import PageCache, bump_event_version, event_version, page_etag, render_token
+from standings import court_time_by_event, ranked_standings, rebuild_standings
+from logic.loader import accepts_pairer, courts_in_play, load_logic, registry as logic_registry
+from logic.schedule import SCHEDULE_FORMATS, get_schedule
+from logic.simulate import METRICS, PAIRINGS, WIN_MODELS, aggregate, simulate_events
+from logic.state import SchedulerState
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-import uuid
 
 # -------------------- Config --------------------
-app = Flask(__name__)
-app.secret_key = "dev"
+# Routes, hooks and CLI commands; create_app() registers them on each app
+bp = Blueprint("main", __name__, cli_group=None)
+
+# Score, game and leaderboard updates pushed to /live/<game_id> streams
+live_feed = Publisher()
+
+# Rendered read views keyed by the event's data version (see pagecache.py)
+page_cache = PageCache(int(os.environ.get("MATCHMAKER_PAGE_CACHE_SIZE", 256)))
+
+metrics.registry.callback("matchmaker_page_cache_hits_total", "counter", "Page cache hits.", lambda: page_cache.hits)
+metrics.registry.callback("matchmaker_page_cache_misses_total", "counter", "Page cache misses.", lambda: page_cache.misses)
+metrics.registry.callback("matchmaker_page_cache_pages", "gauge", "Pages in the page cache.", lambda: len(page_cache))
+metrics.registry.callback("matchmaker_live_subscribers", "gauge", "Open /live streams.", live_feed.subscriber_count)
+
+# Form and JSON ``action`` values that get their own label in the request metrics
+METRIC_ACTIONS = {"next", "redraw", "end", "revise", "increment", "undo", "set"}
+
+
+def create_app(config=None):
+    """Build the app; ``config`` overrides the settings read from the environment."""
+    app = Flask(__name__)
+    app.secret_key = "dev"
+
+    # Database: MATCHMAKER_DATABASE_URL (SQLite or PostgreSQL), pool/timeouts from MATCHMAKER_DB_*
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url()
+    app.config["SQLITE_PRAGMAS"] = sqlite_pragmas()
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["LOGIC_LOG_LEVEL"] = os.environ.get("MATCHMAKER_LOGIC_LOG_LEVEL", "WARNING")
+    # Live event state: sql (the app database), redis://host:port/db, or memory[://?size=N]
+    # for a single worker only
+    app.config["EVENT_STORE_URL"] = os.environ.get("MATCHMAKER_EVENT_STORE", "sql")
+    app.config["EVENT_STORE_TTL"] = int(os.environ.get("MATCHMAKER_EVENT_STORE_TTL", 3 * 24 * 3600))
+    # /live updates: "local" reaches this process's streams only; redis://host:port/db reaches
+    # every worker's. Unset: the event store's Redis when it uses one, else local
+    app.config["LIVE_FEED_URL"] = os.environ.get("MATCHMAKER_LIVE_FEED", "")
+    # Draws: "random" splits as the logic always has; "balanced" seats by rating (needs NumPy)
+    app.config["PAIRING_MODE"] = os.environ.get("MATCHMAKER_PAIRING", "random")
+    app.config["PAIRING_BUDGET_MS"] = float(os.environ.get("MATCHMAKER_PAIRING_BUDGET_MS", 20))
+    # Bearer token for /export/...; the endpoints are off while it is unset (`flask export` always works)
+    app.config["EXPORT_TOKEN"] = os.environ.get("MATCHMAKER_EXPORT_TOKEN", "")
+    # Bearer token for POST /import/matches, off while unset (`flask import` always works)
+    app.config["IMPORT_TOKEN"] = os.environ.get("MATCHMAKER_IMPORT_TOKEN", "")
+    # Bearer token for /metrics; open while unset
+    app.config["METRICS_TOKEN"] = os.environ.get("MATCHMAKER_METRICS_TOKEN", "")
+    # Static assets: serve the `flask build-assets` output when it exists
+    app.config["BUNDLED_ASSETS"] = os.environ.get("MATCHMAKER_BUNDLED_ASSETS", "1") != "0"
+    # Compiled templates, written by `flask build-assets` and reused by every worker
+    app.config["JINJA_CACHE_DIR"] = os.environ.get(
+        "MATCHMAKER_JINJA_CACHE_DIR", os.path.join(app.instance_path, "jinja-cache")
+    )
+    app.config.update(config or {})
+
+    init_jinja_cache(app)
+    app.config["ASSET_MANIFEST"] = load_manifest(app.static_folder) if app.config["BUNDLED_ASSETS"] else {}
+    app.config["RENDER_TOKEN"] = render_token(
+        os.path.join(app.root_path, app.template_folder), app.config["ASSET_MANIFEST"]
+    )
+    app.jinja_env.globals["assets_bundled"] = bool(app.config["ASSET_MANIFEST"])
+
+    init_db(app)
+    with app.app_context():
+        metrics.instrument_engine(db.engine)
+    # Alembic is only needed by `flask db ...`; servers skip importing it
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+
+        Migrate(app, db, render_as_batch=True)
+
+    # Discover game logic once per worker instead of on every draw
+    logic_logger = logging.getLogger("logic")
+    logic_logger.setLevel(app.config["LOGIC_LOG_LEVEL"].upper())
+    if default_handler not in logic_logger.handlers:
+        logic_logger.addHandler(default_handler)
+    if not logic_registry.discovered:
+        logic_registry.discover()
+
+    # The session cookie only carries current_game_id; games live server-side
+    app.extensions["event_store"] = create_event_store(
+        app.config["EVENT_STORE_URL"],
+        get_engine=lambda: db.engine,
+        ttl=app.config["EVENT_STORE_TTL"],
+    )
+    if isinstance(app.extensions["event_store"].backend, MemoryBackend):
+        app.logger.warning(
+            "Event state is kept in process memory: other workers will not see it "
+            "and a restart loses every live event"
+        )
+
+    feed_url = app.config["LIVE_FEED_URL"]
+    if not feed_url:
+        store_url = app.config["EVENT_STORE_URL"] or ""
+        feed_url = store_url if store_url.startswith("redis://") else "local"
+    live_feed.use(create_bus(feed_url, ttl=app.config["EVENT_STORE_TTL"]))
+    # Outside the CLI and `flask run`, a WSGI/ASGI server may run several workers
+    if live_feed.bus is None and not app.testing and click.get_current_context(silent=True) is None:
+        app.logger.warning(
+            "Live updates fan out within this process: with more than one worker, a /live "
+            "stream misses scores posted to the others. Run one worker or set "
+            "MATCHMAKER_LIVE_FEED=redis://host:port/db"
+        )
 
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///matchmaker.db"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.register_blueprint(bp)
+    return app
+
+
+def init_jinja_cache(app):
+    """Load compiled templates from JINJA_CACHE_DIR instead of compiling them per worker."""
+    cache_dir = app.config["JINJA_CACHE_DIR"]
+    if not cache_dir:
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return  # read-only deploy without a prebuilt cache: compile in memory as before
+    app.jinja_options = {**app.jinja_options, "bytecode_cache": FileSystemBytecodeCache(cache_dir)}
+
+
+def precompile_templates(app):
+    """Compile every template into the bytecode cache; returns how many."""
+    names = app.jinja_env.list_templates(extensions=["html"])
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
 
-db.init_app(app)
-migrate = Migrate(app, db)
 
 # Always use Jakarta timezone (GMT+7)
 TZ = ZoneInfo("Asia/Jakarta")
@@ -30,8 +176,16 @@ def to_jakarta_naive(dt: datetime) -> datetime:
     return dt
 
 
+class ResultAlreadySaved(Exception):
+    """Another request (a second tab, a double submit) finished the match first."""
+
+
 def finalize_game_result(game_id: str, active_game: dict):
-    """Persist the active game's pending result and clear session state."""
+    """Persist the active game's pending result and clear session state.
+
+    Raises ResultAlreadySaved, changing nothing, when the match was
+    already finished.
+    """
     if not active_game or not active_game.get("result_pending"):
         return False, "End the current game before wrapping up."
 
@@ -40,7 +194,7 @@ def finalize_game_result(game_id: str, active_game: dict):
     if result.get("winner") == "T":
         return False, "Resolve the tie before wrapping up."
 
-    match_id = active_game.get("match_id") or uuid.uuid4().hex
+    match_id = active_game.get("match_id") or generate_match_id()
     active_game["match_id"] = match_id
 
     start_iso = active_game.get("start_time")
@@ -57,172 +211,49 @@ def finalize_game_result(game_id: str, active_game: dict):
     start_dt = to_jakarta_naive(datetime.fromisoformat(start_iso))
     end_dt = to_jakarta_naive(datetime.fromisoformat(end_iso))
 
-    players_db = Player.query.filter_by(game_id=game_id).order_by(Player.player_code).all()
-    players_map = {player.player_name: player for player in players_db}
-
     elapsed_total = int(active_game.get("elapsed_seconds", 0) or 0)
-    duration_delta = timedelta(seconds=elapsed_total)
-    duration_str = str(duration_delta).split(".")[0]
-
-    for side_index, team in enumerate(active_game.get("teams", []), start=1):
-        team_side = "A" if side_index == 1 else "B"
-        score = result["scoreA"] if team_side == "A" else result["scoreB"]
-        if result["winner"] == "T":
-            flag = "T"
-        else:
-            flag = "W" if team_side == result["winner"] else "L"
-
-        for player_name in team:
-            player_obj = players_map.get(player_name)
-            player_id = player_obj.player_id if player_obj else uuid.uuid4().hex[:10]
-            detail = MatchDetail(
-                match_id=match_id,
-                player_id=player_id,
-                team_side=team_side,
-                team_side_score=score,
-                winner_flag=flag,
-                match_start_at=start_dt,
-                match_end_at=end_dt,
-                match_duration=duration_str,
-            )
-            db.session.add(detail)
 
+    logged = match_score(match_id)
+    if logged["version"]:
+        result["scoreA"] = logged["scoreA"]
+        result["scoreB"] = logged["scoreB"]
+
+    if not finish_match(game_id, active_game, result, start_dt, end_dt, elapsed_total):
+        db.session.rollback()
+        raise ResultAlreadySaved("This game's result was already saved.")
     db.session.commit()
 
-    locked_games = session.get("games") or []
+    state = _scheduler_states.get(game_id)
+    if state:
+        state.record_result(match_id, result["winner"])
+
+    event = current_event()
+    locked_games = event["games"]
     for idx, stored in enumerate(locked_games):
         if stored.get("match_id") == match_id:
             locked_games[idx] = active_game
             break
     else:
         locked_games.append(active_game)
-    session["games"] = locked_games
 
     active_game["status"] = "completed"
     active_game["completed_at"] = end_iso
     active_game.pop("result_pending", None)
 
-    session["active_game"] = None
-    session["pending_game"] = None
-    session.modified = True
+    event["active_game"] = None
+    event["pending_game"] = None
+    save_event()
 
+    publish_game(game_id, active_game)
+    publish_leaderboard(game_id)
     return True, None
 
 
 
-def compute_leaderboard_data(game_id):
-    players = Player.query.filter_by(game_id=game_id).order_by(Player.player_code).all()
-    player_map = {
-        player.player_id: {
-            "name": player.player_name,
-            "code": player.player_code,
-        }
-        for player in players
-    }
-
-    stats = {
-        player_id: {
-            "player_id": player_id,
-            "player_code": data["code"],
-            "player_name": data["name"],
-            "games": 0,
-            "wins": 0,
-            "losses": 0,
-            "ties": 0,
-            "points": 0,
-            "point_diff": 0,
-        }
-        for player_id, data in player_map.items()
-    }
-
-    details = (
-        db.session.query(
-            MatchDetail.match_id,
-            MatchDetail.player_id,
-            MatchDetail.team_side,
-            MatchDetail.team_side_score,
-            MatchDetail.winner_flag,
-        )
-        .join(
-            Drawing,
-            (MatchDetail.match_id == Drawing.match_id)
-            & (MatchDetail.player_id == Drawing.player_id),
-        )
-        .filter(Drawing.game_id == game_id)
-        .all()
-    )
-
-    match_scores = {}
-    for detail in details:
-        match_scores.setdefault(detail.match_id, {})[detail.team_side] = detail.team_side_score or 0
-
-    for detail in details:
-        player_id = detail.player_id
-        player_stats = stats.setdefault(
-            player_id,
-            {
-                "player_id": player_id,
-                "player_code": player_id,
-                "player_name": player_map.get(player_id, {}).get("name", "Unknown"),
-                "games": 0,
-                "wins": 0,
-                "losses": 0,
-                "ties": 0,
-                "points": 0,
-                "point_diff": 0,
-            },
-        )
-
-        player_stats["games"] += 1
-        flag = (detail.winner_flag or "").upper()
-        if flag == "W":
-            player_stats["wins"] += 1
-        elif flag == "L":
-            player_stats["losses"] += 1
-        elif flag == "T":
-            player_stats["ties"] += 1
-
-        score = detail.team_side_score or 0
-        player_stats["points"] += score
-
-        opponent_side = "B" if detail.team_side == "A" else "A"
-        opponent_score = match_scores.get(detail.match_id, {}).get(opponent_side, 0)
-        player_stats["point_diff"] += score - opponent_score
-
-    leaderboard_rows = sorted(
-        stats.values(),
-        key=lambda s: (s["points"], s["point_diff"], s["wins"]),
-        reverse=True,
-    )
-
-    for idx, row in enumerate(leaderboard_rows, start=1):
-        row["rank"] = idx
-
-    return player_map, stats, leaderboard_rows, details
-
-
-def parse_duration_to_seconds(value: str) -> int:
-    if not value:
-        return 0
-
-    value = value.strip()
-    days = 0
-    if 'day' in value:
-        day_part, time_part = value.split(', ')
-        days = int(day_part.split()[0])
-        value = time_part
-
-    parts = value.split(':')
-    try:
-        parts = [int(p) for p in parts]
-    except ValueError:
-        return 0
-
-    while len(parts) < 3:
-        parts.insert(0, 0)
-
-    hours, minutes, seconds = parts[-3:]
-    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+def format_duration_clock(total_seconds: int) -> str:
+    if total_seconds is None:
+        return '--:--:--'
+    return str(timedelta(seconds=total_seconds))
 
 
 def format_duration_verbose(total_seconds: int) -> str:
@@ -244,27 +275,113 @@ def format_duration_verbose(total_seconds: int) -> str:
 
 
 # -------------------- Helpers --------------------
+def current_event():
+    """Live state of the current event, loaded from the event store once per request."""
+    if "event" not in g:
+        g.event = current_app.extensions["event_store"].load(session.get("current_game_id"))
+    return g.event
+
+
+def save_event():
+    """Write the current event's live state back to the event store."""
+    game_id = session.get("current_game_id")
+    if game_id and "event" in g:
+        size = current_app.extensions["event_store"].save(game_id, g.event)
+        metrics.EVENT_STATE_BYTES.observe(size)
+
+
+def publish_game(game_id, game):
+    live_feed.publish(game_id, "game", {
+        "match_id": game.get("match_id"),
+        "game_no": game.get("game_no"),
+        "court_no": game.get("court_no") or "A",
+        "teams": game.get("teams") or [],
+        "status": game.get("status") or "active",
+    })
+
+
+def publish_leaderboard(game_id):
+    """Push the ranked standings once, instead of each screen re-querying them."""
+    live_feed.publish(game_id, "leaderboard", {"rows": ranked_standings(game_id)})
+
+
+def cached_page(key, render=None):
+    """304 when the client already has the page cached under ``key``, else that page.
+
+    ``key`` is (view, game_id, data version, ...). On a cache miss the page
+    comes from ``render()``; without ``render`` a miss returns None.
+    """
+    etag = page_etag(key, current_app.config["RENDER_TOKEN"])
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        page = page_cache.get(key) if render is None else page_cache.get_or_render(key, render)
+        if page is None:
+            return None
+        response = Response(page, mimetype="text/html")
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+@bp.app_url_defaults
+def bundled_static_url(endpoint, values):
+    """url_for('static', filename=...) resolves to the built, content-hashed file."""
+    manifest = current_app.config["ASSET_MANIFEST"]
+    if endpoint == "static" and values.get("filename") in manifest:
+        values["filename"] = manifest[values["filename"]]
+
+
+@bp.after_app_request
+def cache_built_assets(response):
+    """Built files are named by their content, so browsers may keep them for good."""
+    if request.endpoint == "static" and request.view_args["filename"].startswith(DIST_DIR + "/"):
+        max_age = 365 * 24 * 3600
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+        response.expires = int(time.time() + max_age)
+    return response
+
+
+# Per-event scheduler state of the most recently drawn events; rebuilt from the
+# event's games when evicted or out of step (fresh worker, players re-entered).
+_scheduler_states = MemoryBackend(int(os.environ.get("MATCHMAKER_SCHEDULER_STATES", 256)))
+
+
+def get_scheduler_state(game_id, players, locked_games):
+    """Return the SchedulerState for this event, in step with ``locked_games``."""
+    state = _scheduler_states.get(game_id)
+    if state is None or not state.matches(players, locked_games):
+        state = SchedulerState.from_games(players, locked_games)
+        _scheduler_states.set(game_id, state)
+    return state
+
+
 def get_logic():
     """Load logic module based on current playground & players."""
     game_id = session.get("current_game_id")
     if not game_id:
         return None
 
-    players = session.get("players")
+    event = current_event()
+    players = event["players"]
     if not players:
         players = [
             p.player_name
-            for p in Player.query.filter_by(game_id=game_id).order_by(Player.player_code).all()
+            for p in Player.query.filter(Player.event_pk == event_pk(game_id)).order_by(Player.player_code).all()
         ]
         if players:
-            session["players"] = players
-            session.modified = True
+            event["players"] = players
+            save_event()
 
     players_count = len(players or [])
     if players_count == 0:
         return None
 
-    playground = Playground.query.filter_by(game_id=game_id).first()
+    playground = Playground.query.filter(Playground.event_pk == event_pk(game_id)).first()
     if not playground:
         return None
 
@@ -275,13 +392,98 @@ def get_logic():
         playground.courts_count
     )
 
+
+def draw_games(logic, game_id, players, locked_games, force_no, state):
+    """Draw the next round, one game per court in play, numbered from ``force_no``.
+
+    Seated by rating when PAIRING_MODE is "balanced".
+    """
+    options = {}
+    if current_app.config["PAIRING_MODE"] == "balanced" and accepts_pairer(logic):
+        try:
+            from logic.pairing import BalancedPairer
+        except ImportError:  # NumPy is optional: draw as before without it
+            current_app.logger.warning("Balanced pairing needs NumPy; drawing at random")
+        else:
+            options["pairer"] = BalancedPairer(
+                event_ratings(game_id), state.partners, state.opponents,
+                budget_ms=current_app.config["PAIRING_BUDGET_MS"],
+            )
+    started = time.perf_counter()
+    if courts_in_play(logic, len(players)) > 1:
+        games = logic.next_round(players, locked_games, force_no=force_no, state=state, **options)
+    else:
+        game = logic.next_game(players, locked_games, force_no=force_no, state=state, **options)
+        games = [game] if game else []
+    metrics.NEXT_GAME_SECONDS.observe(
+        time.perf_counter() - started, pairing="balanced" if options else "random"
+    )
+    for offset, game in enumerate(games):
+        game.setdefault("teams", [])
+        game["game_no"] = force_no + offset
+    return games
+
+
+def hold_drawn(event, games):
+    """Put a drawn round on the drawing page: the first court's game, then the others."""
+    event["pending_game"] = games[0]
+    event["pending_courts"] = games[1:]
+    save_event()
+    return games[0]
+
+
+def bearer_token_ok(token):
+    """Whether the request's ``Authorization: Bearer`` header carries ``token``."""
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    return hmac.compare_digest(supplied.encode(), token.encode())
+
+
+# -------------------- Metrics --------------------
+@bp.before_app_request
+def start_request_metrics():
+    g.request_stats = metrics.start_request()
+
+
+@bp.after_app_request
+def record_request_metrics(response):
+    stats = g.pop("request_stats", None)
+    if stats is None:
+        return response
+    route = (request.endpoint or "unmatched").rpartition(".")[2]
+    action = None
+    if request.method == "POST":
+        action = request.form.get("action")
+        if action is None and request.is_json:
+            action = (request.get_json(silent=True) or {}).get("action")
+    metrics.finish_request(
+        stats, route, metrics.action_label(route, action, METRIC_ACTIONS), response.status_code
+    )
+
+    cookie = request.cookies.get(current_app.config["SESSION_COOKIE_NAME"])
+    if cookie:
+        metrics.SESSION_BYTES.observe(len(cookie))
+    game_id = session.get("current_game_id") or (request.view_args or {}).get("game_id")
+    if game_id:
+        metrics.active_events.touch(game_id)
+    return response
+
+
+@bp.route("/metrics")
+def metrics_view():
+    """Prometheus metrics of this worker (see metrics.py)."""
+    token = current_app.config["METRICS_TOKEN"]
+    if token and not bearer_token_ok(token):
+        return jsonify(error="A valid metrics token is required."), 401
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+
 # -------------------- Routes --------------------
-@app.route("/")
+@bp.route("/")
 def home():
     return render_template("index.html")
 
 # ---------- Game Plan ----------
-@app.route("/game-plan", methods=["GET", "POST"])
+@bp.route("/game-plan", methods=["GET", "POST"])
 def game_plan():
     if request.method == "POST":
         match_name = request.form.get("game_name")
@@ -289,7 +491,7 @@ def game_plan():
         email = request.form.get("host_email")
 
         new_game = GameInfo(
-            game_id=str(uuid.uuid4().hex[:24]),
+            game_id=generate_game_id(),
             game_name=match_name,
             game_place=court,
             host_email=email,
@@ -300,18 +502,15 @@ def game_plan():
 
         session.clear()
         session["current_game_id"] = new_game.game_id
-        session["games"] = []
-        session["pending_game"] = None
-        session["active_game"] = None
-        session["players"] = []
-        session.modified = True
+        g.event = new_event_state()
+        save_event()
 
-        return redirect(url_for("playground"))
+        return redirect(url_for("main.playground"))
 
     return render_template("game-plan.html")
 
 # ---------- Playground ----------
-@app.route("/playground", methods=["GET", "POST"])
+@bp.route("/playground", methods=["GET", "POST"])
 def playground():
     if request.method == "POST":
         sport = request.form.get("sport")
@@ -322,10 +521,10 @@ def playground():
 
         game_id = session.get("current_game_id")
         if not game_id:
-            return redirect(url_for("game_plan"))
+            return redirect(url_for("main.game_plan"))
 
         new_playground = Playground(
-            game_id=game_id,
+            event_pk=resolve_event_pk(game_id),
             sport=sport,
             game_type=game_type,
             game_format=game_format,
@@ -336,75 +535,121 @@ def playground():
         db.session.commit()
 
         session["point_limit"] = int(point_limit)
-        return redirect(url_for("players"))
+        return redirect(url_for("main.players"))
 
     return render_template("playground.html")
 
 # ---------- Players ----------
-@app.route("/players", methods=["GET", "POST"])
+@bp.route("/players", methods=["GET", "POST"])
 def players():
     game_id = session.get("current_game_id")
     if not game_id:
-        return redirect(url_for("game_plan"))
+        return redirect(url_for("main.game_plan"))
 
     if request.method == "POST":
-        # Clear any old players for this game (safety when re-entering)
-        Player.query.filter_by(game_id=game_id).delete()
-
         # Collect dynamic players from form
         form_players = [v for k, v in request.form.items() if k.startswith("player_") and v.strip()]
+        try:
+            start_roster(game_id, form_players)
+        except importer.RosterLocked as exc:
+            return render_template("players.html", import_errors=[str(exc)]), 409
 
-        for idx, name in enumerate(form_players, start=1):
-            player = Player(
-                player_code=f"P-{idx:02}",
-                player_name=name,
-                game_id=game_id
-            )
-            db.session.add(player)
+        # After players saved, jump to drawing page
+        return redirect(url_for("main.drawing"))
 
-        db.session.commit()
-        print(f"✅ [DB] {len(form_players)} players saved for game {game_id}")
+    return render_template("players.html")
 
-        session["players"] = form_players
-        session["games"] = []
-        session["pending_game"] = None
-        session["active_game"] = None
-        session.modified = True
 
-        # After players saved, jump to drawing page
-        return redirect(url_for("drawing"))
+@bp.route("/players/import", methods=["POST"])
+def players_import():
+    """Set the roster from an uploaded CSV or JSON Lines file, one name per record."""
+    game_id = session.get("current_game_id")
+    if not game_id:
+        return redirect(url_for("main.game_plan"))
 
-    return render_template("players.html")
+    upload = request.files.get("roster")
+    fmt = importer.format_for(upload.filename if upload else None)
+    if fmt is None:
+        return render_template("players.html", import_errors=["Upload a .csv or .jsonl file."]), 400
+    try:
+        names = importer.read_roster(importer.read_records(upload.stream, fmt))
+    except (importer.ImportRejected, UnicodeDecodeError, csv.Error) as exc:
+        return render_template("players.html", import_errors=_import_problems(exc)), 422
+    if not names:
+        return render_template("players.html", import_errors=["The file has no players."]), 422
+
+    try:
+        start_roster(game_id, names)
+    except importer.RosterLocked as exc:
+        return render_template("players.html", import_errors=[str(exc)]), 409
+    return redirect(url_for("main.drawing"))
+
+
+def start_roster(game_id, names):
+    """Replace the event's roster, restart its live state and build the logic tables.
+
+    Raises importer.RosterLocked, with nothing changed, once the event has drawn a match.
+    """
+    importer.write_roster(game_id, names)
+    bump_event_version(game_id)
+    db.session.commit()
+    current_app.logger.info("%d players saved for game %s", len(names), game_id)
+
+    event = current_event()
+    event["players"] = names
+    event["games"] = []
+    event["pending_game"] = None
+    event["active_game"] = None
+    save_event()
+
+    # Build round-robin tables now rather than on the first draw
+    get_logic()
+
+
+def _import_problems(exc):
+    """Messages for a rejected import: one per invalid record reported."""
+    if isinstance(exc, importer.ImportRejected):
+        problems = [f"Line {line}: {message}" for line, message in exc.errors]
+        if exc.count > len(exc.errors):
+            problems.append(f"... and {exc.count - len(exc.errors)} more")
+        return problems
+    return [f"Unreadable file: {exc}"]
 
 # ---------- Drawing ----------
-@app.route("/drawing", methods=["GET", "POST"])
+@bp.route("/drawing", methods=["GET", "POST"])
 def drawing():
     game_id = session.get("current_game_id")
     if not game_id:
-        return redirect(url_for("game_plan"))
+        return redirect(url_for("main.game_plan"))
+
+    # A drawn game is on screen: its page only changes with the event's version
+    if request.method == "GET" and current_event()["pending_game"]:
+        version = event_version(game_id)
+        cached = cached_page(("drawing", game_id, version)) if version is not None else None
+        if cached is not None:
+            return cached
 
-    players_db = Player.query.filter_by(game_id=game_id).order_by(Player.player_code).all()
+    players_db = Player.query.filter(Player.event_pk == event_pk(game_id)).order_by(Player.player_code).all()
     players = [p.player_name for p in players_db]
 
     if not players:
-        return redirect(url_for("players"))
+        return redirect(url_for("main.players"))
 
     logic = get_logic()
     if not logic:
         return "No matching game logic found", 500
 
-    locked_games = session.get("games") or []
-    pending_game = session.get("pending_game")
+    event = current_event()
+    locked_games = event["games"]
+    pending_game = event["pending_game"]
+    state = get_scheduler_state(game_id, players, locked_games)
 
     if not pending_game:
-        next_number = len(locked_games) + 1
-        candidate = logic.next_game(players, locked_games, force_no=next_number)
-        if candidate:
-            candidate.setdefault("teams", [])
-            candidate["game_no"] = next_number
-            pending_game = candidate
-            session["pending_game"] = pending_game
-            session.modified = True
+        drawn = draw_games(logic, game_id, players, locked_games, len(locked_games) + 1, state)
+        if drawn:
+            pending_game = hold_drawn(event, drawn)
+            bump_event_version(game_id)  # the drawn games are part of the page
+            db.session.commit()
 
     if request.method == "POST":
         action = request.form.get("action")
@@ -412,92 +657,73 @@ def drawing():
         if action == "redraw":
             if pending_game:
                 force_no = pending_game.get("game_no") or len(locked_games) + 1
-                candidate = logic.next_game(players, locked_games, force_no=force_no)
-                if candidate:
-                    candidate.setdefault("teams", [])
-                    candidate["game_no"] = force_no
-                    pending_game = candidate
-                    session["pending_game"] = pending_game
-                    session.modified = True
-            return redirect(url_for("drawing"))
+                drawn = draw_games(logic, game_id, players, locked_games, force_no, state)
+                if drawn:
+                    pending_game = hold_drawn(event, drawn)
+                    bump_event_version(game_id)
+                    db.session.commit()
+            return redirect(url_for("main.drawing"))
 
         if action == "next":
             if not pending_game:
-                return redirect(url_for("drawing"))
+                return redirect(url_for("main.drawing"))
 
-            match_id = pending_game.get("match_id") or uuid.uuid4().hex
             start_time = pending_game.get("start_time")
             if isinstance(start_time, datetime):
                 start_time = start_time.isoformat()
             if not start_time:
                 start_time = now_jakarta().isoformat()
-
-            pending_game["match_id"] = match_id
-            pending_game["start_time"] = start_time
-            pending_game.setdefault("scoreA", 0)
-            pending_game.setdefault("scoreB", 0)
-            pending_game.setdefault("elapsed_seconds", 0)
-            pending_game["resume_time"] = start_time
-            pending_game["status"] = "active"
-
             start_dt = to_jakarta_naive(datetime.fromisoformat(start_time))
-
-            existing_draws = Drawing.query.filter_by(game_id=game_id).all()
-            match_counts = {}
-            for draw in existing_draws:
-                match_counts[draw.player_id] = match_counts.get(draw.player_id, 0) + 1
-
-            for side, team in enumerate(pending_game.get("teams", []), start=1):
-                team_label = "A" if side == 1 else "B"
-                for idx, player_name in enumerate(team, start=1):
-                    player_obj = next((p for p in players_db if p.player_name == player_name), None)
-                    player_code = player_obj.player_code if player_obj else f"P-{idx:02}"
-                    player_id = player_obj.player_id if player_obj else uuid.uuid4().hex[:10]
-
-                    match_counts[player_id] = match_counts.get(player_id, 0) + 1
-
-                    drawing_row = Drawing(
-                        game_id=game_id,
-                        game_no=pending_game["game_no"],
-                        court_no="A",  # TODO: support multiple courts
-                        team_side=team_label,
-                        player_code=player_code,
-                        player_id=player_id,
-                        player_match_number=match_counts[player_id],
-                        match_id=match_id,
-                        match_start_at=start_dt,
-                    )
-                    db.session.add(drawing_row)
+            players_by_name = {p.player_name: p for p in players_db}
+
+            # Every court of the round starts now; results are entered court by court
+            round_games = [pending_game, *event["pending_courts"]]
+            for game in round_games:
+                game["match_id"] = game.get("match_id") or generate_match_id()
+                game["start_time"] = start_time
+                game.setdefault("scoreA", 0)
+                game.setdefault("scoreB", 0)
+                game.setdefault("elapsed_seconds", 0)
+                game["resume_time"] = start_time
+                game["status"] = "active"
+                lock_match(game_id, game, players_by_name, start_dt)
             db.session.commit()
 
-            locked_games.append(pending_game)
-            session["games"] = locked_games
-            session["active_game"] = pending_game
-            session["pending_game"] = None
-            session.modified = True
+            for game in round_games:
+                locked_games.append(game)
+                state.record(game)
+            event["active_game"] = pending_game
+            event["queued_games"] = round_games[1:]
+            event["pending_game"] = None
+            event["pending_courts"] = []
+            save_event()
+            for game in round_games:
+                publish_game(game_id, game)
 
-            return redirect(url_for("game_session"))
+            return redirect(url_for("main.game_session"))
 
-    return render_template(
+    return cached_page(("drawing", game_id, event_version(game_id)), lambda: render_template(
         "drawing.html",
         players=players,
         pending_game=pending_game,
+        round_games=[pending_game, *event["pending_courts"]] if pending_game else [],
         games=locked_games,
-    )
+    ))
 
 
 # ---------- Game Session ----------
-@app.route("/game-session", methods=["GET", "POST"])
+@bp.route("/game-session", methods=["GET", "POST"])
 def game_session():
-    active_game = session.get("active_game")
+    active_game = current_event()["active_game"]
     if not active_game:
-        return redirect(url_for("drawing"))
+        return redirect(url_for("main.drawing"))
 
     game_id = session.get("current_game_id")
     if not game_id:
-        return redirect(url_for("game_plan"))
+        return redirect(url_for("main.game_plan"))
 
     error_message = session.pop("wrap_up_error", None)
+    status = 200
     ended = active_game.get("status") == "ended"
     winner_side = active_game.get("winner")
     loser_side = None
@@ -519,6 +745,13 @@ def game_session():
                 else:
                     winner = "T"
 
+            match_id = active_game.get("match_id")
+            if match_id:
+                # The rally log is the record of the score; log any correction.
+                score = set_score(game_id, match_id, score_a, score_b)
+                db.session.commit()
+                live_feed.publish(game_id, "score", {"match_id": match_id, **score})
+
             end_dt = now_jakarta()
             ended_at = end_dt.isoformat()
 
@@ -545,8 +778,7 @@ def game_session():
                 "ended_at": ended_at,
                 "elapsed_seconds": elapsed_total,
             }
-            session["active_game"] = active_game
-            session.modified = True
+            save_event()
 
             ended = True
             winner_side = winner
@@ -560,18 +792,26 @@ def game_session():
             active_game.setdefault("elapsed_seconds", 0)
             active_game["resume_time"] = now_jakarta().isoformat()
             active_game["status"] = "active"
-            session["active_game"] = active_game
-            session.modified = True
+            save_event()
             ended = False
             winner_side = None
             loser_side = None
 
         elif action == "next":
-            success, error = finalize_game_result(game_id, active_game)
+            try:
+                success, error = finalize_game_result(game_id, active_game)
+            except ResultAlreadySaved as exc:
+                success, error, status = False, str(exc), 409
             if not success:
                 error_message = error
             else:
-                return redirect(url_for("drawing"))
+                event = current_event()
+                if event["queued_games"]:
+                    # The round's other courts still need their results
+                    event["active_game"] = event["queued_games"].pop(0)
+                    save_event()
+                    return redirect(url_for("main.game_session"))
+                return redirect(url_for("main.drawing"))
 
     ended = active_game.get("status") == "ended"
     winner_side = active_game.get("winner")
@@ -590,17 +830,28 @@ def game_session():
     team_a_names = normalize_team(teams[0] if len(teams) > 0 else [])
     team_b_names = normalize_team(teams[1] if len(teams) > 1 else [])
 
+    match_id = active_game.get("match_id")
+    live = match_score(match_id) if match_id else {"version": 0}
+    if live["version"]:
+        score_a, score_b = live["scoreA"], live["scoreB"]
+    else:
+        score_a = int(active_game.get("scoreA", 0) or 0)
+        score_b = int(active_game.get("scoreB", 0) or 0)
+
     return render_template(
         "game-session.html",
         game_no=active_game.get("game_no"),
+        court_no=active_game.get("court_no") or "A",
         team_a=team_a_names,
         team_b=team_b_names,
         team_a_names=team_a_names,
         team_b_names=team_b_names,
         point_limit=session.get("point_limit", 21),
         start_time=active_game.get("start_time"),
-        scoreA=int(active_game.get("scoreA", 0) or 0),
-        scoreB=int(active_game.get("scoreB", 0) or 0),
+        scoreA=score_a,
+        scoreB=score_b,
+        score_version=live["version"],
+        score_url=url_for("main.match_score_api", match_id=match_id) if match_id else None,
         ended=ended,
         winner_side=winner_side,
         loser_side=loser_side,
@@ -608,139 +859,138 @@ def game_session():
         ended_at=active_game.get("ended_at"),
         elapsed_seconds=int(active_game.get("elapsed_seconds", 0) or 0),
         resume_time=active_game.get("resume_time") or active_game.get("start_time"),
-    )
+    ), status
 
 
+# ---------- Live Scoring API ----------
+def live_game(event, match_id):
+    """The event's active game when ``match_id`` is its live match, else None.
 
-@app.route("/player-stats/<player_id>")
+    Shared with the async score view in asgi.py so both answer the same matches.
+    """
+    active_game = event.get("active_game")
+    if not match_id or not active_game or active_game.get("match_id") != match_id:
+        return None
+    return active_game
+
+
+def _live_match(match_id):
+    """Return (game_id, active game) when ``match_id`` is this event's live game."""
+    game_id = session.get("current_game_id")
+    active_game = live_game(current_event(), match_id) if game_id else None
+    if active_game is None:
+        abort(404)
+    return game_id, active_game
+
+
+@bp.route("/api/matches/<match_id>/score", methods=["GET", "POST"])
+def match_score_api(match_id):
+    """Score a live game point by point.
+
+    POST a JSON body with ``action`` of ``increment`` (``side``, optional
+    ``delta`` of 1 or -1), ``undo`` or ``set`` (``scoreA``, ``scoreB``), plus
+    an optional ``version`` that must match the log. Every reply is just
+    ``{"scoreA", "scoreB", "version"}``; a stale version gets 409 with the
+    current score.
+    """
+    game_id, active_game = _live_match(match_id)
+    if request.method == "GET":
+        return jsonify(match_score(match_id))
+
+    if active_game.get("status") == "ended":
+        return jsonify(error="Revise the game before changing the score.", **match_score(match_id)), 409
+
+    data = request.get_json(silent=True) or {}
+    action = data.get("action")
+    version = data.get("version")
+    try:
+        if action == "increment":
+            score = add_point(
+                game_id,
+                match_id,
+                data.get("side"),
+                int(data.get("delta", 1)),
+                version=version,
+                limit=session.get("point_limit", 21),
+            )
+        elif action == "undo":
+            score = undo(game_id, match_id, version=version)
+        elif action == "set":
+            score = set_score(game_id, match_id, data.get("scoreA"), data.get("scoreB"), version=version)
+        else:
+            return jsonify(error="Unknown action."), 400
+        db.session.commit()
+    except VersionConflict as exc:
+        return jsonify(error=str(exc), **exc.score), 409
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify(error="Score changed, try again.", **match_score(match_id)), 409
+    except (TypeError, ValueError) as exc:
+        db.session.rollback()
+        return jsonify(error=str(exc)), 400
+
+    live_feed.publish(game_id, "score", {"match_id": match_id, **score})
+    return jsonify(score)
+
+
+@bp.route("/player-stats/<player_id>")
 def player_stats_view(player_id):
     game_id = session.get("current_game_id")
     if not game_id:
-        return redirect(url_for("game_plan"))
+        return redirect(url_for("main.game_plan"))
 
     if not session.get("event_completed"):
-        return redirect(url_for("leaderboard"))
+        return redirect(url_for("main.leaderboard"))
 
-    game = GameInfo.query.filter_by(game_id=game_id).first()
-    if not game:
-        return redirect(url_for("game_plan"))
+    version = event_version(game_id)
+    if version is None:
+        return redirect(url_for("main.game_plan"))
 
-    player = Player.query.filter_by(game_id=game_id, player_id=player_id).first()
-    if not player:
-        abort(404)
+    def render():
+        player = Player.query.filter(
+            Player.event_pk == event_pk(game_id), Player.player_id == player_id
+        ).first()
+        if not player:
+            abort(404)
 
-    player_map, stats, leaderboard_rows, _ = compute_leaderboard_data(game_id)
-    player_stats = stats.get(player_id)
-    if not player_stats:
-        abort(404)
+        loaded = load_player_stats(game_id, player_id)
+        if not loaded:
+            abort(404)
 
+        return render_player_stats(GameInfo.query.filter_by(game_id=game_id).first(), player, loaded)
+
+    return cached_page(("player-stats", game_id, version, player_id), render)
+
+
+def render_player_stats(game, player, loaded):
+    """Render player-stats.html from load_player_stats output (shared with asgi.py)."""
+    player_stats = loaded["standing"]
     total_games = player_stats.get("games", 0)
     wins = player_stats.get("wins", 0)
     losses = player_stats.get("losses", 0) + player_stats.get("ties", 0)
     win_pct = int(round((wins / total_games) * 100)) if total_games else 0
     loss_pct = 100 - win_pct if total_games else 0
 
-    player_rows = (
-        db.session.query(MatchDetail, Drawing.game_no)
-        .join(Drawing, MatchDetail.match_id == Drawing.match_id)
-        .filter(Drawing.game_id == game_id, MatchDetail.player_id == player_id)
-        .order_by(Drawing.game_no)
-        .all()
-    )
-
-    player_matches = {}
-    for md, game_no in player_rows:
-        player_matches.setdefault(md.match_id, {"detail": md, "game_no": game_no})
-
-    unique_player_details = list(player_matches.values())
-    match_count = len(unique_player_details)
-
-    match_ids = [entry["detail"].match_id for entry in unique_player_details]
-    all_details = []
-    rosters = {}
-    if match_ids:
-        all_details = (
-            db.session.query(MatchDetail, Drawing)
-            .join(Drawing, MatchDetail.match_id == Drawing.match_id)
-            .filter(MatchDetail.match_id.in_(match_ids))
-            .all()
-        )
+    matches = loaded["matches"]
+    breakdown = [
+        {
+            "game_no": match["game_no"],
+            "team_a": match["team_a"],
+            "team_b": match["team_b"],
+            "score_a": match["score_a"],
+            "score_b": match["score_b"],
+            "duration": format_duration_clock(match["duration"]),
+            "player_side": match["player_side"],
+            "winner": match["winner"],
+        }
+        for match in matches
+    ]
 
-        roster_rows = (
-            db.session.query(Drawing.match_id, Drawing.team_side, Player.player_name)
-            .join(Player, Player.player_id == Drawing.player_id)
-            .filter(Drawing.match_id.in_(match_ids))
-            .all()
-        )
-        for match_id, team_side, player_name in roster_rows:
-            bucket = rosters.setdefault(match_id, {"A": [], "B": []})
-            if player_name not in bucket.get(team_side, []):
-                bucket.setdefault(team_side, []).append(player_name)
-
-    match_summary = {}
-    for md, dr in all_details:
-        info = match_summary.setdefault(
-            md.match_id,
-            {
-                "game_no": dr.game_no,
-                "teams": {"A": [], "B": []},
-                "scores": {},
-                "duration": md.match_duration,
-                "winner": None,
-            },
-        )
-        name = player_map.get(md.player_id, {}).get("name")
-        if not name:
-            other = Player.query.filter_by(player_id=md.player_id).first()
-            name = other.player_name if other else md.player_id
-            player_map.setdefault(md.player_id, {"name": name, "code": ""})
-        info["scores"][md.team_side] = md.team_side_score or 0
-        if md.winner_flag == "W":
-            info["winner"] = md.team_side
-        elif md.winner_flag == "T":
-            info["winner"] = "T"
-        if md.match_duration and not info.get("duration"):
-            info["duration"] = md.match_duration
-
-    for match_id, info in match_summary.items():
-        roster = rosters.get(match_id, {})
-        info["teams"]["A"] = roster.get("A", [])
-        info["teams"]["B"] = roster.get("B", [])
-
-    breakdown = []
-    for entry in unique_player_details:
-        md = entry["detail"]
-        game_no = entry["game_no"]
-        info = match_summary.get(md.match_id, {
-            "game_no": game_no,
-            "teams": {"A": [], "B": []},
-            "scores": {},
-            "duration": md.match_duration,
-            "winner": md.winner_flag,
-        })
-        breakdown.append({
-            "game_no": info.get("game_no", game_no),
-            "team_a": info.get("teams", {}).get("A", []),
-            "team_b": info.get("teams", {}).get("B", []),
-            "score_a": info.get("scores", {}).get("A"),
-            "score_b": info.get("scores", {}).get("B"),
-            "duration": info.get("duration") or md.match_duration or '--:--:--',
-            "player_side": md.team_side,
-            "winner": info.get("winner"),
-        })
-
-    breakdown.sort(key=lambda item: item.get("game_no", 0))
-
-    total_duration_seconds = sum(parse_duration_to_seconds(entry["detail"].match_duration) for entry in unique_player_details)
-    avg_duration_seconds = int(total_duration_seconds / match_count) if match_count else 0
+    total_duration_seconds = player_stats.get("seconds_played", 0)
+    avg_duration_seconds = int(total_duration_seconds / total_games) if total_games else 0
 
     player_rank = player_stats.get("rank")
-    rank_limit = min(len(leaderboard_rows), 10)
-    rank_chips = leaderboard_rows[:rank_limit]
-    if player_rank and all(chip.get("player_id") != player_id for chip in rank_chips):
-        extra_chip = next((row for row in leaderboard_rows if row.get("player_id") == player_id), None)
-        if extra_chip and extra_chip not in rank_chips:
-            rank_chips.append(extra_chip)
+    rank_chips = loaded["rank_chips"]
 
     wins_display = f"{wins} ({win_pct}%)" if total_games else "0 (0%)"
     losses_display = f"{losses} ({loss_pct}%)" if total_games else "0 (0%)"
@@ -763,134 +1013,82 @@ def player_stats_view(player_id):
         avg_game_time=format_duration_verbose(avg_duration_seconds),
         breakdown=breakdown,
         rank_chips=rank_chips,
-        total_players=len(leaderboard_rows),
+        total_players=loaded["total_players"],
     )
 
 
 
 
 # ---------- Wrap Up ----------
-@app.route("/wrap-up", methods=["POST"])
+@bp.route("/wrap-up", methods=["POST"])
 def wrap_up():
     game_id = session.get("current_game_id")
     if not game_id:
-        return redirect(url_for("game_plan"))
+        return redirect(url_for("main.game_plan"))
 
-    active_game = session.get("active_game")
+    event = current_event()
+    active_game = event["active_game"]
     if active_game and active_game.get("result_pending"):
-        success, error = finalize_game_result(game_id, active_game)
+        try:
+            success, error = finalize_game_result(game_id, active_game)
+        except ResultAlreadySaved as exc:
+            success, error = False, str(exc)
         if not success:
             session["wrap_up_error"] = error
             session.modified = True
-            return redirect(url_for("game_session"))
+            return redirect(url_for("main.game_session"))
     else:
-        session["active_game"] = None
-        session["pending_game"] = None
+        event["active_game"] = None
+        event["pending_game"] = None
+    # Courts of an unfinished round are dropped with it
+    event["pending_courts"] = []
+    event["queued_games"] = []
+    save_event()
 
     session["event_completed"] = True
     session.modified = True
+    # Connected viewers get the wrap-up frame; nothing is kept for new ones
+    live_feed.publish(game_id, "wrap-up", {"completed": True})
+    live_feed.forget(game_id)
+    _scheduler_states.delete(game_id)
 
-    return redirect(url_for("leaderboard"))
+    return redirect(url_for("main.leaderboard"))
 
 
 # ---------- Leaderboard ----------
-@app.route("/leaderboard")
+@bp.route("/leaderboard")
 def leaderboard():
     game_id = request.args.get("game_id") or session.get("current_game_id")
     if not game_id:
-        return redirect(url_for("game_plan"))
+        return redirect(url_for("main.game_plan"))
 
-    game = GameInfo.query.filter_by(game_id=game_id).first()
-    if not game:
-        return redirect(url_for("game_plan"))
+    version = event_version(game_id)
+    if version is None:
+        return redirect(url_for("main.game_plan"))
 
-    players = Player.query.filter_by(game_id=game_id).order_by(Player.player_code).all()
-    player_map = {
-        player.player_id: {
-            "name": player.player_name,
-            "code": player.player_code,
-        }
-        for player in players
-    }
-
-    stats = {
-        player_id: {
-            "player_id": player_id,
-            "player_code": data["code"],
-            "player_name": data["name"],
-            "games": 0,
-            "wins": 0,
-            "losses": 0,
-            "ties": 0,
-            "points": 0,
-            "point_diff": 0,
-        }
-        for player_id, data in player_map.items()
-    }
-
-    details = (
-        db.session.query(
-            MatchDetail.match_id,
-            MatchDetail.player_id,
-            MatchDetail.team_side,
-            MatchDetail.team_side_score,
-            MatchDetail.winner_flag,
-        )
-        .join(
-            Drawing,
-            (MatchDetail.match_id == Drawing.match_id)
-            & (MatchDetail.player_id == Drawing.player_id),
-        )
-        .filter(Drawing.game_id == game_id)
-        .all()
-    )
+    return cached_page(leaderboard_key(game_id, version), lambda: render_leaderboard(
+        GameInfo.query.filter_by(game_id=game_id).first(), ranked_standings(game_id)
+    ))
 
-    match_scores = {}
-    for detail in details:
-        match_scores.setdefault(detail.match_id, {})[detail.team_side] = detail.team_side_score or 0
-
-    for detail in details:
-        player_id = detail.player_id
-        player_stats = stats.setdefault(
-            player_id,
-            {
-                "player_id": player_id,
-                "player_code": player_id,
-                "player_name": player_map.get(player_id, {}).get("name", "Unknown"),
-                "games": 0,
-                "wins": 0,
-                "losses": 0,
-                "ties": 0,
-                "points": 0,
-                "point_diff": 0,
-            },
-        )
 
-        player_stats["games"] += 1
-        flag = (detail.winner_flag or "").upper()
-        if flag == "W":
-            player_stats["wins"] += 1
-        elif flag == "L":
-            player_stats["losses"] += 1
-        elif flag == "T":
-            player_stats["ties"] += 1
-
-        score = detail.team_side_score or 0
-        player_stats["points"] += score
-
-        opponent_side = "B" if detail.team_side == "A" else "A"
-        opponent_score = match_scores.get(detail.match_id, {}).get(opponent_side, 0)
-        player_stats["point_diff"] += score - opponent_score
-
-    leaderboard_rows = sorted(
-        stats.values(),
-        key=lambda s: (s["points"], s["point_diff"], s["wins"]),
-        reverse=True,
-    )
+def from_event_page():
+    """Whether the request was referred by one of this app's pages (i.e. the event's own)."""
+    referrer = urlsplit(request.referrer or "")
+    return referrer.netloc == request.host and referrer.path.startswith(request.script_root + "/")
+
 
-    for idx, row in enumerate(leaderboard_rows, start=1):
-        row["rank"] = idx
+def leaderboard_key(game_id, version):
+    """Page cache key; the back link and live feed differ by wrap-up and by where the visit came from.
 
+    Only whether the referrer is one of the event's pages is kept, so a
+    referring URL never ends up in the cache or the ETag.
+    """
+    return ("leaderboard", game_id, version, bool(session.get("event_completed")), from_event_page())
+
+
+def render_leaderboard(game, leaderboard_rows):
+    """Render leaderboard.html (shared with asgi.py)."""
+    game_id = game.game_id
     return render_template(
         "leaderboard.html",
         leaderboard=leaderboard_rows,
@@ -899,8 +1097,494 @@ def leaderboard():
         game_place=game.game_place,
         game_date=game.created_at,
         event_completed=session.get("event_completed", False),
+        back_in_history=from_event_page(),
+        live_url=url_for("main.live_stream", game_id=game_id),
+    )
+
+
+# ---------- Live Feed ----------
+@bp.route("/live/<game_id>")
+def live_stream(game_id):
+    """Server-Sent Events stream of an event's scores, games and leaderboard."""
+    if not db.session.query(GameInfo.game_id).filter_by(game_id=game_id).first():
+        abort(404)
+    db.session.remove()  # the stream may stay open for hours; don't hold a connection
+
+    subscriber = live_feed.subscribe(game_id)
+    return Response(
+        live_feed.stream(subscriber),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+# ---------- Import ----------
+@bp.route("/import/matches", methods=["POST"])
+def import_matches():
+    """Import historical matches from an uploaded CSV or JSON Lines ``file``.
+
+    Form fields ``host`` (email of the events the file creates) and
+    ``dry_run``. Needs ``Authorization: Bearer <MATCHMAKER_IMPORT_TOKEN>``.
+    Replies with the import summary, or 422 with the invalid records.
+    """
+    token = current_app.config["IMPORT_TOKEN"]
+    if not token:
+        abort(404)
+    if not bearer_token_ok(token):
+        return jsonify(error="A valid import token is required."), 401
+
+    upload = request.files.get("file")
+    fmt = importer.format_for(upload.filename if upload else None)
+    if fmt is None:
+        return jsonify(error="Upload a .csv or .jsonl file as 'file'."), 400
+
+    def progress(records, matches):
+        current_app.logger.info("import: %d records read, %d matches written", records, matches)
+
+    try:
+        summary = importer.MatchImporter(host=request.form.get("host"), progress=progress).run(
+            importer.read_records(upload.stream, fmt)
+        )
+    except (importer.ImportRejected, UnicodeDecodeError, csv.Error) as exc:
+        db.session.rollback()
+        return jsonify(error="Nothing was imported.", problems=_import_problems(exc)), 422
+    if request.form.get("dry_run"):
+        db.session.rollback()
+        return jsonify(dry_run=True, **summary)
+    db.session.commit()
+    return jsonify(summary)
+
+
+# ---------- Export ----------
+@bp.route("/export/<dataset>.<fmt>")
+def export_data(dataset, fmt):
+    """Stream a dataset of every event as CSV, JSON Lines or Parquet.
+
+    Query parameters ``game_id``, ``host``, ``since`` and ``until`` (ISO
+    dates, inclusive) narrow it down. Needs ``Authorization: Bearer
+    <MATCHMAKER_EXPORT_TOKEN>``.
+    """
+    token = current_app.config["EXPORT_TOKEN"]
+    if not token or dataset not in DATASETS or fmt not in FORMATS:
+        abort(404)
+    if not bearer_token_ok(token):
+        return jsonify(error="A valid export token is required."), 401
+
+    try:
+        chunks = stream_export(
+            dataset,
+            fmt,
+            game_id=request.args.get("game_id"),
+            host=request.args.get("host"),
+            since=parse_when(request.args.get("since")),
+            until=parse_when(request.args.get("until"), end=True),
+        )
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+    except ImportError:
+        return jsonify(error="Parquet export needs pyarrow installed on the server."), 501
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=MIMETYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{dataset}.{fmt}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+# -------------------- CLI --------------------
+@bp.cli.command("build-schedules")
+@click.option("--min-players", default=4, show_default=True)
+@click.option("--max-players", default=24, show_default=True)
+@click.option("--max-courts", default=3, show_default=True)
+def build_schedules(min_players, max_players, max_courts):
+    """Precompute Americano / Fixed Partner schedule tables into the disk cache."""
+    built = 0
+    for game_format in sorted(SCHEDULE_FORMATS):
+        for team_size in (1, 2):
+            for players_count in range(max(min_players, team_size * 2), max_players + 1):
+                for courts_count in range(1, max_courts + 1):
+                    try:
+                        get_schedule(players_count, courts_count, game_format, team_size)
+                    except ValueError:
+                        continue
+                    built += 1
+    click.echo(f"{built} schedule tables ready")
+
+
+@bp.cli.command("simulate")
+@click.option("--game-type", default="Doubles", show_default=True)
+@click.option("--game-format", default="Mexicano", show_default=True)
+@click.option("--players", "players_count", default=6, show_default=True)
+@click.option("--courts", "courts_count", default=1, show_default=True)
+@click.option("--events", default=1000, show_default=True)
+@click.option("--games", "games_count", default=30, show_default=True, help="Games per event.")
+@click.option("--seed", default=0, show_default=True)
+@click.option("--win-model", type=click.Choice(sorted(WIN_MODELS)), default="coin", show_default=True)
+@click.option("--pairing", type=click.Choice(PAIRINGS), default="random", show_default=True,
+              help="How draws are seated; balanced needs NumPy.")
+@click.option("--budget-ms", type=float, default=None, help="Balanced pairing search budget per draw.")
+@click.option("--max-consecutive", "sweep", type=int, multiple=True,
+              help="Consecutive-play limit to sweep; repeat for several values.")
+@click.option("--workers", type=int, default=None, help="Process pool size (default: CPU count).")
+@click.option("--numpy", "use_numpy", is_flag=True, help="Aggregate with NumPy.")
+@click.option("--fail-streak", type=int, default=None, help="Exit 1 if any player plays more games in a row.")
+@click.option("--fail-spread", type=int, default=None, help="Exit 1 if the games-per-player spread exceeds this.")
+def simulate(game_type, game_format, players_count, courts_count, events, games_count, seed,
+             win_model, pairing, budget_ms, sweep, workers, use_numpy, fail_streak, fail_spread):
+    """Play synthetic events through the scheduling logic and report fairness and speed."""
+    config = (game_type, game_format, players_count, courts_count)
+    failed = False
+    for limit in sweep or (None,):
+        started = time.perf_counter()
+        try:
+            results = simulate_events(
+                config, events, games_count, seed=seed, win_model=win_model,
+                max_consecutive=limit, workers=workers, pairing=pairing, budget_ms=budget_ms,
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        summary = aggregate(results, use_numpy=use_numpy)
+        elapsed = time.perf_counter() - started
+
+        label = "default" if limit is None else limit
+        click.echo(f"max_consecutive={label}: {events} events in {elapsed:.2f}s")
+        for name in METRICS:
+            row = summary[name]
+            click.echo(f"  {name:<16} mean={row['mean']:>10.2f}  p95={row['p95']:>10.2f}  max={row['max']:>10.2f}")
+
+        if fail_streak is not None and summary["max_consecutive"]["max"] > fail_streak:
+            click.echo(f"  FAIL: longest streak exceeds {fail_streak}")
+            failed = True
+        if fail_spread is not None and summary["games_spread"]["max"] > fail_spread:
+            click.echo(f"  FAIL: games-per-player spread exceeds {fail_spread}")
+            failed = True
+
+    if failed:
+        raise SystemExit(1)
+
+@bp.cli.command("rebuild-standings")
+@click.option("--game-id", default=None, help="Only rebuild this event.")
+def rebuild_standings_command(game_id):
+    """Recompute the standings table and court time from the finished matches."""
+    if game_id:
+        game_ids = [game_id]
+    else:
+        game_ids = [row.game_id for row in GameInfo.query.with_entities(GameInfo.game_id)]
+    for gid in game_ids:
+        rebuild_standings(gid)
+        bump_event_version(gid)
+    db.session.commit()
+    click.echo(f"Rebuilt standings for {len(game_ids)} event(s)")
+
+@bp.cli.command("purge-event-state")
+def purge_event_state_command():
+    """Delete live event state saved more than MATCHMAKER_EVENT_STORE_TTL seconds ago."""
+    backend = current_app.extensions["event_store"].backend
+    if not isinstance(backend, SQLBackend):
+        click.echo("Only the SQL event store keeps expired state; nothing to purge")
+        return
+    click.echo(f"Purged {backend.purge()} expired event state row(s)")
+
+@bp.cli.command("rebuild-ratings")
+def rebuild_ratings_command():
+    """Link unlinked players to people, then replay every finished match into the ratings."""
+    unlinked = Player.query.filter(Player.person_pk.is_(None)).all()
+    link_people(unlinked)
+    rated = rebuild_ratings()
+    db.session.commit()
+    click.echo(f"Linked {len(unlinked)} player(s); rated {rated} match(es)")
+
+@bp.cli.command("top-rated")
+@click.option("--season", default=None, help="Season label (default: the current one).")
+@click.option("--limit", default=100, show_default=True)
+def top_rated(season, limit):
+    """The season's best ratings, from the per-season table."""
+    season = season or season_of(now_jakarta())
+    click.echo(f"{'#':>4} {'player':<28} {'rating':>7} {'dev':>5} {'matches':>7}")
+    for row in season_top(season, limit):
+        click.echo(
+            f"{row['rank']:>4} {row['name'][:28]:<28} {row['rating']:>7.0f} "
+            f"{row['rating_deviation']:>5.0f} {row['matches']:>7}"
+        )
+
+@bp.cli.command("player-rating")
+@click.argument("name")
+@click.option("--host", default=None, help="Host email, when hosts share the name.")
+@click.option("--as-of", "as_of", default=None, help="ISO date or datetime (default: now).")
+def player_rating(name, host, as_of):
+    """A player's rating after their last match up to a date, from the snapshots."""
+    people = find_people(name, host)
+    if not people:
+        raise click.ClickException(f"No player named {name!r}")
+    if len(people) > 1:
+        hosts = ", ".join(person.host_key for person in people)
+        raise click.ClickException(f"{name!r} plays at several hosts ({hosts}); pick one with --host")
+    person = people[0]
+    when = datetime.fromisoformat(as_of) if as_of else to_jakarta_naive(now_jakarta())
+    if len(as_of or "") == 10:
+        when += timedelta(days=1) - timedelta(microseconds=1)  # a date means the end of that day
+    snapshot = rating_as_of(person.id, when)
+    if snapshot is None:
+        click.echo(f"{person.display_name}: unrated as of {when:%Y-%m-%d %H:%M}")
+        return
+    click.echo(
+        f"{person.display_name}: {snapshot.rating:.0f} ± {2 * snapshot.rating_deviation:.0f} "
+        f"after the match ending {snapshot.rated_at:%Y-%m-%d %H:%M} ({person.rated_matches} rated in all)"
+    )
+
+@bp.cli.command("court-report")
+@click.option("--limit", default=20, show_default=True, help="Most recent events to list.")
+def court_report(limit):
+    """Court time per event and across all events, from the stored totals."""
+    rows = court_time_by_event(limit)
+    click.echo(f"{'event':<26} {'matches':>7} {'court time':>11} {'avg match':>10} {'players':>7} {'avg player':>11}")
+    for row in rows:
+        click.echo(
+            f"{row.game_name[:26]:<26} {row.matches:>7} {format_duration_clock(row.court_seconds):>11} "
+            f"{format_duration_clock(row.avg_match_seconds):>10} {row.players:>7} "
+            f"{format_duration_clock(int(row.avg_player_seconds or 0)):>11}"
+        )
+
+    matches, seconds, events = db.session.query(
+        db.func.sum(GameInfo.matches_finished), db.func.sum(GameInfo.court_seconds), db.func.count(GameInfo.id)
+    ).one()
+    click.echo(f"All {events} event(s): {matches or 0} matches, {format_duration_clock(seconds or 0)} on court")
+
+@bp.cli.command("check-query-plans")
+@click.option("--events", default=200, show_default=True, help="Synthetic events to seed.")
+@click.option("--analyze", is_flag=True, help="Run ANALYZE before explaining.")
+@click.option("--verbose", "-v", is_flag=True, help="Print every query plan.")
+def check_query_plans(events, analyze, verbose):
+    """Fail when a route query plans a full table scan on a seeded database."""
+    import querycheck
+
+    report = querycheck.run(events=events, analyze=analyze)
+    failed = False
+    for name, (plan, scans) in report.items():
+        status = "SCAN " + ", ".join(scans) if scans else "ok"
+        click.echo(f"{name:<24} {status}")
+        if verbose or scans:
+            for line in plan:
+                click.echo(f"    {line}")
+        failed = failed or bool(scans)
+    if failed:
+        raise SystemExit(1)
+
+
+@bp.cli.command("stress-finalize")
+@click.option("--workers", default=16, show_default=True, help="Games finalized at the same time.")
+@click.option("--players", default=8, show_default=True, help="Roster size the games share.")
+@click.option("--database-url", default=None, help="Scratch database to use (default: a temporary SQLite file).")
+def stress_finalize(workers, players, database_url):
+    """Fail when simultaneous finalizations lose or reject a write."""
+    import stresscheck
+
+    report = stresscheck.run(url=database_url, workers=workers, players=players)
+    mode = f" ({report['journal_mode']})" if report["journal_mode"] else ""
+    click.echo(f"backend          {report['backend']}{mode}")
+    click.echo(f"finalizations    {report['finalizations']} in {report['elapsed'] * 1000:.0f} ms "
+               f"(p50 {report['p50'] * 1000:.0f} ms, max {report['max'] * 1000:.0f} ms)")
+    click.echo(f"side results     {report['side_results']}/{report['expected_results']}")
+    click.echo(f"lost standings   {len(report['lost_standings'])}")
+    click.echo(f"rating snapshots {report['rating_snapshots']}/{report['expected_snapshots']}")
+    click.echo(f"lost ratings     {len(report['lost_ratings'])}")
+    for error in report["errors"]:
+        click.echo(f"    {error}")
+    for name, (stored, expected) in report["lost_standings"].items():
+        click.echo(f"    {name}: stored {stored}, expected {expected}")
+    for name, (stored, expected) in report["lost_ratings"].items():
+        click.echo(f"    {name}: rated {stored} match(es), expected {expected}")
+    if not report["ok"]:
+        raise SystemExit(1)
+
+
+@bp.cli.command("bench-serving")
+@click.option("--requests", "requests_count", default=2000, show_default=True, help="Requests per view.")
+@click.option("--concurrency", default=32, show_default=True, help="Concurrent client connections.")
+@click.option("--streams", default=0, show_default=True, help="Idle /live streams held open during the run.")
+@click.option("--events", default=50, show_default=True, help="Synthetic events to seed.")
+def bench_serving(requests_count, concurrency, streams, events):
+    """Compare requests/sec and p99 of the WSGI and ASGI serving modes."""
+    import servebench
+
+    results = servebench.compare(
+        current_app._get_current_object(), events=events, requests=requests_count, concurrency=concurrency, streams=streams
+    )
+    click.echo(
+        f"{'mode':<6} {'view':<14} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} "
+        f"{'rss MB':>7} {'threads':>8}"
+    )
+    for mode, views in results.items():
+        if views is None:
+            click.echo(f"{mode:<6} skipped (install uvicorn, asgiref and aiosqlite)")
+            continue
+        for view, stats in views.items():
+            rss = f"{stats['rss_mb']:.0f}" if stats["rss_mb"] is not None else "-"
+            click.echo(
+                f"{mode:<6} {view:<14} {stats['rps']:>8.0f} {stats['p50'] * 1000:>8.1f} "
+                f"{stats['p99'] * 1000:>8.1f} {stats['errors']:>7} {rss:>7} {stats['threads'] or '-':>8}"
+            )
+
+@bp.cli.command("build-assets")
+@click.option("--no-subset", is_flag=True, help="Copy the fonts as they are (no fonttools needed).")
+def build_assets(no_subset):
+    """Bundle, minify and fingerprint static/ into static/dist/; precompile the templates."""
+    from assets import build
+
+    report = build(
+        current_app.static_folder, os.path.join(current_app.root_path, current_app.template_folder),
+        static_url=current_app.static_url_path, subset_fonts=not no_subset,
+    )
+    for built, before, after in report:
+        click.echo(f"{built:<52} {before / 1024:>9.1f} KB -> {after / 1024:>8.1f} KB")
+    before, after = sum(r[1] for r in report), sum(r[2] for r in report)
+    click.echo(f"{len(report)} files, {before / 1024:.1f} KB -> {after / 1024:.1f} KB")
+    if current_app.config["JINJA_CACHE_DIR"]:
+        compiled = precompile_templates(current_app)
+        click.echo(f"{compiled} templates compiled into {current_app.config['JINJA_CACHE_DIR']}")
+    click.echo("Restart the server to serve the new manifest.")
+
+@bp.cli.command("bench-startup")
+@click.option("--runs", default=5, show_default=True, help="Cold starts per variant.")
+@click.option("--path", default="/game-plan", show_default=True, help="Page requested first.")
+@click.option("--max-import-ms", type=float, default=1500, show_default=True,
+              help="Exit 1 when the median import of app.py is slower.")
+@click.option("--max-first-response-ms", type=float, default=3000, show_default=True,
+              help="Exit 1 when the median spawn-to-first-200 of a server is slower.")
+def bench_startup(runs, path, max_import_ms, max_first_response_ms):
+    """Report import time and time-to-first-response of a cold worker."""
+    import startbench
+
+    results = startbench.run(path=path, runs=runs)
+    click.echo(f"{'variant':<12} {'stage':<15} {'median ms':>10} {'max ms':>10}")
+    for variant, stages in results.items():
+        for stage, timing in stages.items():
+            click.echo(f"{variant:<12} {stage:<15} {timing['median'] * 1000:>10.1f} {timing['max'] * 1000:>10.1f}")
+
+    measured = results["precompiled"]
+    failed = False
+    for stage, limit in (("import", max_import_ms), ("first_response", max_first_response_ms)):
+        if measured[stage]["median"] * 1000 > limit:
+            click.echo(f"FAIL: {stage} median exceeds {limit:.0f} ms")
+            failed = True
+    if failed:
+        raise SystemExit(1)
+
+@bp.cli.command("bench-joins")
+@click.option("--events", default=100, show_default=True, help="Events in the seeded season.")
+@click.option("--players", default=24, show_default=True, help="Players per event.")
+@click.option("--matches", default=60, show_default=True, help="Doubles matches per event.")
+@click.option("--repeat", default=5, show_default=True, help="Timed passes over the sampled players.")
+def bench_joins(events, players, matches, repeat):
+    """Time the reads and size the match tables at 0007 (string ids), 0008 (integer keys) and 0010 (normalized)."""
+    import schemabench
+
+    report = schemabench.run(events=events, players=players, matches=matches, repeat=repeat)
+    revisions = schemabench.REVISIONS
+    click.echo(f"{report['matches']} matches")
+    click.echo(f"{'revision':<9} {'rows':>8} {'per match':>10} {'size KiB':>9} {'migrate s':>10}  tables")
+    for revision in revisions:
+        entry = report["revisions"][revision]
+        rows = sum(entry["rows"].values())
+        migrate = "" if entry["migrate_s"] is None else f"{entry['migrate_s']:.2f}"
+        tables = ", ".join(f"{table} {count}" for table, count in entry["rows"].items())
+        click.echo(
+            f"{revision:<9} {rows:>8} {rows / report['matches']:>10.1f} {entry['bytes'] // 1024:>9} "
+            f"{migrate:>10}  {tables}"
+        )
+    click.echo(f"{'query ms':<20} " + " ".join(f"{revision:>8}" for revision in revisions) + f" {'vs ' + revisions[-2]:>8}")
+    for name, timings in report["queries"].items():
+        before, after = timings[revisions[-2]], timings[revisions[-1]]
+        click.echo(
+            f"{name:<20} " + " ".join(f"{timings[revision]:>8.3f}" for revision in revisions)
+            + f" {before / after:>7.1f}x"
+        )
+    for name, micros in report["ids"].items():
+        click.echo(f"match id, {name:<14} {micros:>8.1f} us")
+
+@bp.cli.command("export")
+@click.argument("dataset", type=click.Choice(list(DATASETS)))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default="csv", show_default=True)
+@click.option("--output", "-o", type=click.File("wb"), default="-", help="File to write (default: stdout).")
+@click.option("--game-id", default=None, help="Only this event.")
+@click.option("--host", default=None, help="Only events hosted by this email.")
+@click.option("--since", default=None, help="ISO date or datetime, inclusive.")
+@click.option("--until", default=None, help="ISO date or datetime, inclusive.")
+@click.option("--chunk-size", default=2000, show_default=True, help="Rows fetched and written at a time.")
+def export_command(dataset, fmt, output, game_id, host, since, until, chunk_size):
+    """Stream seats, matches or standings out of the database."""
+    try:
+        chunks = stream_export(
+            dataset, fmt, chunk_size,
+            game_id=game_id, host=host, since=parse_when(since), until=parse_when(until, end=True),
+        )
+    except ValueError as exc:
+        raise click.ClickException(str(exc))
+    except ImportError:
+        raise click.ClickException("Parquet export needs pyarrow (pip install pyarrow)")
+    for data in chunks:
+        output.write(data)
+
+@bp.cli.command("import")
+@click.argument("kind", type=click.Choice(["roster", "matches"]))
+@click.argument("source", type=click.File("rb"))
+@click.option("--format", "fmt", type=click.Choice(importer.FORMATS), default=None,
+              help="Default: from the file extension.")
+@click.option("--game-id", default=None, help="Event whose roster a roster file replaces.")
+@click.option("--host", default=None, help="Host email of the events a matches file creates.")
+@click.option("--batch-size", default=importer.BATCH_SIZE, show_default=True, help="Matches per INSERT.")
+@click.option("--dry-run", is_flag=True, help="Validate and write, then roll back.")
+def import_command(kind, source, fmt, game_id, host, batch_size, dry_run):
+    """Load a roster or historical matches from CSV or JSON Lines (SOURCE may be - for stdin)."""
+    fmt = fmt or importer.format_for(source.name)
+    if fmt is None:
+        raise click.ClickException("Cannot tell the format from the file name; pass --format")
+    records = importer.read_records(source, fmt)
+    try:
+        if kind == "roster":
+            if not game_id or resolve_event_pk(game_id) is None:
+                raise click.ClickException("A roster import needs the --game-id of an existing event")
+            names = importer.read_roster(records)
+            importer.write_roster(game_id, names)
+            bump_event_version(game_id)
+            # The live state restarts from the new roster (for a shared event store)
+            current_app.extensions["event_store"].save(game_id, new_event_state())
+            summary = {"players": len(names)}
+        else:
+            def progress(read, matches):
+                click.echo(f"\r{read} records read, {matches} matches written", nl=False, err=True)
+
+            summary = importer.MatchImporter(host=host, batch_size=batch_size, progress=progress).run(records)
+            click.echo(err=True)
+    except (importer.ImportRejected, UnicodeDecodeError, csv.Error) as exc:
+        db.session.rollback()
+        click.echo(err=True)
+        for problem in _import_problems(exc):
+            click.echo(problem, err=True)
+        raise click.ClickException("Nothing was imported")
+    except importer.RosterLocked as exc:
+        db.session.rollback()
+        raise click.ClickException(str(exc))
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            for event_key, created in value.items():
+                click.echo(f"{key}: {event_key} -> {created}")
+        elif isinstance(value, list):
+            click.echo(f"{key}: {', '.join(value) or '-'}")
+        else:
+            click.echo(f"{key}: {value}")
+    if dry_run:
+        click.echo("dry run: rolled back")
+
 # -------------------- Run --------------------
+# Servers load wsgi:app (gunicorn wsgi:app, flask run) or asgi:application;
+# `python app.py` is the debug server.
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,262 @@
+"""ASGI entry point: async read views in front of the Flask app.
+
+    uvicorn asgi:application
+    MATCHMAKER_LIVE_FEED=redis://localhost:6379/0 uvicorn asgi:application --workers 4
+
+Run more than one worker only with the live feed on Redis (or an event
+store on Redis, which the feed then shares): otherwise /live updates fan
+out within one process, and a stream never sees scores posted through
+another worker (see livefeed.py). create_app warns when that can happen.
+
+The leaderboard, player stats, score reads and /live streams are served by
+coroutines on an async SQLAlchemy session, so slow phones and idle
+spectator screens cost a task rather than a thread. Every other request
+(and any read the async path cannot answer, e.g. an event that still needs
+its standings rebuilt) falls through to the Flask app unchanged. The async
+views share the Flask views' ETags and page cache (pagecache.py).
+
+Needs ``asgiref`` (``flask[async]``), ``greenlet`` and the async driver for
+the configured database: ``aiosqlite`` or ``psycopg`` (v3).
+"""
+import asyncio
+import json
+import re
+
+import sqlalchemy as sa
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from flask import request, session
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import (
+    cached_page, create_app, leaderboard_key, live_feed, live_game, render_leaderboard, render_player_stats,
+)
+from dbconfig import apply_sqlite_pragmas, async_database_url
+import metrics
+from livefeed import HEARTBEAT_SECONDS
+from pagecache import event_version_async
+from models import db, GameInfo, Player, event_pk
+from player_stats import load_player_stats_async
+from scoring import match_score_async
+from standings import ranked_standings_async
+
+app = create_app()
+
+with app.app_context():
+    # Flask-SQLAlchemy has already resolved relative SQLite paths
+    _sync_url = db.engine.url.render_as_string(hide_password=False)
+
+async_engine = create_async_engine(async_database_url(_sync_url), **app.config["SQLALCHEMY_ENGINE_OPTIONS"])
+apply_sqlite_pragmas(async_engine.sync_engine, app.config.get("SQLITE_PRAGMAS"))
+metrics.instrument_engine(async_engine.sync_engine)
+AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+_flask = WsgiToAsgi(app)
+
+
+def _request_context(scope):
+    """A Flask request context for ``scope`` so session, url_for and templates work."""
+    headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in scope["headers"]]
+    host = next((value for name, value in headers if name.lower() == "host"), "localhost")
+    return app.test_request_context(
+        scope["path"],
+        base_url=f"{scope.get('scheme', 'http')}://{host}{scope.get('root_path', '')}",
+        query_string=scope.get("query_string", b"").decode("latin-1"),
+        headers=headers,
+    )
+
+
+async def _respond(send, body, content_type, status=200):
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type.encode("latin-1")),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_response(send, response):
+    """Send a Flask response built by the async views (e.g. from cached_page)."""
+    await send({
+        "type": "http.response.start",
+        "status": response.status_code,
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in response.headers.items()],
+    })
+    await send({"type": "http.response.body", "body": response.get_data()})
+
+
+async def _game(db_session, game_id):
+    return (await db_session.scalars(sa.select(GameInfo).where(GameInfo.game_id == game_id).limit(1))).first()
+
+
+# -------------------- Async views --------------------
+# Each returns True once it has responded, or False to hand the request to Flask.
+async def leaderboard(scope, receive, send):
+    with _request_context(scope):
+        game_id = request.args.get("game_id") or session.get("current_game_id")
+        if not game_id:
+            return False
+        async with AsyncSession() as db_session:
+            version = await event_version_async(db_session, game_id)
+            if version is None:
+                return False
+            key = leaderboard_key(game_id, version)
+            response = cached_page(key)
+            if response is None:
+                game = await _game(db_session, game_id)
+                rows = await ranked_standings_async(db_session, game_id)
+                if not rows:
+                    return False
+                response = cached_page(key, lambda: render_leaderboard(game, rows))
+    await _send_response(send, response)
+    return True
+
+
+async def player_stats(scope, receive, send, player_id):
+    with _request_context(scope):
+        game_id = session.get("current_game_id")
+        if not game_id or not session.get("event_completed"):
+            return False
+        async with AsyncSession() as db_session:
+            version = await event_version_async(db_session, game_id)
+            if version is None:
+                return False
+            key = ("player-stats", game_id, version, player_id)
+            response = cached_page(key)
+            if response is None:
+                game = await _game(db_session, game_id)
+                player = (await db_session.scalars(
+                    sa.select(Player).where(Player.event_pk == event_pk(game_id), Player.player_id == player_id).limit(1)
+                )).first()
+                loaded = await load_player_stats_async(db_session, game_id, player_id) if player else None
+                if not loaded:
+                    return False
+                response = cached_page(key, lambda: render_player_stats(game, player, loaded))
+    await _send_response(send, response)
+    return True
+
+
+async def match_score(scope, receive, send, match_id):
+    """Score of the caller's live match (the Flask route also handles writes)."""
+    with _request_context(scope):
+        game_id = session.get("current_game_id")
+        if not game_id:
+            return False
+        # The event store is synchronous (SQL or Redis); keep it off the loop
+        event = await asyncio.to_thread(app.extensions["event_store"].load, game_id)
+    if live_game(event, match_id) is None:
+        return False
+    async with AsyncSession() as db_session:
+        score = await match_score_async(db_session, match_id)
+    await _respond(send, json.dumps(score, separators=(",", ":")), "application/json")
+    return True
+
+
+async def _until_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def live_stream(scope, receive, send, game_id):
+    async with AsyncSession() as db_session:
+        if not await db_session.scalar(sa.select(GameInfo.game_id).where(GameInfo.game_id == game_id)):
+            return False
+
+    subscriber = live_feed.subscribe_async(game_id)
+    disconnected = asyncio.ensure_future(_until_disconnect(receive))
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b"retry: 3000\n\n", "more_body": True})
+        while True:
+            getter = asyncio.ensure_future(subscriber.get(timeout=HEARTBEAT_SECONDS))
+            await asyncio.wait({getter, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                getter.cancel()
+                break
+            frame = getter.result()
+            await send({
+                "type": "http.response.body",
+                "body": frame if frame is not None else b": keep-alive\n\n",
+                "more_body": True,
+            })
+    finally:
+        disconnected.cancel()
+        live_feed.unsubscribe(subscriber)
+    return True
+
+
+ROUTES = [
+    (re.compile(r"^/leaderboard$"), leaderboard),
+    (re.compile(r"^/player-stats/(?P<player_id>[^/]+)$"), player_stats),
+    (re.compile(r"^/api/matches/(?P<match_id>[^/]+)/score$"), match_score),
+    (re.compile(r"^/live/(?P<game_id>[^/]+)$"), live_stream),
+]
+# Metric route names: the same as the Flask endpoints they stand in for
+ROUTE_NAMES = {
+    leaderboard: "leaderboard",
+    player_stats: "player_stats_view",
+    match_score: "match_score_api",
+    live_stream: "live_stream",
+}
+
+
+def _timed_send(send, route, game_id):
+    """``send`` that records the request's metrics when the response starts.
+
+    Timing to the start of the response keeps a /live stream's hours
+    open out of the latency histogram.
+    """
+    stats = metrics.start_request()
+
+    async def timed(message):
+        if message["type"] == "http.response.start":
+            metrics.finish_request(stats, route, route, message["status"])
+            if game_id:
+                metrics.active_events.touch(game_id)
+        await send(message)
+
+    return timed
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await async_engine.dispose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+
+    if scope["type"] == "http" and scope["method"] == "GET":
+        for pattern, view in ROUTES:
+            match = pattern.match(scope["path"])
+            if match:
+                timed = _timed_send(send, ROUTE_NAMES[view], match.groupdict().get("game_id"))
+                if await view(scope, receive, timed, **match.groupdict()):
+                    return
+                break
+
+    # Each fall-through request gets its own worker thread rather than
+    # asgiref's single shared one, so Flask requests still run in parallel.
+    async with ThreadSensitiveContext():
+        await _flask(scope, receive, send)
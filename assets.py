@@ -0,0 +1,342 @@
+"""Build step for static/: subset WOFF2 fonts, per-page bundles, hashed names.
+
+    flask build-assets
+
+writes ``static/dist/`` and ``static/dist/manifest.json``. The manifest maps
+each source name a template asks ``url_for('static', ...)`` for to its built
+file, so templates keep their source names:
+
+* ``css/<page>.css`` -> one minified sheet holding fonts.css, header.css and
+  the page (index.css has no header), so a page costs one CSS request;
+* ``js/*.js`` and ``images/*`` -> minified or copied under a content hash;
+* fonts referenced from fonts.css -> subset to Latin plus every character
+  the templates and scripts use, converted to WOFF2 (needs ``fonttools``
+  and ``brotli``). Player names are typed in at the venue, so the subset
+  keeps whole Latin blocks rather than only the glyphs seen at build time.
+
+Built names change whenever their content does, so they are served with
+``Cache-Control: immutable``.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+
+SHARED_CSS = ("css/fonts.css", "css/header.css")
+# Sheets of pages that do not extend base.html, so they skip header.css
+STANDALONE_CSS = {"css/index.css": ("css/fonts.css", "css/index.css")}
+
+# Basic Latin, Latin-1, Latin Extended-A, punctuation, euro and trade mark signs
+FONT_UNICODES = (
+    list(range(0x20, 0x7F)) + list(range(0xA0, 0x180))
+    + list(range(0x2010, 0x2028)) + list(range(0x2030, 0x203B)) + [0x20AC, 0x2122]
+)
+
+_CSS_URL = re.compile(
+    r"""url\(\s*(['"]?)(?P<path>[^'")]+)\1\s*\)(?P<format>\s*format\(\s*['"]truetype['"]\s*\))?"""
+)
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def hashed_name(name, data, ext=None):
+    stem, source_ext = os.path.splitext(name)
+    return f"{DIST_DIR}/{stem}.{content_hash(data)}{ext or source_ext}"
+
+
+def load_manifest(static_folder):
+    """{source name: built name}, or {} when the assets have not been built."""
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)) as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+
+
+# -------------------- Minifiers --------------------
+_CSS_TOKENS = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|(\s+)|([^"'/\s]+|/)""", re.S)
+_CSS_TIGHT = set("{};,>")
+
+
+def minify_css(source):
+    """Drop comments and redundant whitespace; strings and url()s are kept as written."""
+    out = []
+    pending_space = False
+    for string, comment, space, text in _CSS_TOKENS.findall(source):
+        if comment:
+            continue
+        if space:
+            pending_space = True
+            continue
+        token = string or text
+        if pending_space and out and out[-1][-1] not in _CSS_TIGHT | {":", "("} and token[0] not in _CSS_TIGHT | {")"}:
+            out.append(" ")
+        pending_space = False
+        out.append(token)
+    css = "".join(out).replace(";}", "}")
+    return css + "\n"
+
+
+_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "void", "yield",
+                   "await", "delete", "instanceof", "new", "throw"}
+_IDENT = re.compile(r"[\w$]")
+
+
+def _regex_allowed(out):
+    """Whether a ``/`` after the code in ``out`` starts a regex literal."""
+    text = "".join(out[-8:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in _REGEX_AFTER:
+        return True
+    word = re.search(r"[\w$]+$", text)
+    return bool(word) and word.group() in _REGEX_KEYWORDS
+
+
+def _skip_quoted(source, i, quote):
+    """Index just past the string starting at ``source[i]``."""
+    i += 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_regex(source, i):
+    i += 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            while i < len(source) and _IDENT.match(source[i]):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def _minify_js_code(source, i, out, in_template=False):
+    """Copy code from ``source[i:]`` into ``out``; stops after the ``}`` closing a ``${``."""
+    depth = 0
+    n = len(source)
+    while i < n:
+        char = source[i]
+        if char in " \t\r\n":
+            j = i
+            while j < n and source[j] in " \t\r\n":
+                j += 1
+            # Keep line breaks so automatic semicolon insertion is unchanged
+            gap = "\n" if "\n" in source[i:j] else " "
+            if out and out[-1] not in ("\n", " "):
+                out.append(gap)
+            elif out and gap == "\n":
+                out[-1] = "\n"
+            i = j
+        elif char in "\"'":
+            j = _skip_quoted(source, i, char)
+            out.append(source[i:j])
+            i = j
+        elif char == "`":
+            i = _minify_js_template(source, i, out)
+        elif char == "/" and source.startswith("//", i):
+            j = source.find("\n", i)
+            i = n if j < 0 else j
+        elif char == "/" and source.startswith("/*", i):
+            j = source.find("*/", i + 2)
+            i = n if j < 0 else j + 2
+            if out and out[-1] not in ("\n", " "):
+                out.append(" ")
+        elif char == "/" and _regex_allowed(out):
+            j = _skip_regex(source, i)
+            out.append(source[i:j])
+            i = j
+        else:
+            if in_template and char == "{":
+                depth += 1
+            elif in_template and char == "}":
+                if depth == 0:
+                    out.append(char)
+                    return i + 1
+                depth -= 1
+            out.append(char)
+            i += 1
+    return i
+
+
+def _minify_js_template(source, i, out):
+    """Copy a template literal verbatim, minifying the code inside its ``${}``s."""
+    start = i
+    i += 1
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+        elif char == "`":
+            out.append(source[start:i + 1])
+            return i + 1
+        elif source.startswith("${", i):
+            out.append(source[start:i + 2])
+            i = _minify_js_code(source, i + 2, out, in_template=True)
+            start = i
+        else:
+            i += 1
+    out.append(source[start:])
+    return i
+
+
+def minify_js(source):
+    """Strip comments and indentation; literals and line breaks are kept."""
+    out = []
+    _minify_js_code(source, 0, out)
+    return "".join(out).strip() + "\n"
+
+
+# -------------------- Fonts --------------------
+def used_characters(static_folder, template_folder):
+    """Every character in the templates and scripts, so icons and separators survive subsetting."""
+    chars = set()
+    for folder, ext in ((template_folder, ".html"), (os.path.join(static_folder, "js"), ".js")):
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(ext):
+                with open(os.path.join(folder, name), encoding="utf-8") as source:
+                    chars.update(source.read())
+    return {ord(c) for c in chars if ord(c) >= 0x20}
+
+
+def subset_font(path, unicodes):
+    """WOFF2 bytes of the font at ``path`` holding only ``unicodes``."""
+    import io
+    import logging
+
+    from fontTools import subset
+
+    # Tables it cannot subset (e.g. meta) are dropped, and it says so per font
+    logging.getLogger("fontTools.subset").setLevel(logging.ERROR)
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    font = subset.load_font(path, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    subset.save_font(font, buffer, options)
+    return buffer.getvalue()
+
+
+# -------------------- Build --------------------
+class Builder:
+    def __init__(self, static_folder, template_folder, static_url="/static", subset_fonts=True):
+        self.static_folder = static_folder
+        self.template_folder = template_folder
+        self.static_url = static_url.rstrip("/")
+        self.subset_fonts = subset_fonts
+        self.manifest = {}
+        self.report = []  # (built name, source bytes, built bytes)
+        self._unicodes = None
+
+    def _read(self, name):
+        with open(os.path.join(self.static_folder, name), "rb") as source:
+            return source.read()
+
+    def _write(self, built, data, source_size):
+        path = os.path.join(self.static_folder, built)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as target:
+            target.write(data)
+        self.report.append((built, source_size, len(data)))
+        return built
+
+    def _url(self, built):
+        return f"{self.static_url}/{built}"
+
+    def font(self, name):
+        if name in self.manifest:
+            return self.manifest[name]
+        data = self._read(name)
+        built_data, ext = data, None
+        if self.subset_fonts:
+            if self._unicodes is None:
+                self._unicodes = sorted(set(FONT_UNICODES) | used_characters(self.static_folder, self.template_folder))
+            built_data, ext = subset_font(os.path.join(self.static_folder, name), self._unicodes), ".woff2"
+        self.manifest[name] = self._write(hashed_name(name, built_data, ext), built_data, len(data))
+        return self.manifest[name]
+
+    def file(self, name):
+        """A copy of ``name`` under its content hash (scripts minified)."""
+        data = self._read(name)
+        built_data = minify_js(data.decode("utf-8")).encode("utf-8") if name.endswith(".js") else data
+        self.manifest[name] = self._write(hashed_name(name, built_data), built_data, len(data))
+        return self.manifest[name]
+
+    def _rewrite_urls(self, css):
+        prefix = self.static_url + "/"
+
+        def replace(match):
+            path = match.group("path")
+            if not path.startswith(prefix):
+                return match.group(0)
+            name = path[len(prefix):]
+            if name.startswith("fonts/"):
+                built = self.font(name)
+                woff2 = built.endswith(".woff2")
+                fmt = ' format("woff2")' if woff2 else (match.group("format") or "")
+                return f'url("{self._url(built)}"){fmt}'
+            built = self.manifest.get(name) or self.file(name)
+            return f'url("{self._url(built)}"){match.group("format") or ""}'
+
+        return _CSS_URL.sub(replace, css)
+
+    def stylesheet(self, name, parts):
+        sources = [self._read(part) for part in parts]
+        css = "\n".join(source.decode("utf-8") for source in sources)
+        built_data = minify_css(self._rewrite_urls(css)).encode("utf-8")
+        self.manifest[name] = self._write(hashed_name(name, built_data), built_data, sum(map(len, sources)))
+        return self.manifest[name]
+
+    def bundles(self):
+        """{page sheet: the sheets bundled into it, in cascade order}."""
+        bundles = {}
+        for name in sorted(os.listdir(os.path.join(self.static_folder, "css"))):
+            source = f"css/{name}"
+            if not name.endswith(".css"):
+                continue
+            if source in SHARED_CSS:
+                bundles[source] = (source,)
+            else:
+                bundles[source] = STANDALONE_CSS.get(source, SHARED_CSS + (source,))
+        return bundles
+
+    def build(self):
+        dist = os.path.join(self.static_folder, DIST_DIR)
+        shutil.rmtree(dist, ignore_errors=True)
+
+        for folder in ("images", "js"):
+            for name in sorted(os.listdir(os.path.join(self.static_folder, folder))):
+                self.file(f"{folder}/{name}")
+        for name, parts in self.bundles().items():
+            self.stylesheet(name, parts)
+
+        with open(os.path.join(dist, MANIFEST_NAME), "w") as manifest:
+            json.dump(self.manifest, manifest, indent=2, sort_keys=True)
+        return self.report
+
+
+def build(static_folder, template_folder, static_url="/static", subset_fonts=True):
+    """Rebuild static/dist/; returns [(built name, source bytes, built bytes)]."""
+    return Builder(static_folder, template_folder, static_url, subset_fonts).build()
@@ -0,0 +1,93 @@
+import os
+
+import sqlalchemy as sa
+
+from models import db
+
+DEFAULT_DATABASE_URL = "sqlite:///matchmaker.db"
+
+
+def _env_int(env, name, default):
+    value = env.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def database_url(env=os.environ):
+    """MATCHMAKER_DATABASE_URL, then DATABASE_URL, then the local SQLite file."""
+    url = env.get("MATCHMAKER_DATABASE_URL") or env.get("DATABASE_URL") or DEFAULT_DATABASE_URL
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+# Async drivers used by asgi.py for each sync backend
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "psycopg_async"}
+
+
+def async_database_url(url):
+    """The same database as ``url`` through its async driver."""
+    parsed = sa.engine.make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {backend} databases")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def sqlite_pragmas(env=os.environ):
+    """Pragmas run on every new SQLite connection."""
+    return {
+        "journal_mode": env.get("MATCHMAKER_SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": env.get("MATCHMAKER_SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": _env_int(env, "MATCHMAKER_DB_TIMEOUT", 5) * 1000,
+        "cache_size": _env_int(env, "MATCHMAKER_SQLITE_CACHE_SIZE", -20000),  # KiB when negative
+        "mmap_size": _env_int(env, "MATCHMAKER_SQLITE_MMAP_SIZE", 128 * 1024 * 1024),
+        "temp_store": "MEMORY",
+    }
+
+
+def engine_options(url, env=os.environ):
+    """SQLALCHEMY_ENGINE_OPTIONS for ``url``: pool sizing and timeouts from the environment."""
+    timeout = _env_int(env, "MATCHMAKER_DB_TIMEOUT", 5)
+    backend = sa.engine.make_url(url).get_backend_name()
+    options = {"pool_pre_ping": backend != "sqlite"}
+
+    in_memory = backend == "sqlite" and sa.engine.make_url(url).database in (None, "", ":memory:")
+    if not in_memory:
+        options.update(
+            pool_size=_env_int(env, "MATCHMAKER_DB_POOL_SIZE", 5),
+            max_overflow=_env_int(env, "MATCHMAKER_DB_MAX_OVERFLOW", 10),
+            pool_timeout=_env_int(env, "MATCHMAKER_DB_POOL_TIMEOUT", 30),
+            pool_recycle=_env_int(env, "MATCHMAKER_DB_POOL_RECYCLE", 1800),
+        )
+
+    if backend == "sqlite":
+        options["connect_args"] = {"timeout": timeout}
+    elif backend == "postgresql":
+        options["connect_args"] = {
+            "connect_timeout": timeout,
+            "options": f"-c statement_timeout={_env_int(env, 'MATCHMAKER_DB_STATEMENT_TIMEOUT', 30) * 1000}",
+        }
+    return options
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run ``pragmas`` on every connection ``engine`` opens (no-op for other databases)."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @sa.event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def init_db(app):
+    """Bind ``db`` to ``app`` and tune its engine from app.config."""
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config["SQLALCHEMY_DATABASE_URI"]))
+    db.init_app(app)
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config.get("SQLITE_PRAGMAS"))
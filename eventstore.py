@@ -0,0 +1,321 @@
+import datetime
+import json
+import socket
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+
+import sqlalchemy as sa
+
+from models import EventState, now_jakarta
+
+def new_event_state():
+    # pending_courts / queued_games: the other courts' games of a multi-court round,
+    # drawn and waiting to start / started and waiting for their result
+    return {
+        "players": [], "games": [], "pending_game": None, "active_game": None,
+        "pending_courts": [], "queued_games": [],
+    }
+
+
+# -------------------- Compact encoding --------------------
+def _encode_game(game, index):
+    if not game:
+        return game
+    encoded = dict(game)
+    encoded["teams"] = [
+        [index.get(name, name) for name in team]
+        for team in game.get("teams") or []
+    ]
+    return encoded
+
+
+def _decode_game(game, players):
+    if not game:
+        return game
+    game["teams"] = [
+        [players[p] if isinstance(p, int) and 0 <= p < len(players) else p for p in team]
+        for team in game.get("teams") or []
+    ]
+    return game
+
+
+def encode_state(state: dict) -> bytes:
+    """Serialize event state, storing team members as indices into ``players``."""
+    players = list(state.get("players") or [])
+    index = {name: i for i, name in enumerate(players)}
+    payload = {
+        "players": players,
+        "games": [_encode_game(game, index) for game in state.get("games") or []],
+        "pending_game": _encode_game(state.get("pending_game"), index),
+        "active_game": _encode_game(state.get("active_game"), index),
+        "pending_courts": [_encode_game(game, index) for game in state.get("pending_courts") or []],
+        "queued_games": [_encode_game(game, index) for game in state.get("queued_games") or []],
+    }
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def decode_state(raw) -> dict:
+    state = new_event_state()
+    if not raw:
+        return state
+    payload = json.loads(raw)
+    players = payload.get("players") or []
+    state["players"] = players
+    state["games"] = [_decode_game(game, players) for game in payload.get("games") or []]
+    state["pending_game"] = _decode_game(payload.get("pending_game"), players)
+    state["active_game"] = _decode_game(payload.get("active_game"), players)
+    state["pending_courts"] = [_decode_game(game, players) for game in payload.get("pending_courts") or []]
+    state["queued_games"] = [_decode_game(game, players) for game in payload.get("queued_games") or []]
+    return state
+
+
+# -------------------- Backends --------------------
+class MemoryBackend:
+    """Per-process LRU; fine for a single worker or development."""
+
+    def __init__(self, max_events=1024):
+        self.max_events = max_events
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            raw = self._data.get(key)
+            if raw is not None:
+                self._data.move_to_end(key)
+            return raw
+
+    def set(self, key, raw):
+        with self._lock:
+            self._data[key] = raw
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_events:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLBackend:
+    """Rows in the event_state table of the app database.
+
+    Uses its own short transaction so saving state never commits, or waits
+    on, the request's ORM session. With a ``ttl`` (seconds) a row expires
+    that long after its last save, as a Redis key would; ``set`` purges
+    expired rows at most every ``purge_every`` seconds.
+    """
+
+    def __init__(self, get_engine, ttl=None, purge_every=3600):
+        self._get_engine = get_engine
+        self.table = EventState.__table__
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._purged_at = None
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        table = self.table
+        with self._get_engine().connect() as conn:
+            return conn.execute(
+                sa.select(table.c.payload).where(
+                    table.c.event_key == key,
+                    sa.or_(table.c.expires_at.is_(None), table.c.expires_at > now_jakarta()),
+                )
+            ).scalar()
+
+    def set(self, key, raw):
+        now = now_jakarta()
+        expires_at = now + datetime.timedelta(seconds=self.ttl) if self.ttl else None
+        values = {"payload": raw, "updated_at": now, "expires_at": expires_at}
+        with self._get_engine().begin() as conn:
+            updated = conn.execute(
+                sa.update(self.table).where(self.table.c.event_key == key).values(**values)
+            ).rowcount
+            if not updated:
+                conn.execute(sa.insert(self.table).values(event_key=key, **values))
+        with self._lock:
+            due = self._purged_at is None or (now - self._purged_at).total_seconds() >= self.purge_every
+            if due:
+                self._purged_at = now
+        if due:
+            self.purge()
+
+    def purge(self):
+        """Delete expired rows; returns how many."""
+        with self._get_engine().begin() as conn:
+            return conn.execute(
+                sa.delete(self.table).where(self.table.c.expires_at <= now_jakarta())
+            ).rowcount
+
+    def delete(self, key):
+        with self._get_engine().begin() as conn:
+            conn.execute(sa.delete(self.table).where(self.table.c.event_key == key))
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend:
+    """Minimal RESP client (GET/SET/DEL, any other command(), PSUBSCRIBE) for Redis or a stand-in."""
+
+    def __init__(self, host="localhost", port=6379, db=0, password=None,
+                 ttl=None, timeout=2.0, prefix="matchmaker:event:"):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.ttl = ttl
+        self.timeout = timeout
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        try:
+            if self.password:
+                self._send("AUTH", self.password)
+            if self.db:
+                self._send("SELECT", self.db)
+        except BaseException:
+            # Never leave an unauthenticated or wrong-database connection cached
+            self._close()
+            raise
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                self._local.reader.close()
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def _read_reply(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body
+        if kind == b"-":
+            raise RedisError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def _send(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._local.sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def command(self, *args):
+        for attempt in (1, 2):
+            if getattr(self._local, "sock", None) is None:
+                self._connect()
+            try:
+                return self._send(*args)
+            except (ConnectionError, OSError):
+                self._close()
+                if attempt == 2:
+                    raise
+
+    def subscribe(self, pattern, ready=None):
+        """Yield (channel, message) for a PSUBSCRIBE to ``pattern``, blocking between messages.
+
+        Runs on this thread's connection, which then serves nothing else;
+        it is closed when the generator is. ``ready`` is called once the
+        subscription is confirmed.
+        """
+        self._close()
+        self._connect()
+        try:
+            self._send("PSUBSCRIBE", pattern)
+            self._local.sock.settimeout(None)
+            if ready is not None:
+                ready()
+            while True:
+                reply = self._read_reply()
+                if reply and reply[0] == b"pmessage":
+                    yield reply[2], reply[3]
+        finally:
+            self._close()
+
+    def get(self, key):
+        return self.command("GET", self.prefix + key)
+
+    def set(self, key, raw):
+        if self.ttl:
+            self.command("SET", self.prefix + key, raw, "EX", int(self.ttl))
+        else:
+            self.command("SET", self.prefix + key, raw)
+
+    def delete(self, key):
+        self.command("DEL", self.prefix + key)
+
+
+# -------------------- Store --------------------
+class EventStore:
+    """Server-side state of live events, keyed by game_id."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def load(self, game_id) -> dict:
+        if not game_id:
+            return new_event_state()
+        return decode_state(self.backend.get(game_id))
+
+    def save(self, game_id, state: dict) -> int:
+        """Store ``state``; returns its encoded size in bytes."""
+        raw = encode_state(state)
+        self.backend.set(game_id, raw)
+        return len(raw)
+
+    def delete(self, game_id):
+        self.backend.delete(game_id)
+
+
+def create_event_store(url, get_engine=None, ttl=None):
+    """Build a store from a URL: sql (default), redis://host:port/db, or memory[://?size=N]."""
+    parsed = urlparse(url or "sql")
+    scheme = parsed.scheme or parsed.path
+    if scheme == "memory":
+        size = int(parse_qs(parsed.query).get("size", ["1024"])[0])
+        return EventStore(MemoryBackend(size))
+    if scheme in {"sql", "sqlite"}:
+        if get_engine is None:
+            raise ValueError("The SQL event store needs a database engine")
+        return EventStore(SQLBackend(get_engine, ttl=ttl))
+    if scheme == "redis":
+        return EventStore(redis_backend(url, ttl=ttl))
+    raise ValueError(f"Unknown event store: {url}")
+
+
+def redis_backend(url, **options):
+    """A RedisBackend for redis://[:password@]host:port/db; ``options`` go to its constructor."""
+    parsed = urlparse(url)
+    return RedisBackend(
+        host=parsed.hostname or "localhost",
+        port=parsed.port or 6379,
+        db=int(parsed.path.strip("/") or 0),
+        password=parsed.password,
+        **options,
+    )
@@ -0,0 +1,267 @@
+"""Streaming export of match history (CSV, JSON Lines, Parquet).
+
+Each dataset is one Core SELECT over the normalized match tables, run with
+``yield_per`` so the driver hands rows over in chunks (a server-side
+cursor where the database has one) instead of loading the result. Every
+chunk is encoded and yielded as bytes before the next one is fetched, so
+memory stays at one chunk whatever the size of the export. Rows are
+ordered by the key of the table the join is driven from (match_players,
+match_sides, standings: all in match order), so the database streams them
+without sorting the whole result first.
+
+Datasets:
+    seats      one row per player per match, with the side's score and result
+    matches    one row per match, both scores and the winner
+    standings  one row per player per event, the stored totals
+
+Parquet needs pyarrow, which is imported only when asked for.
+"""
+import csv
+import datetime
+import importlib
+import io
+import json
+
+import sqlalchemy as sa
+from sqlalchemy.orm import aliased
+
+from models import db, GameInfo, Match, MatchPlayer, MatchSide, Person, Player, Standing
+from ratings import host_key
+
+CHUNK_SIZE = 2000
+FORMATS = ("csv", "jsonl", "parquet")
+MIMETYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+# -------------------- Datasets --------------------
+def _seats():
+    opponent = aliased(MatchSide)
+    columns = [
+        ("event_id", GameInfo.game_id, "str"),
+        ("match_id", Match.match_id, "str"),
+        ("game_no", Match.game_no, "int"),
+        ("court_no", Match.court_no, "str"),
+        ("start_at", Match.start_at, "datetime"),
+        ("end_at", Match.end_at, "datetime"),
+        ("duration_seconds", Match.duration_seconds, "int"),
+        ("side", MatchSide.side, "str"),
+        ("score", MatchSide.score, "int"),
+        ("opponent_score", opponent.score, "int"),
+        ("result", MatchSide.result, "str"),
+        ("player_code", MatchPlayer.player_code, "str"),
+        ("player_match_number", MatchPlayer.player_match_number, "int"),
+        ("player_id", Player.player_id, "str"),
+        ("player_name", Player.player_name, "str"),
+        ("person_id", Person.person_id, "str"),
+    ]
+    stmt = (
+        sa.select(*(expr for _, expr, _ in columns))
+        .select_from(Match)
+        .join(GameInfo, GameInfo.id == Match.event_pk)
+        .join(MatchSide, MatchSide.match_pk == Match.id)
+        .join(opponent, sa.and_(opponent.match_pk == Match.id, opponent.side != MatchSide.side))
+        .join(MatchPlayer, MatchPlayer.side_pk == MatchSide.id)
+        .outerjoin(Player, Player.id == MatchPlayer.player_pk)
+        .outerjoin(Person, Person.id == Player.person_pk)
+        .order_by(MatchPlayer.id)
+    )
+    return columns, stmt, Match.start_at
+
+
+def _matches():
+    side_a, side_b = aliased(MatchSide), aliased(MatchSide)
+    winner = sa.case(
+        (side_a.result == "W", "A"),
+        (side_b.result == "W", "B"),
+        (side_a.result == "T", "T"),
+    )
+    columns = [
+        ("event_id", GameInfo.game_id, "str"),
+        ("event_name", GameInfo.game_name, "str"),
+        ("match_id", Match.match_id, "str"),
+        ("game_no", Match.game_no, "int"),
+        ("court_no", Match.court_no, "str"),
+        ("start_at", Match.start_at, "datetime"),
+        ("end_at", Match.end_at, "datetime"),
+        ("duration_seconds", Match.duration_seconds, "int"),
+        ("score_a", side_a.score, "int"),
+        ("score_b", side_b.score, "int"),
+        ("winner", winner, "str"),
+    ]
+    stmt = (
+        sa.select(*(expr for _, expr, _ in columns))
+        .select_from(Match)
+        .join(GameInfo, GameInfo.id == Match.event_pk)
+        .join(side_a, sa.and_(side_a.match_pk == Match.id, side_a.side == "A"))
+        .join(side_b, sa.and_(side_b.match_pk == Match.id, side_b.side == "B"))
+        .order_by(side_a.id)
+    )
+    return columns, stmt, Match.start_at
+
+
+def _standings():
+    columns = [
+        ("event_id", GameInfo.game_id, "str"),
+        ("event_name", GameInfo.game_name, "str"),
+        ("event_date", GameInfo.created_at, "datetime"),
+        ("player_code", Standing.player_code, "str"),
+        ("player_id", Player.player_id, "str"),
+        ("player_name", Standing.player_name, "str"),
+        ("person_id", Person.person_id, "str"),
+        ("games", Standing.games, "int"),
+        ("wins", Standing.wins, "int"),
+        ("losses", Standing.losses, "int"),
+        ("ties", Standing.ties, "int"),
+        ("points", Standing.points, "int"),
+        ("point_diff", Standing.point_diff, "int"),
+        ("seconds_played", Standing.seconds_played, "int"),
+    ]
+    stmt = (
+        sa.select(*(expr for _, expr, _ in columns))
+        .select_from(Standing)
+        .join(GameInfo, GameInfo.id == Standing.event_pk)
+        .join(Player, Player.id == Standing.player_pk)
+        .outerjoin(Person, Person.id == Player.person_pk)
+        .order_by(Standing.id)
+    )
+    return columns, stmt, GameInfo.created_at
+
+
+DATASETS = {"seats": _seats, "matches": _matches, "standings": _standings}
+
+
+def parse_when(value, end=False):
+    """An ISO date or datetime; with ``end``, a bare date means the end of that day."""
+    if not value:
+        return None
+    when = datetime.datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        when += datetime.timedelta(days=1) - datetime.timedelta(microseconds=1)
+    return when
+
+
+def export_query(dataset, game_id=None, since=None, until=None, host=None):
+    """(columns, statement) for ``dataset``; columns are (name, expression, kind).
+
+    ``since`` and ``until`` bound the match start (the event date for
+    standings), both inclusive; ``host`` is the host's email, in any case.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset {dataset!r}; choose from {', '.join(DATASETS)}")
+    columns, stmt, dated = DATASETS[dataset]()
+    if game_id:
+        stmt = stmt.where(GameInfo.game_id == game_id)
+    if host:
+        # As ratings.host_key folds it; SQL LOWER agrees with casefold() on ASCII addresses
+        stmt = stmt.where(sa.func.lower(sa.func.trim(GameInfo.host_email)) == host_key(host))
+    if since:
+        stmt = stmt.where(dated >= since)
+    if until:
+        stmt = stmt.where(dated <= until)
+    return columns, stmt
+
+
+def row_chunks(stmt, chunk_size=CHUNK_SIZE):
+    """The statement's rows as lists of at most ``chunk_size`` tuples."""
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    try:
+        for chunk in result.partitions():
+            yield chunk
+    finally:
+        result.close()
+
+
+# -------------------- Encoders --------------------
+def _cell(value):
+    return value.isoformat(sep=" ") if isinstance(value, datetime.datetime) else value
+
+
+def _csv(columns, chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([name for name, _, _ in columns])
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _jsonl(columns, chunks):
+    names = [name for name, _, _ in columns]
+    for chunk in chunks:
+        yield "".join(
+            json.dumps(dict(zip(names, map(_cell, row))), ensure_ascii=False) + "\n" for row in chunk
+        ).encode()
+
+
+class _Spool:
+    """A write-only file that hands back whatever was written since the last drain."""
+
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def _parquet(columns, chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"str": pa.string(), "int": pa.int64(), "float": pa.float64(), "datetime": pa.timestamp("us")}
+    schema = pa.schema([(name, types[kind]) for name, _, kind in columns])
+    spool = _Spool()
+    writer = pq.ParquetWriter(spool, schema, compression="zstd")
+    try:
+        for chunk in chunks:  # one row group per chunk
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)],
+                schema=schema,
+            ))
+            yield spool.drain()
+    finally:
+        writer.close()
+    yield spool.drain()
+
+
+ENCODERS = {"csv": _csv, "jsonl": _jsonl, "parquet": _parquet}
+
+
+def stream_export(dataset, fmt, chunk_size=CHUNK_SIZE, **filters):
+    """Bytes of the export, chunk by chunk; see export_query for ``filters``.
+
+    Raises ValueError for an unknown dataset or format and ImportError when
+    Parquet is asked for without pyarrow, before any row is read.
+    """
+    if fmt not in ENCODERS:
+        raise ValueError(f"Unknown format {fmt!r}; choose from {', '.join(FORMATS)}")
+    if fmt == "parquet":
+        importlib.import_module("pyarrow.parquet")  # fail now, not halfway through a response
+    columns, stmt = export_query(dataset, **filters)
+    return (data for data in ENCODERS[fmt](columns, row_chunks(stmt, chunk_size)) if data)
@@ -0,0 +1,504 @@
+"""Bulk import of rosters and historical matches (CSV or JSON Lines).
+
+Records are read, validated and written in one streaming pass: valid
+matches collect into batches of ``batch_size``, and each batch is written
+in its own savepoint with one executemany INSERT per table (events,
+players, matches, sides, seats); the new keys are read back by public id.
+Nothing is committed here. When any record is invalid, ImportRejected lists
+them and the caller rolls the whole import back. After the last batch, each
+touched event's standings are rebuilt once, and the ratings are replayed
+from the earliest imported match on; older ratings are left alone.
+
+Roster records (CSV columns or JSON keys):
+    name          the player's name (also accepted: player_name)
+
+Match records:
+    event         game_id of an existing event, or any other key: the first
+                  record with a new key creates an event for it
+    event_name    new events only; defaults to the key
+    place, host   new events only; host defaults to the importer's ``host``
+    game_no       defaults to the event's next game number
+    court         defaults to "A"
+    start_at      ISO datetime (Asia/Jakarta unless it has an offset)
+    end_at        ISO datetime, or
+    duration_seconds
+    team_a        names separated by "/" (a JSON list in JSON Lines)
+    team_b
+    score_a       whole numbers; equal scores are a tie
+    score_b
+
+Names not yet on an event's roster are added to it.
+"""
+import csv
+import datetime
+import io
+import json
+import os
+import time
+from collections import Counter
+
+import sqlalchemy as sa
+
+from models import (
+    db, GameInfo, JAKARTA_TZ, Match, MatchPlayer, MatchSide, Player, Standing,
+    generate_game_id, generate_match_id, generate_player_id, resolve_event_pk,
+)
+from pagecache import bump_event_version
+from ratings import host_key, link_people, name_key, person_pks, rebuild_ratings
+from standings import drawn_counts, rebuild_standings, seed_standings
+
+BATCH_SIZE = 1000
+MAX_ERRORS = 50  # records reported back; the rest are only counted
+FORMATS = ("csv", "jsonl")
+EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl"}
+TEAM_SEPARATOR = "/"
+
+
+class ImportRejected(Exception):
+    """The import had invalid records; ``errors`` holds (line, message) for the first MAX_ERRORS."""
+
+    def __init__(self, errors, count):
+        super().__init__(f"{count} invalid record{'s' if count != 1 else ''}")
+        self.errors = errors
+        self.count = count
+
+
+class RosterLocked(Exception):
+    """The event already has drawn matches, whose seats a new roster would delete."""
+
+
+def format_for(filename):
+    """The import format of a file name by its extension, or None."""
+    return EXTENSIONS.get(os.path.splitext(filename or "")[1].lower())
+
+
+def read_records(stream, fmt):
+    """(line number, record) for each record of a binary CSV or JSON Lines stream.
+
+    A line that is not a JSON object comes through as (line number, None).
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_no, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield line_no, record if isinstance(record, dict) else None
+    finally:
+        text.detach()  # leave the caller's stream open
+
+
+# -------------------- Fields --------------------
+def _text(record, *keys):
+    for key in keys:
+        value = record.get(key)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return None
+
+
+def _whole(record, key, required=True):
+    value = _text(record, key)
+    if value is None:
+        if required:
+            raise ValueError(f"{key} is required")
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{key} must be a whole number, not {value!r}") from None
+    if number < 0:
+        raise ValueError(f"{key} cannot be negative")
+    return number
+
+
+def _when(record, key, required=True):
+    value = _text(record, key)
+    if value is None:
+        if required:
+            raise ValueError(f"{key} is required")
+        return None
+    try:
+        when = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{key} must be an ISO date and time, not {value!r}") from None
+    if when.tzinfo is not None:
+        when = when.astimezone(JAKARTA_TZ).replace(tzinfo=None)
+    return when
+
+
+def _team(record, key):
+    value = record.get(key)
+    names = value if isinstance(value, list) else str(value or "").split(TEAM_SEPARATOR)
+    names = [" ".join(str(name).split()) for name in names]
+    names = [name for name in names if name]
+    if not names:
+        raise ValueError(f"{key} needs at least one player")
+    for name in names:
+        if len(name) > 255:
+            raise ValueError(f"{key}: name longer than 255 characters")
+    return names
+
+
+# -------------------- Rosters --------------------
+def write_roster(game_id, names):
+    """Replace the event's roster with ``names`` as P-01, P-02, ... and zero its standings (no commit).
+
+    Raises RosterLocked once the event has drawn a match: deleting its
+    players would cascade into the matches' seats.
+    """
+    event_key = resolve_event_pk(game_id)
+    if db.session.scalar(sa.select(Match.id).where(Match.event_pk == event_key).limit(1)) is not None:
+        raise RosterLocked(f"Event {game_id} already has drawn matches; its roster can no longer be replaced")
+    Standing.query.filter(Standing.event_pk == event_key).delete()
+    Player.query.filter(Player.event_pk == event_key).delete()
+
+    players = [
+        Player(player_code=f"P-{idx:02}", player_name=name, event_pk=event_key)
+        for idx, name in enumerate(names, start=1)
+    ]
+    db.session.add_all(players)
+    db.session.flush()
+    link_people(players)
+    seed_standings(game_id, players)
+    return players
+
+
+def read_roster(records):
+    """Validated player names from roster records, in file order.
+
+    Raises ImportRejected for empty, overlong or repeated names.
+    """
+    names, seen, errors, count = [], {}, [], 0
+    for line_no, record in records:
+        name = _text(record, "name", "player_name") if record is not None else None
+        name = " ".join(name.split()) if name else None
+        if name is None:
+            problem = "name is required" if record is not None else "not a JSON object"
+        elif len(name) > 255:
+            problem = "name longer than 255 characters"
+        elif name_key(name) in seen:
+            problem = f"{name!r} is already on line {seen[name_key(name)]}"
+        else:
+            seen[name_key(name)] = line_no
+            names.append(name)
+            continue
+        count += 1
+        if len(errors) < MAX_ERRORS:
+            errors.append((line_no, problem))
+    if count:
+        raise ImportRejected(errors, count)
+    return names
+
+
+# -------------------- Matches --------------------
+class _Event:
+    """An event the import writes to, with its roster by name."""
+
+    def __init__(self, key, host, pk=None, game_id=None, row=None):
+        self.key = key
+        self.host = host  # host email: people are linked within one host's events
+        self.pk = pk
+        self.game_id = game_id
+        self.row = row  # GameInfo columns while the event is still to be inserted
+        self.roster = {}  # name: _Player
+        self.next_code = 1
+        self.next_game_no = 1
+        self.drawn = Counter()  # player name: matches drawn
+        self.matches = 0
+        self.seconds = 0
+
+    @property
+    def created(self):
+        return self.key != self.game_id
+
+
+class _Player:
+    """A roster entry; ``totals`` are its standing in an event the import creates."""
+
+    __slots__ = ("pk", "code", "name", "totals")
+
+    def __init__(self, pk, code, name):
+        self.pk = pk
+        self.code = code
+        self.name = name
+        self.totals = Counter()
+
+    def record(self, result, score, opponent_score, seconds):
+        totals = self.totals
+        totals["games"] += 1
+        totals[{"W": "wins", "L": "losses", "T": "ties"}[result]] += 1
+        totals["points"] += score
+        totals["point_diff"] += score - opponent_score
+        totals["seconds_played"] += seconds or 0
+
+
+class MatchImporter:
+    """Streams match records into the database; see the module docstring for the fields.
+
+    ``host`` is the host email of events the import creates when their
+    records have none. ``progress(records, matches)`` is called after
+    every batch.
+    """
+
+    def __init__(self, host=None, batch_size=BATCH_SIZE, progress=None):
+        self.host = host
+        self.batch_size = max(batch_size, 1)
+        self.progress = progress
+        self.events = {}  # record key: _Event
+        self.batch = []
+        self.new_events = []
+        self.new_players = []  # (_Event, _Player)
+        self.errors = []
+        self.error_count = 0
+        self.records = 0
+        self.matches = 0
+        self.first_end = None  # end of the earliest match written
+        self.players_added = 0
+
+    def run(self, records):
+        """Import ``records`` ((line number, record) pairs); returns a summary dict (no commit)."""
+        started = time.perf_counter()
+        for line_no, record in records:
+            self.records += 1
+            try:
+                if record is None:
+                    raise ValueError("not a JSON object")
+                self.batch.append(self._parse(record))
+            except ValueError as exc:
+                self.error_count += 1
+                if len(self.errors) < MAX_ERRORS:
+                    self.errors.append((line_no, str(exc)))
+                continue
+            if len(self.batch) >= self.batch_size:
+                self._flush()
+        self._flush()
+        if self.error_count:
+            raise ImportRejected(self.errors, self.error_count)
+
+        touched = [event for event in self.events.values() if event.pk is not None]
+        self._write_standings([event for event in touched if event.created])
+        for event in touched:
+            if not event.created:  # earlier matches count too
+                rebuild_standings(event.game_id)
+                bump_event_version(event.game_id)
+        if self.matches:
+            # Rate what was imported; ratings from before its first match stay as they are
+            rebuild_ratings(since=self.first_end)
+        return {
+            "records": self.records,
+            "matches": self.matches,
+            "players_added": self.players_added,
+            "events_created": {e.key: e.game_id for e in touched if e.created},
+            "events_updated": [e.game_id for e in touched if not e.created],
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    # ---------------------------------------------------------------
+    def _event(self, record):
+        key = _text(record, "event", "event_id", "game_id")
+        if key is None:
+            raise ValueError("event is required")
+        event = self.events.get(key)
+        if event is not None:
+            return event
+
+        existing = GameInfo.query.filter_by(game_id=key).first()
+        if existing is not None:
+            event = _Event(key, existing.host_email, existing.id, existing.game_id)
+            players = Player.query.filter(Player.event_pk == existing.id).all()
+            event.roster = {p.player_name: _Player(p.id, p.player_code, p.player_name) for p in players}
+            event.next_code = len(players) + 1
+            event.next_game_no = 1 + (db.session.scalar(
+                sa.select(sa.func.max(Match.game_no)).where(Match.event_pk == existing.id)
+            ) or 0)
+            by_pk = {p.id: p.player_name for p in players}
+            event.drawn.update({by_pk[pk]: n for pk, n in drawn_counts(key).items() if pk in by_pk})
+        else:
+            host = _text(record, "host", "host_email") or self.host
+            if host is None:
+                raise ValueError(f"host is required for the new event {key!r}")
+            event = _Event(key, host, row={
+                "game_name": (_text(record, "event_name") or key)[:255],
+                "game_place": (_text(record, "place") or "")[:255],
+                "host_email": host[:255],
+                "created_at": _when(record, "start_at"),
+            })
+            self.new_events.append(event)
+        self.events[key] = event
+        return event
+
+    def _seat(self, event, name):
+        player = event.roster.get(name)
+        if player is None:
+            player = event.roster[name] = _Player(None, f"P-{event.next_code:02}", name)
+            event.next_code += 1
+            self.new_players.append((event, player))
+        event.drawn[name] += 1
+        return player, event.drawn[name]
+
+    def _parse(self, record):
+        start_at = _when(record, "start_at")
+        end_at = _when(record, "end_at", required=False)
+        seconds = _whole(record, "duration_seconds", required=False)
+        if end_at is None:
+            end_at = start_at + datetime.timedelta(seconds=seconds or 0)
+        elif end_at < start_at:
+            raise ValueError("end_at is before start_at")
+        elif seconds is None:
+            seconds = int((end_at - start_at).total_seconds())
+        score_a = _whole(record, "score_a")
+        score_b = _whole(record, "score_b")
+        teams = [_team(record, "team_a"), _team(record, "team_b")]
+        names = teams[0] + teams[1]
+        if len(set(names)) != len(names):
+            raise ValueError("a player is on the court twice")
+        court = (_text(record, "court", "court_no") or "A")[:5]
+        game_no = _whole(record, "game_no", required=False)
+        if game_no == 0:
+            raise ValueError("game_no starts at 1")
+
+        # Nothing below can fail: only now does the record touch the event's roster
+        event = self._event(record)
+        if game_no is None:
+            game_no = event.next_game_no
+        event.next_game_no = max(event.next_game_no, game_no + 1)
+        if score_a == score_b:
+            results = ("T", "T")
+        else:
+            results = ("W", "L") if score_a > score_b else ("L", "W")
+        sides = [
+            ("A", score_a, results[0], [self._seat(event, name) for name in teams[0]]),
+            ("B", score_b, results[1], [self._seat(event, name) for name in teams[1]]),
+        ]
+        event.matches += 1
+        event.seconds += seconds or 0
+        for (_, score, result, seats), (_, opponent_score, _, _) in zip(sides, reversed(sides)):
+            for player, _ in seats:
+                player.record(result, score, opponent_score, seconds)
+        return {
+            "event": event,
+            "game_no": game_no,
+            "court_no": court,
+            "start_at": start_at,
+            "end_at": end_at,
+            "duration_seconds": seconds,
+            "sides": sides,
+        }
+
+    @property
+    def connection(self):
+        """The session's connection: Core inserts skip the ORM's per-row bookkeeping."""
+        return db.session.connection()
+
+    def _write_standings(self, events):
+        """Standings and court time of the events this import created, from the running totals."""
+        rows = [
+            {"event_pk": event.pk, "player_pk": player.pk, "player_code": player.code,
+             "player_name": player.name, "matches_drawn": player.totals["games"],
+             **{column: player.totals[column] for column in (
+                 "games", "wins", "losses", "ties", "points", "point_diff", "seconds_played")}}
+            for event in events
+            for player in event.roster.values()
+        ]
+        if rows:
+            self.connection.execute(sa.insert(Standing.__table__), rows)
+        if events:
+            table = GameInfo.__table__
+            self.connection.execute(
+                sa.update(table).where(table.c.id == sa.bindparam("pk"))
+                .values(matches_finished=sa.bindparam("matches"), court_seconds=sa.bindparam("seconds")),
+                [{"pk": event.pk, "matches": event.matches, "seconds": event.seconds} for event in events],
+            )
+
+    def _insert(self, model, rows, key):
+        """INSERT ``rows`` in one executemany; returns {their ``key`` column: new primary key}.
+
+        The keys are read back by the unique ``key`` the rows carry: RETURNING
+        in parameter order runs one statement per row on SQLite.
+        """
+        table = model.__table__
+        self.connection.execute(sa.insert(table), rows)
+        return dict(self.connection.execute(
+            sa.select(table.c[key], table.c.id).where(table.c[key].in_([row[key] for row in rows]))
+        ).all())
+
+    def _flush(self):
+        """Write the pending events, players and matches: one savepoint, one executemany per table.
+
+        The savepoint keeps a failed batch from leaving half its rows in
+        the import's transaction, which is still committed or rolled back
+        as a whole by the caller.
+        """
+        if self.error_count:  # rolled back in the end anyway: just validate the rest
+            self.batch = []
+            return
+        with db.session.begin_nested():
+            self._write_batch()
+        self.matches += len(self.batch)
+        if self.batch:
+            first_end = min(m["end_at"] for m in self.batch)
+            self.first_end = first_end if self.first_end is None else min(self.first_end, first_end)
+        self.batch = []
+        if self.progress:
+            self.progress(self.records, self.matches)
+
+    def _write_batch(self):
+        """The INSERTs of one _flush; new keys are read back by public id."""
+        if self.new_events:
+            for event in self.new_events:
+                event.row["game_id"] = generate_game_id()
+            keys = self._insert(GameInfo, [event.row for event in self.new_events], "game_id")
+            for event in self.new_events:
+                event.game_id = event.row["game_id"]
+                event.pk, event.row = keys[event.game_id], None
+            self.new_events = []
+
+        if self.new_players:
+            people = person_pks((event.host, player.name) for event, player in self.new_players)
+            rows = [
+                {"player_id": generate_player_id(), "player_code": player.code, "player_name": player.name,
+                 "event_pk": event.pk, "person_pk": people.get((host_key(event.host), name_key(player.name)))}
+                for event, player in self.new_players
+            ]
+            keys = self._insert(Player, rows, "player_id")
+            for (_, player), row in zip(self.new_players, rows):
+                player.pk = keys[row["player_id"]]
+            self.players_added += len(self.new_players)
+            self.new_players = []
+
+        if not self.batch:
+            return
+        rows = [
+            {"match_id": generate_match_id(), "event_pk": m["event"].pk, "game_no": m["game_no"],
+             "court_no": m["court_no"], "start_at": m["start_at"], "end_at": m["end_at"],
+             "duration_seconds": m["duration_seconds"]}
+            for m in self.batch
+        ]
+        keys = self._insert(Match, rows, "match_id")
+        sides = [(keys[row["match_id"]], side) for row, m in zip(rows, self.batch) for side in m["sides"]]
+        self.connection.execute(sa.insert(MatchSide.__table__), [
+            {"match_pk": match_pk, "side": side, "score": score, "result": result}
+            for match_pk, (side, score, result, _) in sides
+        ])
+        side_pks = {
+            (match_pk, side): pk
+            for pk, match_pk, side in self.connection.execute(
+                sa.select(MatchSide.id, MatchSide.match_pk, MatchSide.side)
+                .where(MatchSide.match_pk.in_(list(keys.values())))
+            )
+        }
+        self.connection.execute(sa.insert(MatchPlayer.__table__), [
+            {"side_pk": side_pks[match_pk, side], "player_pk": player.pk, "player_code": player.code,
+             "player_match_number": number}
+            for match_pk, (side, _, _, seats) in sides
+            for player, number in seats
+        ])
@@ -0,0 +1,261 @@
+"""Fan-out of live event updates to Server-Sent Events streams.
+
+One ``Publisher`` per process formats each update once and hands the same
+bytes to every subscriber of that event. WSGI streams block on a small
+queue, so they are cheap under an async worker (e.g. ``gunicorn -k
+gevent``), where each idle connection is a greenlet rather than a thread;
+under asgi.py each stream is a coroutine on an ``AsyncSubscriber``.
+
+Without a bus the frames stay in the process that published them, so a
+stream only sees updates posted to its own worker. With a ``RedisBus``
+every worker publishes through Redis and relays what any worker published
+to its own subscribers; the latest frames live in Redis too.
+"""
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+
+from eventstore import RedisError, redis_backend
+
+HEARTBEAT_SECONDS = 15
+RELAY_RETRY_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+class Subscriber:
+    """One open stream; drops its oldest frame rather than stall the publisher."""
+
+    def __init__(self, game_id, max_pending=64):
+        self.game_id = game_id
+        self._queue = queue.Queue(max_pending)
+
+    def put(self, frame):
+        while True:
+            try:
+                self._queue.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscriber:
+    """A stream served by a coroutine (asgi.py); frames cross into its event loop."""
+
+    def __init__(self, game_id, loop, max_pending=64):
+        self.game_id = game_id
+        self._loop = loop
+        self._queue = asyncio.Queue(max_pending)
+
+    def _put(self, frame):
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(frame)
+
+    def put(self, frame):
+        try:
+            self._loop.call_soon_threadsafe(self._put, frame)
+        except RuntimeError:  # loop already closed
+            pass
+
+    async def get(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisBus:
+    """Carries frames between workers: Redis pub/sub, and a hash per event of its latest frames."""
+
+    def __init__(self, client, prefix="matchmaker:live:", ttl=None):
+        self.client = client  # an eventstore.RedisBackend
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def next_id(self):
+        return self.client.command("INCR", self.prefix + "seq")
+
+    def publish(self, game_id, event, frame):
+        key = self.prefix + "latest:" + game_id
+        self.client.command("HSET", key, event, frame)
+        if self.ttl:
+            self.client.command("EXPIRE", key, int(self.ttl))
+        self.client.command("PUBLISH", self.prefix + "event:" + game_id, frame)
+
+    def latest(self, game_id):
+        reply = self.client.command("HGETALL", self.prefix + "latest:" + game_id) or []
+        return dict(zip(reply[::2], reply[1::2]))
+
+    def forget(self, game_id):
+        self.client.command("DEL", self.prefix + "latest:" + game_id)
+
+    def listen(self, ready=None):
+        """Yield (game_id, frame) for every frame any worker publishes; blocks between them.
+
+        ``ready`` is called once the subscription is in place.
+        """
+        channels = self.prefix + "event:"
+        for channel, frame in self.client.subscribe(channels + "*", ready=ready):
+            yield channel.decode("utf-8")[len(channels):], frame
+
+
+def create_bus(url, ttl=None):
+    """A RedisBus for redis://host:port/db, or None for "local" (frames stay in this process)."""
+    if not url or url == "local":
+        return None
+    if not url.startswith("redis://"):
+        raise ValueError(f"Unknown live feed: {url}")
+    return RedisBus(redis_backend(url), ttl=ttl)
+
+
+BUS_ERRORS = (RedisError, ConnectionError, OSError)
+
+
+class Publisher:
+    """Broadcast per-event updates; keeps the latest frame of each kind for new subscribers.
+
+    With a ``bus`` the frames go through it, so every worker's streams see them.
+    """
+
+    def __init__(self, bus=None):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._latest = {}
+        self._seq = 0
+        self.bus = bus
+        self._relaying = None  # the bus the relay thread listens to
+
+    def use(self, bus):
+        """Publish through ``bus`` from now on (None: this process only)."""
+        with self._lock:
+            self.bus = bus
+
+    def subscribe(self, game_id, subscriber=None):
+        subscriber = subscriber or Subscriber(game_id)
+        latest = None
+        if self.bus is not None:
+            self._start_relay()
+            try:
+                latest = self.bus.latest(game_id)
+            except BUS_ERRORS as exc:
+                logger.warning("Live feed bus unavailable, replaying this worker's frames only: %s", exc)
+        with self._lock:
+            self._subscribers.setdefault(game_id, set()).add(subscriber)
+            if latest is None:
+                latest = self._latest.get(game_id, {})
+            for frame in latest.values():
+                subscriber.put(frame)
+        return subscriber
+
+    def subscribe_async(self, game_id):
+        """Subscribe from a coroutine; ``await subscriber.get(timeout)`` yields frames."""
+        return self.subscribe(game_id, AsyncSubscriber(game_id, asyncio.get_running_loop()))
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.game_id)
+            if subscribers:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.game_id]
+
+    def publish(self, game_id, event, data):
+        """Send ``data`` as an ``event`` frame to every subscriber of ``game_id``.
+
+        Through the bus when there is one: this worker's subscribers then get
+        the frame from the relay, like everyone else's. Returns the number of
+        this worker's subscribers.
+        """
+        if self.bus is not None:
+            try:
+                self.bus.publish(game_id, event, format_sse(event, data, self.bus.next_id()))
+                return self.subscriber_count(game_id)
+            except BUS_ERRORS as exc:
+                logger.warning("Live feed bus unavailable, publishing to this worker only: %s", exc)
+        with self._lock:
+            self._seq += 1
+            frame = format_sse(event, data, self._seq)
+            self._latest.setdefault(game_id, {})[event] = frame
+        return self._deliver(game_id, frame)
+
+    def _deliver(self, game_id, frame):
+        with self._lock:
+            subscribers = list(self._subscribers.get(game_id, ()))
+        for subscriber in subscribers:
+            subscriber.put(frame)
+        return len(subscribers)
+
+    def _start_relay(self):
+        """Relay the bus's frames to this worker's subscribers; started once per bus.
+
+        Waits briefly for the relay to be subscribed, so the first stream
+        does not miss what is published right after it opens.
+        """
+        with self._lock:
+            bus = self.bus
+            if self._relaying is bus:
+                return
+            self._relaying = bus
+        ready = threading.Event()
+        threading.Thread(target=self._relay, args=(bus, ready), name="live-feed-relay", daemon=True).start()
+        ready.wait(RELAY_RETRY_SECONDS)
+
+    def _relay(self, bus, ready):
+        # Frames published while reconnecting are missed; the next one of each kind catches up
+        while self.bus is bus:
+            try:
+                for game_id, frame in bus.listen(ready=ready.set):
+                    if self.bus is not bus:
+                        return
+                    self._deliver(game_id, frame)
+            except BUS_ERRORS as exc:
+                logger.warning("Live feed relay lost the bus, reconnecting: %s", exc)
+            time.sleep(RELAY_RETRY_SECONDS)
+
+    def forget(self, game_id):
+        """Drop the retained frames of a finished event."""
+        with self._lock:
+            self._latest.pop(game_id, None)
+        if self.bus is not None:
+            try:
+                self.bus.forget(game_id)
+            except BUS_ERRORS as exc:
+                logger.warning("Live feed bus unavailable, frames of %s kept there: %s", game_id, exc)
+
+    def subscriber_count(self, game_id=None):
+        with self._lock:
+            if game_id is not None:
+                return len(self._subscribers.get(game_id, ()))
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    def stream(self, subscriber, heartbeat=HEARTBEAT_SECONDS):
+        """Yield SSE frames for ``subscriber`` until the client goes away."""
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                frame = subscriber.get(timeout=heartbeat)
+                yield frame if frame is not None else b": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
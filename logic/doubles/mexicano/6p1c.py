@@ -1,41 +1,36 @@
 import random
 
-MAX_CONSECUTIVE = 2
-
-
-def _consecutive_games(player: str, games: list[dict]) -> int:
-    count = 0
-    for game in reversed(games):
-        teams = game.get("teams") or []
-        if any(player in team for team in teams):
-            count += 1
-        else:
-            break
-    return count
+from logic.state import SchedulerState, flatten, winners
 
+MAX_CONSECUTIVE = 2
+ACCEPTS_PAIRER = True
+ACCEPTS_RNG = True
 
-def _flatten(game: dict) -> list[str]:
-    teams = game.get("teams") or []
-    flat = []
-    for team in teams:
-        flat.extend(team)
-    return flat
 
-def _ensure_four(selected: list[str], players: list[str]) -> list[str]:
+def _ensure_four(selected: list[str], players: list[str], rng=random) -> list[str]:
     pool = [p for p in players if p not in selected]
-    random.shuffle(pool)
+    rng.shuffle(pool)
     while len(selected) < 4 and pool:
         selected.append(pool.pop())
     if len(selected) < 4:
         # last resort: allow duplicates removal by restarting from scratch
         shuffled = players[:]
-        random.shuffle(shuffled)
+        rng.shuffle(shuffled)
         selected = shuffled[:4]
     return selected[:4]
 
 
-def next_game(players, games, force_no=None):
-    """Generate next game for 6 players (1 court) with winner-stay Mexicano rule."""
+def next_game(players, games, force_no=None, state=None, pairer=None, max_consecutive=MAX_CONSECUTIVE,
+              rng=random):
+    """Generate next game for 6 players (1 court) with winner-stay Mexicano rule.
+
+    ``state`` is the event's SchedulerState; it is rebuilt from ``games``
+    when the caller does not keep one. A ``pairer`` (logic.pairing) splits
+    the four into teams, and picks the first game's four, instead of a
+    shuffle. Nobody is drawn more than ``max_consecutive`` games in a row
+    while someone else can take the seat. Shuffles use ``rng`` (a
+    random.Random) when given, else the global ``random``.
+    """
 
     if len(players) < 4:
         raise ValueError("Mexicano doubles requires at least 4 players")
@@ -47,81 +42,79 @@ def next_game(players, games, force_no=None):
     else:
         game_no = 1
 
+    if state is None:
+        state = SchedulerState.from_games(players, games)
+
     # First game is a simple shuffle
-    if not games:
+    if not state.last_game:
+        if pairer is not None:
+            return {"game_no": game_no, "teams": pairer.assign([[]], [], list(players), 2)[0]}
         shuffled = players[:]
-        random.shuffle(shuffled)
+        rng.shuffle(shuffled)
         return {
             "game_no": game_no,
             "teams": [shuffled[:2], shuffled[2:4]],
         }
 
-    last_game = games[-1]
-    last_players = _flatten(last_game)
+    last_game = state.last_game
+    last_players = flatten(last_game)
     if len(last_players) < 4:
         shuffled = players[:]
-        random.shuffle(shuffled)
+        rng.shuffle(shuffled)
         return {
             "game_no": game_no,
             "teams": [shuffled[:2], shuffled[2:4]],
         }
 
-    winner_side = last_game.get("winner")
-    teams = last_game.get("teams") or []
-    if winner_side in {"A", "B"}:
-        winners = list(teams[0 if winner_side == "A" else 1])
-    else:
-        winners = list(teams[0]) if teams else []
+    stay_winners = winners(last_game)
+    winner_lookup = set(stay_winners)
+    last_lookup = set(last_players)
 
-    losers = [p for p in last_players if p not in winners]
-    bench_players = [p for p in players if p not in last_players]
+    losers = [p for p in last_players if p not in winner_lookup]
+    bench_players = [p for p in players if p not in last_lookup]
 
-    consec = {p: _consecutive_games(p, games) for p in players}
+    consec = state.consecutive
 
     stay_players = []
     resting_winners = []
-    for winner in winners:
-        if consec.get(winner, 0) >= MAX_CONSECUTIVE:
+    for winner in stay_winners:
+        if consec.get(winner, 0) >= max_consecutive:
             resting_winners.append(winner)
         else:
             stay_players.append(winner)
 
     selected = stay_players[:]
+    chosen = set(selected)
 
     def pick_from_pool(pool, allow_limit=False):
-        nonlocal selected
         for player in pool:
-            if player in selected:
+            if player in chosen:
                 continue
-            if not allow_limit and consec.get(player, 0) >= MAX_CONSECUTIVE:
+            if not allow_limit and consec.get(player, 0) >= max_consecutive:
                 continue
             selected.append(player)
+            chosen.add(player)
             if len(selected) == 4:
                 return True
         return False
 
-    primary_pool = [p for p in bench_players if p not in selected]
-    pick_from_pool(primary_pool)
+    pick_from_pool(bench_players)
 
     if len(selected) < 4:
-        pick_from_pool(primary_pool, allow_limit=True)
+        pick_from_pool(bench_players, allow_limit=True)
 
     if len(selected) < 4:
-        loser_pool = [p for p in losers if p not in selected]
-        pick_from_pool(loser_pool)
+        pick_from_pool(losers)
 
     if len(selected) < 4:
-        loser_pool_limit = [p for p in losers if p not in selected]
-        pick_from_pool(loser_pool_limit, allow_limit=True)
+        pick_from_pool(losers, allow_limit=True)
 
     if len(selected) < 4:
-        rest_pool = [p for p in players if p not in selected]
-        pick_from_pool(rest_pool, allow_limit=True)
+        pick_from_pool(players, allow_limit=True)
 
     if len(selected) < 4:
-        selected = _ensure_four(selected, players)
+        selected = _ensure_four(selected, players, rng)
 
-    stay_lookup = set(stay_players)
     team_a = []
     team_b = []
 
@@ -131,8 +124,15 @@ def next_game(players, games, force_no=None):
         elif not team_b:
             team_b.append(winner)
 
-    others = [p for p in selected if p not in set(team_a + team_b)]
-    random.shuffle(others)
+    seated = set(team_a + team_b)
+    others = [p for p in selected if p not in seated]
+    if pairer is not None and len(selected) == 4:
+        team_a, team_b = pairer.assign([team_a + team_b], others, [], 2)[0]
+        return {
+            "game_no": game_no,
+            "teams": [team_a, team_b],
+        }
+    rng.shuffle(others)
 
     for player in others:
         if len(team_a) < 2:
@@ -145,7 +145,7 @@ def next_game(players, games, force_no=None):
 
     if len(team_a) < 2 or len(team_b) < 2:
         fallback = selected[:]
-        fallback = _ensure_four(fallback, players)
+        fallback = _ensure_four(fallback, players, rng)
         team_a = fallback[:2]
         team_b = fallback[2:4]
 
@@ -0,0 +1,150 @@
+import random
+
+from logic.state import SchedulerState, winners
+
+MAX_CONSECUTIVE = 2
+
+TEAM_SIZES = {
+    "singles": 1,
+    "doubles": 2,
+}
+
+
+def court_letter(n: int) -> str:
+    """Convert 1,2,3 → A,B,C"""
+    return chr(64 + n) if 1 <= n <= 26 else str(n)
+
+
+class Engine:
+    """Winner-stay scheduler for any number of players and courts.
+
+    Each call to ``next_round`` returns one pairing per court. ``next_game``
+    keeps the single-game contract of the hand-written logic modules.
+    Either takes an optional ``pairer`` (logic.pairing.BalancedPairer) that
+    seats the round instead of a shuffle, and an ``rng`` (random.Random)
+    that shuffles in place of the global ``random``.
+    """
+
+    ACCEPTS_PAIRER = True
+    ACCEPTS_RNG = True
+
+    def __init__(self, game_type="doubles", courts_count=1, max_consecutive=MAX_CONSECUTIVE):
+        gt = (game_type or "").strip().lower()
+        if gt not in TEAM_SIZES:
+            raise ValueError(f"Unsupported game type: {game_type}")
+        self.team_size = TEAM_SIZES[gt]
+        self.courts_count = max(1, int(courts_count or 1))
+        self.max_consecutive = max_consecutive
+
+    @property
+    def players_per_court(self) -> int:
+        return self.team_size * 2
+
+    def supports(self, players_count: int) -> bool:
+        return players_count >= self.players_per_court
+
+    def courts_in_play(self, players_count: int) -> int:
+        return min(self.courts_count, players_count // self.players_per_court)
+
+    def next_game(self, players, games, force_no=None, state=None, pairer=None, rng=random):
+        """Generate the next single game (first court of a one-court round)."""
+        return self._draw(players, games, 1, force_no, state, pairer, rng)[0]
+
+    def next_round(self, players, games, force_no=None, state=None, pairer=None, rng=random):
+        """Generate one game per available court."""
+        courts = self.courts_in_play(len(players))
+        return self._draw(players, games, courts, force_no, state, pairer, rng)
+
+    # ---------------------------------------------------------------
+    def _draw(self, players, games, courts, force_no, state, pairer=None, rng=random):
+        per_court = self.players_per_court
+        if courts < 1 or len(players) < per_court:
+            raise ValueError(f"At least {per_court} players are required")
+
+        if state is None:
+            state = SchedulerState.from_games(players, games)
+
+        if force_no is not None:
+            game_no = force_no
+        elif games:
+            game_no = games[-1].get("game_no", len(games)) + 1
+        else:
+            game_no = 1
+
+        last_round = state.last_round
+        if isinstance(state.round_no, int):
+            round_no = state.round_no + 1
+        else:
+            round_no = len(games) + 1
+
+        roster = set(players)
+        consec = state.consecutive
+        played = state.played
+        last_players = state.last_players()
+
+        # Winners stay on their court unless they hit the consecutive limit.
+        stays = []
+        stayed = set()
+        for game in last_round[:courts]:
+            keep = [
+                p for p in winners(game)
+                if p in roster and p not in stayed and consec.get(p, 0) < self.max_consecutive
+            ]
+            stayed.update(keep)
+            stays.append(keep)
+        while len(stays) < courts:
+            stays.append([])
+
+        needed = courts * per_court - len(stayed)
+        order = players[:]
+        rng.shuffle(order)
+        order.sort(key=lambda p: played.get(p, 0))
+
+        bench, losers, limited = [], [], []
+        for player in order:
+            if player in stayed:
+                continue
+            if consec.get(player, 0) >= self.max_consecutive:
+                limited.append(player)
+            elif player in last_players:
+                losers.append(player)
+            else:
+                bench.append(player)
+        queue = bench + losers + limited
+        if pairer is not None:
+            # Players tied with the last one the queue would seat are interchangeable
+            tiers = {
+                player: (rank, played.get(player, 0))
+                for rank, group in enumerate((bench, losers, limited))
+                for player in group
+            }
+            cutoff = tiers[queue[needed - 1]]
+            seating = pairer.assign(
+                stays,
+                [p for p in queue if tiers[p] < cutoff],
+                [p for p in queue if tiers[p] == cutoff],
+                self.team_size,
+            )
+        else:
+            fill = queue[:needed]
+            rng.shuffle(fill)
+            seating = []
+            for keep in stays:
+                team_a, team_b = [], []
+                for idx, player in enumerate(keep):
+                    (team_a if idx % 2 == 0 else team_b).append(player)
+                while len(team_a) < self.team_size:
+                    team_a.append(fill.pop())
+                while len(team_b) < self.team_size:
+                    team_b.append(fill.pop())
+                seating.append([team_a, team_b])
+
+        round_games = []
+        for court_index, (team_a, team_b) in enumerate(seating):
+            round_games.append({
+                "game_no": game_no + court_index,
+                "round_no": round_no,
+                "court_no": court_letter(court_index + 1),
+                "teams": [team_a, team_b],
+            })
+        return round_games
@@ -1,35 +1,180 @@
 import importlib
+import logging
+import os
+import re
+from importlib.metadata import entry_points
+
+from logic.engine import Engine
+from logic.schedule import SCHEDULE_FORMATS, ScheduleLogic
+
+logger = logging.getLogger(__name__)
+
+# Third-party packages can add formats under this entry point group. Each
+# entry point is named after the format and loads a factory called as
+# factory(game_type, game_format, courts_count) -> strategy.
+ENTRY_POINT_GROUP = "matchmaker.logic"
+
+# Formats the generic engine can schedule for any player/court count
+ENGINE_FORMATS = {"mexicano"}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULE_PATTERN = re.compile(r"^(\d+)p(\d+)c\.py$")
+
+
+def _normalize(game_type, game_format, players_count, courts_count):
+    return (
+        (game_type or "").strip().lower(),
+        (game_format or "").strip().lower(),
+        int(players_count or 0),
+        int(courts_count or 0),
+    )
+
+
+def _engine_factory(game_type, game_format, courts_count):
+    return Engine(game_type, courts_count)
+
+
+def _is_strategy(obj) -> bool:
+    return callable(getattr(obj, "next_game", None))
+
+
+def accepts_pairer(strategy) -> bool:
+    """Whether ``strategy.next_game`` takes a ``pairer`` (see logic.pairing)."""
+    return bool(getattr(strategy, "ACCEPTS_PAIRER", False))
+
+
+def accepts_rng(strategy) -> bool:
+    """Whether ``strategy``'s draws take an ``rng`` (a random.Random) in place of the global one."""
+    return bool(getattr(strategy, "ACCEPTS_RNG", False))
+
+
+def courts_in_play(strategy, players_count) -> int:
+    """Courts each draw fills; logic without ``next_round`` draws one game at a time."""
+    if not hasattr(strategy, "next_round") or not hasattr(strategy, "courts_in_play"):
+        return 1
+    return max(1, strategy.courts_in_play(players_count))
+
+
+class LogicRegistry:
+    """In-memory (game_type, game_format, players, courts) → strategy map.
+
+    Dedicated modules (logic/<type>/<format>/<N>p<M>c.py) win over format
+    factories. Every lookup, hit or miss, is cached so a draw never imports.
+    """
+
+    def __init__(self):
+        self._modules = {}
+        self._factories = {}
+        self._resolved = {}
+        self.discovered = False
+
+    def register_module(self, game_type, game_format, players_count, courts_count, module):
+        if not _is_strategy(module):
+            raise TypeError(f"{module!r} has no next_game()")
+        key = _normalize(game_type, game_format, players_count, courts_count)
+        self._modules[key] = module
+        self._resolved.clear()
+
+    def register_format(self, game_format, factory):
+        if not callable(factory):
+            raise TypeError(f"{factory!r} is not a strategy factory")
+        self._factories[(game_format or "").strip().lower()] = factory
+        self._resolved.clear()
+
+    def discover(self, base_dir=BASE_DIR):
+        """Register built-in formats, logic modules on disk and entry points."""
+        for game_format in ENGINE_FORMATS:
+            self.register_format(game_format, _engine_factory)
+        for game_format in SCHEDULE_FORMATS:
+            self.register_format(game_format, ScheduleLogic)
+
+        for game_type in sorted(os.listdir(base_dir)):
+            type_dir = os.path.join(base_dir, game_type)
+            if not os.path.isdir(type_dir) or game_type.startswith("_"):
+                continue
+            for format_dir in sorted(os.listdir(type_dir)):
+                format_path = os.path.join(type_dir, format_dir)
+                if not os.path.isdir(format_path) or format_dir.startswith("_"):
+                    continue
+                for filename in sorted(os.listdir(format_path)):
+                    match = MODULE_PATTERN.match(filename)
+                    if not match:
+                        continue
+                    module_path = f"logic.{game_type}.{format_dir}.{filename[:-3]}"
+                    try:
+                        module = importlib.import_module(module_path)
+                        self.register_module(
+                            game_type, format_dir.replace("_", " "),
+                            match.group(1), match.group(2), module,
+                        )
+                    except (ImportError, TypeError) as e:
+                        logger.warning("Skipping logic module %s: %s", module_path, e)
+                        continue
+                    logger.debug("Registered logic module %s", module_path)
+
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                self.register_format(ep.name, ep.load())
+            except Exception as e:  # a broken plugin must not take the app down
+                logger.warning("Skipping logic entry point %s: %s", ep.name, e)
+                continue
+            logger.debug("Registered logic entry point %s", ep.name)
+
+        self.discovered = True
+        logger.info(
+            "Logic registry ready: %d modules, %d formats",
+            len(self._modules), len(self._factories),
+        )
+
+    def get(self, game_type, game_format, players_count, courts_count):
+        if not self.discovered:
+            self.discover()
+
+        key = _normalize(game_type, game_format, players_count, courts_count)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        strategy = self._resolve(key)
+        self._resolved[key] = strategy
+        return strategy
+
+    def _resolve(self, key):
+        gt, gf, pc, cc = key
+        module = self._modules.get(key)
+        if module is not None:
+            logger.info("Using logic module for %s/%s %dp%dc", gt, gf, pc, cc)
+            return module
+
+        factory = self._factories.get(gf)
+        if factory is None:
+            logger.warning("No game logic for %s/%s %dp%dc", gt, gf, pc, cc)
+            return None
+
+        try:
+            strategy = factory(gt, gf, cc)
+        except ValueError as e:
+            logger.warning("No game logic for %s/%s %dp%dc: %s", gt, gf, pc, cc, e)
+            return None
+        if not _is_strategy(strategy):
+            logger.warning("Factory for %s returned %r without next_game()", gf, strategy)
+            return None
+        supports = getattr(strategy, "supports", None)
+        if supports is not None and not supports(pc):
+            logger.warning("No game logic for %s/%s %dp%dc", gt, gf, pc, cc)
+            return None
+
+        logger.info("Using %s for %s/%s %dp%dc", type(strategy).__name__, gt, gf, pc, cc)
+        return strategy
+
+
+registry = LogicRegistry()
+
 
 def load_logic(game_type, game_format, players_count, courts_count):
     """
-    Dynamically load a logic module depending on configuration.
-    Example: logic/doubles/mexicano/6p1c.py
+    Return the logic strategy for a configuration, or None.
+    Example: logic/doubles/mexicano/6p1c.py, else the format's factory.
     """
-
-    base_path = "logic"
-
-    # Normalize values
-    gt = (game_type or "").strip().lower()
-    gf = (game_format or "").strip().lower()
-    pc = int(players_count or 0)
-    cc = int(courts_count or 0)
-
-    # Build path like logic.doubles.mexicano.6p1c
-    module_path = f"{base_path}.{gt}.{gf}.{pc}p{cc}c"
-
-    print("=== [Logic Loader DEBUG] ===")
-    print("game_type    :", game_type)
-    print("game_format  :", game_format)
-    print("players_count:", players_count)
-    print("courts_count :", courts_count)
-    print("module_path  :", module_path)
-    print("============================")
-
-    try:
-        module = importlib.import_module(module_path)
-        print(f"[Logic Loader] ✅ Loaded {module_path}")
-        return module
-    except ImportError as e:
-        print(f"[Logic Loader] ❌ Could not load {module_path}")
-        print("Error:", e)
-        return None
+    return registry.get(game_type, game_format, players_count, courts_count)
@@ -0,0 +1,191 @@
+"""Rating-balanced seating for a drawn round (optional; needs NumPy).
+
+The scheduling rules still decide who has to play: winners stay on their
+court, the consecutive-game limit, fewest games first. BalancedPairer
+chooses among the players those rules leave tied for the last open seats,
+and how everyone is split into courts and teams, minimising
+
+    sum over courts of (2 * P(team A wins) - 1) ** 2
+    + PARTNER_WEIGHT * earlier games the partners played together
+    + OPPONENT_WEIGHT * earlier games the opponents played against each other
+
+P(team A wins) is the Elo curve on the teams' mean ratings. Candidate
+seatings are scored in batches as NumPy index arrays. Small problems are
+enumerated outright. Larger ones get an anytime search: random starts, each
+improved by its best single swap until none helps, until ``budget_ms``
+runs out. The best seating found so far is returned, so a 40-player pool
+costs no more wall time than the budget.
+"""
+import itertools
+import math
+import time
+
+import numpy as np
+
+PARTNER_WEIGHT = 0.25  # one repeat partnership costs as much as a 75/25 game
+OPPONENT_WEIGHT = 0.05
+DEFAULT_BUDGET_MS = 20
+DEFAULT_RATING = 1500.0
+EXHAUSTIVE_LIMIT = 5000  # seatings; fewer than this are all scored at once
+STALL_RESTARTS = 25  # random starts without a materially better seating before giving up early
+MATERIAL = 1e-4  # smaller gains (a 0.5% swing in one court's odds) do not reset the stall count
+
+
+class BalancedPairer:
+    """Seat one round so the games are close and partners rotate.
+
+    ``ratings`` maps player name to rating (missing names get
+    DEFAULT_RATING); ``partners`` and ``opponents`` are the pair counters
+    of a SchedulerState. After each ``assign``, ``last_search`` holds how
+    the answer was found.
+    """
+
+    def __init__(self, ratings, partners=None, opponents=None, budget_ms=DEFAULT_BUDGET_MS, seed=None):
+        self.ratings = ratings
+        # Kept by reference: a SchedulerState's counters grow as the event goes on
+        self.partners = {} if partners is None else partners
+        self.opponents = {} if opponents is None else opponents
+        self.budget = max(budget_ms, 0) / 1000
+        self.rng = np.random.default_rng(seed)
+        self.last_search = None
+
+    def assign(self, stays, must, optional, team_size):
+        """Return [team A, team B] for each court of ``stays``.
+
+        ``stays[c]`` are already on court c, seated alternately on A and B.
+        Every player in ``must`` plays; the seats left over go to players
+        from ``optional``.
+        """
+        started = time.perf_counter()
+        per_court = 2 * team_size
+        seats = len(stays) * per_court
+
+        names, fixed = [], []
+        for court, keep in enumerate(stays):
+            for idx, player in enumerate(keep):
+                fixed.append(court * per_court + (idx % 2) * team_size + idx // 2)
+                names.append(player)
+        taken = set(fixed)
+        free = np.array([s for s in range(seats) if s not in taken], dtype=np.intp)
+        if not len(must) <= len(free) <= len(must) + len(optional):
+            raise ValueError(f"{len(free)} open seats for {len(must)} required and {len(optional)} optional players")
+
+        movable = np.arange(len(fixed), len(fixed) + len(must) + len(optional), dtype=np.intp)
+        names.extend(must)
+        names.extend(optional)
+        required = np.zeros(len(names), dtype=bool)
+        required[len(fixed):len(fixed) + len(must)] = True
+
+        template = np.zeros(seats, dtype=np.intp)
+        template[fixed] = np.arange(len(fixed), dtype=np.intp)
+        problem = _Problem(self, names, template, free, team_size)
+
+        spare = len(free) - len(must)
+        count = math.comb(len(optional), spare) * math.perm(len(free))
+        if count <= EXHAUSTIVE_LIMIT:
+            best, cost, evaluated, restarts = self._enumerate(problem, movable[:len(must)], movable[len(must):], spare)
+        else:
+            best, cost, evaluated, restarts = self._search(
+                problem, movable, required, len(free), started + self.budget
+            )
+
+        seating = template.copy()
+        seating[free] = best
+        self.last_search = {
+            "exhaustive": count <= EXHAUSTIVE_LIMIT,
+            "evaluated": evaluated,
+            "restarts": restarts,
+            "cost": float(cost),
+            "ms": (time.perf_counter() - started) * 1000,
+        }
+        teams = seating.reshape(len(stays), 2, team_size)
+        return [[[names[i] for i in team] for team in court] for court in teams]
+
+    # ---------------------------------------------------------------
+    def _enumerate(self, problem, must, optional, spare):
+        candidates = np.array([
+            seating
+            for chosen in itertools.combinations(optional, spare)
+            for seating in itertools.permutations(np.concatenate([must, np.array(chosen, dtype=np.intp)]))
+        ], dtype=np.intp).reshape(-1, len(must) + spare)
+        costs = problem.cost(candidates)
+        ties = np.flatnonzero(costs <= costs.min() + 1e-9)
+        pick = ties[self.rng.integers(len(ties))]  # a redraw may pick another equal seating
+        return candidates[pick], costs[pick], len(candidates), 0
+
+    def _search(self, problem, movable, required, open_seats, deadline):
+        # Every swap of an open seat with a later position; unseating a required player is masked out
+        first, second = np.triu_indices(len(movable), k=1)
+        keep = first < open_seats
+        first, second = first[keep], second[keep]
+        rows = np.arange(len(first))
+
+        best, best_cost = None, np.inf
+        evaluated = restarts = stalled = 0
+        while True:
+            perm = self._start(movable, required, open_seats)
+            cost = problem.cost(perm[None, :open_seats])[0]
+            evaluated += 1
+            while time.perf_counter() < deadline:
+                neighbours = np.broadcast_to(perm, (len(first), len(perm))).copy()
+                neighbours[rows, first] = perm[second]
+                neighbours[rows, second] = perm[first]
+                costs = problem.cost(neighbours[:, :open_seats])
+                costs[(second >= open_seats) & required[perm[first]]] = np.inf
+                evaluated += len(costs)
+                k = int(np.argmin(costs))
+                if costs[k] >= cost - 1e-12:
+                    break
+                perm, cost = neighbours[k], costs[k]
+
+            restarts += 1
+            stalled = 0 if cost < best_cost - MATERIAL else stalled + 1
+            if cost < best_cost:
+                best, best_cost = perm[:open_seats].copy(), cost
+            if time.perf_counter() >= deadline or stalled >= STALL_RESTARTS or best_cost < MATERIAL:
+                return best, best_cost, evaluated, restarts
+
+    def _start(self, movable, required, open_seats):
+        """A random permutation of ``movable`` with every required player in the open seats."""
+        musts = self.rng.permutation(movable[required[movable]])
+        others = self.rng.permutation(movable[~required[movable]])
+        spare = open_seats - len(musts)
+        seated = self.rng.permutation(np.concatenate([musts, others[:spare]]))
+        return np.concatenate([seated, others[spare:]])
+
+
+class _Problem:
+    """Ratings and pair-count matrices over the players of one assign() call."""
+
+    def __init__(self, pairer, names, template, free, team_size):
+        index = {name: i for i, name in enumerate(names)}
+        self.ratings = np.array([pairer.ratings.get(n, DEFAULT_RATING) for n in names], dtype=float)
+        self.partners = self._matrix(pairer.partners, index)
+        self.opponents = self._matrix(pairer.opponents, index)
+        self.template = template
+        self.free = free
+        self.team_size = team_size
+
+    @staticmethod
+    def _matrix(counter, index):
+        matrix = np.zeros((len(index), len(index)))
+        for (a, b), count in counter.items():
+            i, j = index.get(a), index.get(b)
+            if i is not None and j is not None:
+                matrix[i, j] = matrix[j, i] = count
+        return matrix
+
+    def cost(self, candidates):
+        """Cost of each row of ``candidates`` (players for the open seats, in seat order)."""
+        seating = np.broadcast_to(self.template, (len(candidates), len(self.template))).copy()
+        seating[:, self.free] = candidates
+        seats = seating.reshape(len(candidates), -1, 2, self.team_size)
+
+        teams = self.ratings[seats].mean(axis=3)
+        win_a = 1 / (1 + 10 ** ((teams[..., 1] - teams[..., 0]) / 400))
+        cost = ((2 * win_a - 1) ** 2).sum(axis=1)
+        if self.team_size == 2:
+            cost += PARTNER_WEIGHT * self.partners[seats[..., 0], seats[..., 1]].sum(axis=(1, 2))
+        side_a, side_b = seats[:, :, 0, :, None], seats[:, :, 1, None, :]
+        cost += OPPONENT_WEIGHT * self.opponents[side_a, side_b].sum(axis=(1, 2, 3))
+        return cost
@@ -0,0 +1,460 @@
+import json
+import math
+import os
+import random
+from collections import Counter
+
+from logic.engine import TEAM_SIZES, court_letter
+
+# Formats served from a precomputed round-robin table
+SCHEDULE_FORMATS = {"americano", "fixed partner"}
+
+CACHE_DIR = os.environ.get(
+    "MATCHMAKER_SCHEDULE_CACHE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance", "schedules"),
+)
+
+# Bump when build_schedule changes, so tables cached on disk are rebuilt
+TABLE_VERSION = 2
+BALANCE_STEPS = 4000  # annealing steps spent evening out opponents per table
+WHIST_SEARCH_NODES = 20000
+
+_tables = {}
+
+
+def _one_factors(ids: list) -> list[list[tuple]]:
+    """Circle-method round robin: every pair of ``ids`` meets exactly once."""
+    ids = list(ids) + ([None] if len(ids) % 2 else [])
+    size = len(ids)
+    factors = []
+    for _ in range(size - 1):
+        pairs = []
+        for i in range(size // 2):
+            a, b = ids[i], ids[size - 1 - i]
+            if a is not None and b is not None:
+                pairs.append((a, b))
+        factors.append(pairs)
+        ids = [ids[0], ids[-1]] + ids[1:-1]
+    return factors
+
+
+def _opponent_cost(opponents: Counter, team_a, team_b) -> int:
+    return sum(opponents[(min(a, b), max(a, b))] for a in team_a for b in team_b)
+
+
+def _kempe_shift(more: set, fewer: set):
+    """Move one pair from matching ``more`` to matching ``fewer``, keeping both matchings.
+
+    Swaps the two along a path that alternates between them and starts and
+    ends in ``more``; one exists whenever ``more`` is the larger.
+    """
+    pair_at = ({}, {})
+    for side, matching in enumerate((more, fewer)):
+        for pair in matching:
+            for unit in pair:
+                pair_at[side][unit] = pair
+    for start in sorted(pair_at[0]):
+        if start in pair_at[1]:
+            continue
+        path, unit, side = [], start, 0
+        while unit in pair_at[side]:
+            pair = pair_at[side][unit]
+            path.append((side, pair))
+            unit = pair[1] if pair[0] == unit else pair[0]
+            side = 1 - side
+        if path[-1][0] == 0:
+            for side, pair in path:
+                (more, fewer)[side].remove(pair)
+            for side, pair in path:
+                (fewer, more)[side].add(pair)
+            return
+    raise ValueError("matching is not larger")
+
+
+def _equal_rounds(units: int, per_round: int) -> list[list[tuple]]:
+    """Every pair of ``units`` once, in rounds of ``per_round`` disjoint pairs (the last may be short).
+
+    Starts from the circle method's rounds and evens them out by Kempe
+    swaps, so every round but the last is full whatever the round size.
+    """
+    rounds = [set(factor) for factor in _one_factors(range(units))]
+    total = sum(len(matching) for matching in rounds)
+    full, rest = divmod(total, per_round)
+    sizes = [per_round] * full + ([rest] if rest else [])
+    rounds += [set() for _ in range(len(sizes) - len(rounds))]
+    while True:
+        gap = [len(matching) - size for matching, size in zip(rounds, sizes)]
+        if max(gap) <= 0:
+            break
+        _kempe_shift(rounds[gap.index(max(gap))], rounds[gap.index(min(gap))])
+    return [sorted(matching) for matching in sorted(rounds, key=len, reverse=True)]
+
+
+def _fair_order(rounds: list, units: int) -> list:
+    """Full rounds first, each time the one whose players have waited longest; short rounds last."""
+    size = max(len(games) for games in rounds)
+    pending = [games for games in rounds if len(games) == size]
+    last_played = [-1] * units
+    ordered = []
+    while pending:
+        games = max(pending, key=lambda games: sum(
+            len(ordered) - last_played[unit] for game in games for side in game for unit in side
+        ))
+        pending.remove(games)
+        for game in games:
+            for side in game:
+                for unit in side:
+                    last_played[unit] = len(ordered)
+        ordered.append(games)
+    return ordered + [games for games in rounds if len(games) < size]
+
+
+def _cyclic_whist(players_count: int, rng: random.Random, budget: int = WHIST_SEARCH_NODES):
+    """Rounds where everyone plays, partners everyone once and faces everyone twice, or None.
+
+    Searches one round over Z_(n-1) plus a fixed player whose partner
+    differences are all distinct and whose opponent differences each occur
+    twice; shifting it n-1 times gives the rest (a Z-cyclic whist table).
+    """
+    modulus, fixed = players_count - 1, players_count - 1
+    # Difference class of each pair of players; None for pairs with the fixed player
+    gap = [
+        [None if fixed in (a, b) else min((a - b) % modulus, (b - a) % modulus) for b in range(players_count)]
+        for a in range(players_count)
+    ]
+    free = set(range(players_count))
+    partnered = [False] * (modulus // 2 + 1)
+    opposed = [0] * (modulus // 2 + 1)
+    games, nodes = [], 0
+
+    def open_partners(a, b):
+        return gap[a][b] is None or not partnered[gap[a][b]]
+
+    def place(game, step):
+        for a, b in game:
+            if gap[a][b] is not None:
+                partnered[gap[a][b]] = step > 0
+        for a in game[0]:
+            for b in game[1]:
+                if gap[a][b] is not None:
+                    opposed[gap[a][b]] += step
+
+    def opponents_fit(game):
+        seen = Counter(gap[a][b] for a in game[0] for b in game[1])
+        return all(d is None or opposed[d] + count <= 2 for d, count in seen.items())
+
+    def search():
+        nonlocal nodes
+        nodes += 1
+        if not free:
+            return True
+        if nodes > budget:
+            return False
+        first = min(free)
+        rest = sorted(free - {first})
+        rng.shuffle(rest)
+        for partner in rest:
+            if not open_partners(first, partner):
+                continue
+            others = [player for player in rest if player != partner]
+            for i, a in enumerate(others):
+                for b in others[i + 1:]:
+                    if not open_partners(a, b) or (gap[a][b] is not None and gap[a][b] == gap[first][partner]):
+                        continue
+                    game = ((first, partner), (a, b))
+                    if not opponents_fit(game):
+                        continue
+                    place(game, 1)
+                    free.difference_update((first, partner, a, b))
+                    games.append(game)
+                    if search():
+                        return True
+                    games.pop()
+                    free.update((first, partner, a, b))
+                    place(game, -1)
+        return False
+
+    if not search():
+        return None
+
+    def shift(player, by):
+        return player if player == fixed else (player + by) % modulus
+
+    return [
+        [tuple(tuple(shift(player, by) for player in pair) for pair in game) for game in games]
+        for by in range(modulus)
+    ]
+
+
+def _balance_opponents(rounds: list, players_count: int, rng: random.Random, steps: int = BALANCE_STEPS):
+    """Anneal who faces whom without changing partnerships or emptying a court.
+
+    A step either swaps the opponents of two games in a round, or exchanges
+    a balanced alternating chain of partnerships between two rounds and
+    re-pairs both. The cost is the sum of squared opponent counts.
+    """
+    opponents = Counter()
+
+    def pairs_of(games):
+        return [(min(a, b), max(a, b)) for first, second in games for a in first for b in second]
+
+    def change(removed, added):
+        """Apply to the opponent counts; returns the change in cost."""
+        delta = 0
+        for pair in removed:
+            opponents[pair] -= 1
+            delta -= 2 * opponents[pair] + 1
+        for pair in added:
+            delta += 2 * opponents[pair] + 1
+            opponents[pair] += 1
+        return delta
+
+    def regroup(partnerships):
+        """Pair the partnerships off, each with the one it has faced least; returns (games, cost change)."""
+        rng.shuffle(partnerships)
+        games, delta = [], 0
+        while partnerships:
+            first, *partnerships = partnerships
+            best = min(partnerships, key=lambda pair: _opponent_cost(opponents, first, pair))
+            partnerships.remove(best)
+            delta += change([], pairs_of([(first, best)]))
+            games.append((first, best))
+        return games, delta
+
+    rounds = [regroup(list(partnerships))[0] for partnerships in rounds]
+    pairs = players_count * (players_count - 1) // 2
+    mean, extra = divmod(4 * sum(len(games) for games in rounds), pairs)
+    floor = (pairs - extra) * mean ** 2 + extra * (mean + 1) ** 2  # every count within one of the rest
+    cost = sum(count * count for count in opponents.values())
+    best = (cost, [list(games) for games in rounds])
+    for step in range(steps):
+        if cost == floor or len(rounds) < 2:
+            break
+        temperature = 1.5 * (1 - step / steps) + 0.01
+        first, second = rng.sample(range(len(rounds)), 2)
+        if rng.random() < 0.5 and len(rounds[first]) > 1:
+            games = rounds[first]
+            i, j = rng.sample(range(len(games)), 2)
+            (a, b), (c, d) = games[i], games[j]
+            swapped = ((a, c), (b, d)) if rng.random() < 0.5 else ((a, d), (b, c))
+            delta = change(pairs_of([games[i], games[j]]), pairs_of(swapped))
+            if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                games[i], games[j] = swapped
+                cost += delta
+            else:
+                change(pairs_of(swapped), pairs_of([games[i], games[j]]))
+        else:
+            chains = _balanced_chains(
+                [pair for game in rounds[first] for pair in game],
+                [pair for game in rounds[second] for pair in game],
+            )
+            if not chains:
+                continue
+            taken, given = rng.choice(chains)
+            old = pairs_of(rounds[first] + rounds[second])
+            delta = change(old, [])
+            left, added = regroup([pair for game in rounds[first] for pair in game if pair not in taken] + given)
+            delta += added
+            right, added = regroup([pair for game in rounds[second] for pair in game if pair not in given] + taken)
+            delta += added
+            if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                rounds[first], rounds[second] = left, right
+                cost += delta
+            else:
+                change(pairs_of(left + right), old)
+        if cost < best[0]:
+            best = (cost, [list(games) for games in rounds])
+    return best[1]
+
+
+def _balanced_chains(first: list, second: list) -> list[tuple]:
+    """Alternating components of two matchings with as many pairs from each: (from first, from second)."""
+    pair_at = ({}, {})
+    for side, matching in enumerate((first, second)):
+        for pair in matching:
+            for unit in pair:
+                pair_at[side][unit] = pair
+    seen, chains = set(), []
+    for side, matching in enumerate((first, second)):
+        for pair in matching:
+            if pair in seen:
+                continue
+            seen.add(pair)
+            component, stack = [(side, pair)], [(side, pair)]
+            while stack:
+                at, edge = stack.pop()
+                for unit in edge:
+                    other = pair_at[1 - at].get(unit)
+                    if other is not None and other not in seen:
+                        seen.add(other)
+                        component.append((1 - at, other))
+                        stack.append((1 - at, other))
+            taken = [edge for at, edge in component if at == 0]
+            given = [edge for at, edge in component if at == 1]
+            if len(taken) == len(given):
+                chains.append((taken, given))
+    return chains
+
+
+def _americano_rounds(players_count: int, courts: int) -> list[list[tuple]]:
+    """Whist-style doubles: everyone partners everyone once, every court busy, opponents balanced."""
+    rng = random.Random(players_count * 100 + courts)  # the same table in every process
+    if players_count % 4 == 0 and courts == players_count // 4:
+        whist = _cyclic_whist(players_count, rng)
+        if whist is not None:
+            return whist
+
+    rounds = _equal_rounds(players_count, 2 * courts)
+    if len(rounds[-1]) % 2:
+        # Odd number of partnerships in all: the last round replays one
+        busy = {player for pair in rounds[-1] for player in pair}
+        free = [player for player in range(players_count) if player not in busy]
+        rounds[-1].append((free[0], free[1]))
+    return _fair_order(_balance_opponents(rounds, players_count, rng), players_count)
+
+
+def _team_rounds(teams: list[tuple], courts: int) -> list[list[tuple]]:
+    """Every team meets every other team once, ``courts`` games a round."""
+    rounds = _fair_order([[((a,), (b,)) for a, b in games] for games in _equal_rounds(len(teams), courts)], len(teams))
+    return [[(teams[a], teams[b]) for (a,), (b,) in games] for games in rounds]
+
+
+def build_schedule(players_count: int, courts_count: int, game_format: str, team_size: int = 2) -> list:
+    """Build a complete round-robin schedule as rounds of player-index matches."""
+    gf = (game_format or "").strip().lower()
+    if gf not in SCHEDULE_FORMATS:
+        raise ValueError(f"No schedule table for format: {game_format}")
+    if players_count < team_size * 2:
+        raise ValueError(f"At least {team_size * 2} players are required")
+
+    # Courts a round can fill: more than this would seat someone twice
+    courts = max(1, min(courts_count, players_count // (team_size * 2)))
+    if team_size == 1:
+        rounds = _team_rounds([(p,) for p in range(players_count)], courts)
+    elif gf == "americano":
+        rounds = _americano_rounds(players_count, courts)
+    else:
+        if players_count % team_size:
+            raise ValueError("Fixed Partner needs a player count divisible by the team size")
+        teams = [tuple(range(i, i + team_size)) for i in range(0, players_count, team_size)]
+        rounds = _team_rounds(teams, courts)
+
+    return [[[list(team_a), list(team_b)] for team_a, team_b in games] for games in rounds]
+
+
+def _cache_path(players_count, courts_count, game_format, team_size) -> str:
+    slug = (game_format or "").strip().lower().replace(" ", "-")
+    return os.path.join(CACHE_DIR, f"{slug}-t{team_size}-{players_count}p{courts_count}c.json")
+
+
+def get_schedule(players_count: int, courts_count: int, game_format: str, team_size: int = 2) -> list:
+    """Return the schedule table, building and caching it on disk on first use."""
+    key = ((game_format or "").strip().lower(), team_size, players_count, courts_count)
+    table = _tables.get(key)
+    if table is not None:
+        return table
+
+    path = _cache_path(players_count, courts_count, game_format, team_size)
+    try:
+        with open(path, encoding="utf-8") as fh:
+            cached = json.load(fh)
+        if cached.get("version") != TABLE_VERSION:
+            raise ValueError("stale schedule table")
+        table = cached["rounds"]
+    except (OSError, ValueError, KeyError):
+        table = build_schedule(players_count, courts_count, game_format, team_size)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump({
+                    "version": TABLE_VERSION,
+                    "format": key[0],
+                    "team_size": team_size,
+                    "players": players_count,
+                    "courts": courts_count,
+                    "rounds": table,
+                }, fh)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # an unwritable cache only costs a rebuild next process
+
+    _tables[key] = table
+    return table
+
+
+class ScheduleLogic:
+    """Serve Americano / Fixed Partner games by lookup in a schedule table.
+
+    Game N is the N-th match of the table (wrapping around once every
+    pairing has been played), so drawing is O(1) however long the event runs.
+    """
+
+    def __init__(self, game_type="doubles", game_format="americano", courts_count=1):
+        gt = (game_type or "").strip().lower()
+        if gt not in TEAM_SIZES:
+            raise ValueError(f"Unsupported game type: {game_type}")
+        self.team_size = TEAM_SIZES[gt]
+        self.game_format = (game_format or "").strip().lower()
+        if self.game_format not in SCHEDULE_FORMATS:
+            raise ValueError(f"No schedule table for format: {game_format}")
+        self.courts_count = max(1, int(courts_count or 1))
+        self._flat = {}
+
+    @property
+    def players_per_court(self) -> int:
+        return self.team_size * 2
+
+    def supports(self, players_count: int) -> bool:
+        try:
+            self.table(players_count)
+        except ValueError:
+            return False
+        return True
+
+    def courts_in_play(self, players_count: int) -> int:
+        return min(self.courts_count, players_count // self.players_per_court)
+
+    def table(self, players_count: int) -> list:
+        return get_schedule(players_count, self.courts_count, self.game_format, self.team_size)
+
+    def _matches(self, players_count: int) -> list:
+        flat = self._flat.get(players_count)
+        if flat is None:
+            flat = [
+                (round_idx, court_idx, match)
+                for round_idx, games in enumerate(self.table(players_count))
+                for court_idx, match in enumerate(games)
+            ]
+            self._flat[players_count] = flat
+        return flat
+
+    def _game(self, players, game_no, round_no, court_idx, match):
+        return {
+            "game_no": game_no,
+            "round_no": round_no,
+            "court_no": court_letter(court_idx + 1),
+            "teams": [[players[i] for i in team] for team in match],
+        }
+
+    def next_game(self, players, games, force_no=None, state=None):
+        """Return game ``force_no`` (or the one after ``games``) from the table."""
+        game_no = force_no if force_no is not None else len(games) + 1
+        flat = self._matches(len(players))
+        cycle, index = divmod(game_no - 1, len(flat))
+        round_idx, court_idx, match = flat[index]
+        rounds_per_cycle = flat[-1][0] + 1
+        round_no = cycle * rounds_per_cycle + round_idx + 1
+        return self._game(players, game_no, round_no, court_idx, match)
+
+    def next_round(self, players, games, force_no=None, state=None):
+        """Return every court's game for the round after ``games``."""
+        table = self.table(len(players))
+        last_round = games[-1].get("round_no") if games else None
+        round_no = last_round + 1 if isinstance(last_round, int) else 1
+        game_no = force_no if force_no is not None else len(games) + 1
+        games_in_round = table[(round_no - 1) % len(table)]
+        return [
+            self._game(players, game_no + court_idx, round_no, court_idx, match)
+            for court_idx, match in enumerate(games_in_round)
+        ]
@@ -0,0 +1,240 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from logic.engine import Engine
+from logic.loader import accepts_pairer, accepts_rng, courts_in_play, load_logic
+from logic.state import SchedulerState
+
+# Per-event metrics, in the order simulate_events() returns them
+METRICS = (
+    "games_min",
+    "games_max",
+    "games_spread",
+    "max_consecutive",
+    "max_rest_gap",
+    "partner_repeats",
+    "imbalance",
+    "draws_per_sec",
+    "draw_ms_max",
+)
+
+PAIRINGS = ("random", "balanced")
+
+
+# -------------------- Win models --------------------
+# A win model returns the probability that team A beats team B.
+def coin_flip(team_a, team_b, skills):
+    return 0.5
+
+
+def skill_logistic(team_a, team_b, skills):
+    """Elo-style logistic on the difference in summed player skill."""
+    diff = sum(skills[p] for p in team_a) - sum(skills[p] for p in team_b)
+    return 1.0 / (1.0 + 10 ** (-diff / 400.0))
+
+
+WIN_MODELS = {
+    "coin": coin_flip,
+    "skill": skill_logistic,
+}
+
+
+class _Limited:
+    """A logic module drawn with its ``max_consecutive`` keyword pinned."""
+
+    def __init__(self, module, max_consecutive):
+        self.module = module
+        self.max_consecutive = max_consecutive
+        self.ACCEPTS_PAIRER = accepts_pairer(module)
+        self.ACCEPTS_RNG = accepts_rng(module)
+
+    def next_game(self, players, games, **options):
+        return self.module.next_game(players, games, max_consecutive=self.max_consecutive, **options)
+
+
+def _with_max_consecutive(strategy, value):
+    """Return ``strategy`` using ``value`` as its consecutive-play limit.
+
+    The engine takes the limit in its constructor and logic modules as a
+    ``max_consecutive`` keyword of ``next_game``; neither is changed in place.
+    """
+    if value is None:
+        return strategy
+    if isinstance(strategy, Engine):
+        return Engine(
+            "singles" if strategy.team_size == 1 else "doubles",
+            strategy.courts_count,
+            max_consecutive=value,
+        )
+    if hasattr(strategy, "MAX_CONSECUTIVE"):
+        return _Limited(strategy, value)
+    return strategy
+
+
+def play_event(strategy, players_count, games_count, seed, win_model=coin_flip,
+               pairing="random", budget_ms=None):
+    """Play one synthetic event and return its metrics as a tuple (see METRICS).
+
+    Draws go through ``next_round`` when the strategy fills more than one
+    court, as /drawing does; ``games_count`` counts games, and streaks and
+    rests count rounds. ``imbalance`` is the mean of |P(team A wins) - 0.5|
+    under skill_logistic, whatever ``win_model`` decides the games. With
+    ``pairing="balanced"`` the draws are seated by a BalancedPairer that
+    knows the true skills. Everything random comes from one
+    ``random.Random(seed)``, handed to strategies that take an ``rng``; the
+    global ``random`` is left alone.
+    """
+    rng = random.Random(seed)
+    players = [f"P{i:02}" for i in range(1, players_count + 1)]
+    skills = {p: rng.gauss(0, 200) for p in players}
+
+    state = SchedulerState(players)
+    draw_options = {"rng": rng} if accepts_rng(strategy) else {}
+    if pairing == "balanced" and accepts_pairer(strategy):
+        from logic.pairing import DEFAULT_BUDGET_MS, DEFAULT_RATING, BalancedPairer
+
+        draw_options["pairer"] = BalancedPairer(
+            {p: DEFAULT_RATING + skill for p, skill in skills.items()},
+            state.partners, state.opponents,
+            budget_ms=DEFAULT_BUDGET_MS if budget_ms is None else budget_ms, seed=seed,
+        )
+    courts = courts_in_play(strategy, players_count)
+    games = []
+    streak = dict.fromkeys(players, 0)
+    rest = dict.fromkeys(players, 0)
+    max_streak = 0
+    max_rest = 0
+    draw_seconds = 0.0
+    slowest_draw = 0.0
+    imbalance = 0.0
+
+    while len(games) < games_count:
+        game_no = len(games) + 1
+        started = time.perf_counter()
+        if courts > 1:
+            drawn = strategy.next_round(players, games, force_no=game_no, state=state, **draw_options)
+        else:
+            drawn = [strategy.next_game(players, games, force_no=game_no, state=state, **draw_options)]
+        elapsed = time.perf_counter() - started
+        draw_seconds += elapsed
+        slowest_draw = max(slowest_draw, elapsed)
+
+        drawn = drawn[:games_count - len(games)]
+        for offset, game in enumerate(drawn):
+            game["match_id"] = f"sim-{game_no + offset}"
+            state.record(game)
+        on_court = set()
+        for game in drawn:
+            team_a, team_b = game["teams"][0], game["teams"][1]
+            imbalance += abs(skill_logistic(team_a, team_b, skills) - 0.5)
+            game["winner"] = "A" if rng.random() < win_model(team_a, team_b, skills) else "B"
+            state.record_result(game["match_id"], game["winner"])
+            games.append(game)
+            on_court.update(team_a, team_b)
+
+        for player in players:
+            if player in on_court:
+                streak[player] += 1
+                rest[player] = 0
+                if streak[player] > max_streak:
+                    max_streak = streak[player]
+            else:
+                streak[player] = 0
+                rest[player] += 1
+                if rest[player] > max_rest:
+                    max_rest = rest[player]
+
+    played = [state.played[p] for p in players]
+    partner_repeats = sum(count - 1 for count in state.partners.values() if count > 1)
+    draws_per_sec = games_count / draw_seconds if draw_seconds else math.inf
+    return (
+        min(played),
+        max(played),
+        max(played) - min(played),
+        max_streak,
+        max_rest,
+        partner_repeats,
+        imbalance / games_count,
+        draws_per_sec,
+        slowest_draw * 1000,
+    )
+
+
+def _run_chunk(config, seeds, games_count, win_model, max_consecutive, pairing="random", budget_ms=None):
+    game_type, game_format, players_count, courts_count = config
+    strategy = load_logic(game_type, game_format, players_count, courts_count)
+    if strategy is None:
+        raise ValueError(f"No game logic for {game_type}/{game_format} {players_count}p{courts_count}c")
+    strategy = _with_max_consecutive(strategy, max_consecutive)
+    model = WIN_MODELS[win_model] if isinstance(win_model, str) else win_model
+    return [
+        play_event(strategy, players_count, games_count, seed, model, pairing, budget_ms)
+        for seed in seeds
+    ]
+
+
+def simulate_events(config, events, games_count, seed=0, win_model="coin",
+                    max_consecutive=None, workers=None, chunk_size=250,
+                    pairing="random", budget_ms=None):
+    """Play ``events`` seeded events of ``config`` and return per-event metrics.
+
+    ``config`` is (game_type, game_format, players_count, courts_count).
+    Events are spread over a process pool unless ``workers`` is 1.
+    ``pairing`` is one of PAIRINGS; "balanced" needs NumPy.
+    """
+    seeds = [seed + i for i in range(events)]
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(chunks) == 1:
+        results = []
+        for chunk in chunks:
+            results.extend(_run_chunk(config, chunk, games_count, win_model, max_consecutive, pairing, budget_ms))
+        return results
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_chunk, config, chunk, games_count, win_model, max_consecutive, pairing, budget_ms)
+            for chunk in chunks
+        ]
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def aggregate(results, use_numpy=False):
+    """Summarise per-event metrics as {metric: {"mean", "p95", "max"}}."""
+    if use_numpy:
+        import numpy as np
+
+        data = np.asarray(results, dtype=float).reshape(-1, len(METRICS))
+        data[np.isinf(data)] = np.nan
+        return {
+            name: {
+                "mean": float(np.nanmean(data[:, i])) if len(data) else 0.0,
+                "p95": float(np.nanpercentile(data[:, i], 95)) if len(data) else 0.0,
+                "max": float(np.nanmax(data[:, i])) if len(data) else 0.0,
+            }
+            for i, name in enumerate(METRICS)
+        }
+
+    summary = {}
+    for i, name in enumerate(METRICS):
+        values = sorted(row[i] for row in results if not math.isinf(row[i]))
+        summary[name] = {
+            "mean": sum(values) / len(values) if values else 0.0,
+            "p95": float(_percentile(values, 95)),
+            "max": float(values[-1]) if values else 0.0,
+        }
+    return summary
@@ -0,0 +1,126 @@
+from collections import Counter
+
+
+def round_key(game: dict, index: int):
+    """Games drawn together share a round_no; older games are their own round."""
+    round_no = game.get("round_no")
+    if round_no is None:
+        round_no = game.get("game_no")
+    return round_no if round_no is not None else index
+
+
+def flatten(game: dict) -> list[str]:
+    flat = []
+    for team in game.get("teams") or []:
+        flat.extend(team)
+    return flat
+
+
+def winners(game: dict) -> list[str]:
+    teams = game.get("teams") or []
+    winner_side = game.get("winner")
+    if winner_side in {"A", "B"} and len(teams) > 1:
+        return list(teams[0 if winner_side == "A" else 1])
+    return list(teams[0]) if teams else []
+
+
+def _pair(a: str, b: str) -> tuple:
+    return (a, b) if a <= b else (b, a)
+
+
+class SchedulerState:
+    """Running per-event tallies so a draw never has to rescan the history.
+
+    ``record`` is called when a game is locked and ``record_result`` once its
+    winner is known; both touch only the players of that game, plus one pass
+    over the roster when a new round starts.
+    """
+
+    def __init__(self, players):
+        self.players = list(players)
+        self.round_no = None
+        self.last_round = []  # games of the most recent round
+        self.consecutive = {}  # rounds played in a row, up to the last round
+        self.played = Counter()  # games played
+        self.last_rest = {}  # last round_no each player sat out
+        self.partners = Counter()  # (a, b) -> games as teammates
+        self.opponents = Counter()  # (a, b) -> games on opposite sides
+        self.games_recorded = 0
+        self._previous = {}
+        self._on_court = set()
+
+    @classmethod
+    def from_games(cls, players, games):
+        """Rebuild the state from a locked game list (one-off O(history))."""
+        state = cls(players)
+        for game in games:
+            state.record(game)
+        return state
+
+    @property
+    def last_game(self):
+        return self.last_round[-1] if self.last_round else None
+
+    def last_players(self) -> set:
+        return set(self._on_court)
+
+    def matches(self, players, games) -> bool:
+        """Cheap check that this state reflects ``games`` for ``players``."""
+        if self.players != list(players) or self.games_recorded != len(games):
+            return False
+        if not games:
+            return True
+        last = self.last_game or {}
+        return (
+            last.get("match_id") == games[-1].get("match_id")
+            and last.get("winner") == games[-1].get("winner")
+        )
+
+    def record(self, game: dict):
+        """Add a locked game to the tallies."""
+        key = round_key(game, self.games_recorded)
+        if key != self.round_no:
+            self._start_round(key)
+
+        teams = [list(team) for team in game.get("teams") or []]
+        self.last_round.append({
+            "game_no": game.get("game_no"),
+            "round_no": key,
+            "match_id": game.get("match_id"),
+            "teams": teams,
+            "winner": game.get("winner"),
+        })
+        self.games_recorded += 1
+
+        for team in teams:
+            for player in team:
+                self.consecutive[player] = self._previous.get(player, 0) + 1
+                self.played[player] += 1
+                self._on_court.add(player)
+            for i, a in enumerate(team):
+                for b in team[i + 1:]:
+                    self.partners[_pair(a, b)] += 1
+        for i, team in enumerate(teams):
+            for other in teams[i + 1:]:
+                for a in team:
+                    for b in other:
+                        self.opponents[_pair(a, b)] += 1
+
+    def record_result(self, match_id, winner):
+        """Attach the winner to a game of the current round."""
+        for game in self.last_round:
+            if game.get("match_id") == match_id:
+                game["winner"] = winner
+                return True
+        return False
+
+    def _start_round(self, key):
+        if self.round_no is not None:
+            for player in self.players:
+                if player not in self._on_court:
+                    self.last_rest[player] = self.round_no
+        self.round_no = key
+        self._previous = self.consecutive
+        self.consecutive = {}
+        self.last_round = []
+        self._on_court = set()
@@ -0,0 +1,123 @@
+import sqlalchemy as sa
+
+from models import db, Match, MatchPlayer, MatchSide, Standing, event_pk, resolve_event_pk
+from pagecache import bump_event_version
+from ratings import rate_match
+from standings import drawn_counts, record_match_result
+
+
+def _resolve(team, players_by_name):
+    """Return [(player key, player_code)] for a team of player names.
+
+    Names not on the roster get no key (and so no standing).
+    """
+    resolved = []
+    for idx, player_name in enumerate(team, start=1):
+        player = players_by_name.get(player_name)
+        if player:
+            resolved.append((player.id, player.player_code))
+        else:
+            resolved.append((None, f"P-{idx:02}"))
+    return resolved
+
+
+def _bump_match_counters(game_id, player_pks):
+    """Increment and return each player's drawn-match counter for the event."""
+    if not player_pks:
+        return {}
+    event = event_pk(game_id)
+    Standing.query.filter(
+        Standing.event_pk == event, Standing.player_pk.in_(player_pks)
+    ).update(
+        {Standing.matches_drawn: Standing.matches_drawn + 1},
+        synchronize_session=False,
+    )
+    counters = dict(
+        db.session.query(Standing.player_pk, Standing.matches_drawn)
+        .filter(Standing.event_pk == event, Standing.player_pk.in_(player_pks))
+        .all()
+    )
+
+    # Legacy events without standings rows: count what was drawn so far.
+    missing = [pk for pk in player_pks if pk not in counters]
+    if missing:
+        counts = drawn_counts(game_id, missing)
+        for pk in missing:
+            counters[pk] = counts.get(pk, 0) + 1
+    return counters
+
+
+def lock_match(game_id, game, players_by_name, start_dt):
+    """Write a drawn game: one Match, its two sides and their seats (no commit)."""
+    teams = [
+        ("A" if side == 1 else "B", _resolve(team, players_by_name))
+        for side, team in enumerate(game.get("teams", []), start=1)
+    ]
+    counters = _bump_match_counters(
+        game_id, [pk for _, members in teams for pk, _ in members if pk is not None]
+    )
+
+    match = Match(
+        event_pk=resolve_event_pk(game_id),
+        match_id=game["match_id"],
+        game_no=game["game_no"],
+        court_no=game.get("court_no") or "A",
+        start_at=start_dt,
+        sides=[
+            MatchSide(side=team_side, members=[
+                MatchPlayer(player_pk=player_pk, player_code=player_code,
+                            player_match_number=counters.get(player_pk, 1))
+                for player_pk, player_code in members
+            ])
+            for team_side, members in teams
+        ],
+    )
+    db.session.add(match)
+    db.session.flush()
+    bump_event_version(game_id)
+    return match
+
+
+def finish_match(game_id, game, result, start_dt, end_dt, seconds):
+    """Record a finished game on its Match and sides, standings, court time and ratings (no commit).
+
+    Returns False, changing nothing, when the match was already finished.
+    """
+    match_pk = db.session.scalar(
+        sa.update(Match)
+        .where(Match.match_id == game["match_id"], Match.end_at.is_(None))
+        .values(start_at=start_dt, end_at=end_dt, duration_seconds=seconds)
+        .returning(Match.id)
+    )
+    if match_pk is None:
+        return False
+
+    if result["winner"] == "T":
+        outcome = "T"
+    else:
+        outcome = sa.case((MatchSide.side == result["winner"], "W"), else_="L")
+    db.session.execute(
+        sa.update(MatchSide)
+        .where(MatchSide.match_pk == match_pk)
+        .values(
+            score=sa.case((MatchSide.side == "A", result["scoreA"]), else_=result["scoreB"]),
+            result=outcome,
+        )
+    )
+
+    teams = {"A": [], "B": []}
+    seats = db.session.execute(
+        sa.select(MatchSide.side, MatchPlayer.player_pk)
+        .join(MatchPlayer, MatchPlayer.side_pk == MatchSide.id)
+        .where(MatchSide.match_pk == match_pk)
+        .order_by(MatchPlayer.id)
+    )
+    for side, player_pk in seats:
+        teams.setdefault(side, []).append(player_pk)
+
+    record_match_result(
+        game_id, [teams["A"], teams["B"]], result["scoreA"], result["scoreB"], result["winner"], seconds
+    )
+    rate_match(match_pk, [teams["A"], teams["B"]], result["winner"], end_dt)
+    bump_event_version(game_id)
+    return True
@@ -0,0 +1,268 @@
+"""Prometheus metrics in the text exposition format, served at /metrics.
+
+Counters and histograms are kept in memory with no client library, so
+each worker process has its own: a scrape sees the numbers of whichever
+worker answers it. Run one worker per scrape target when exact totals
+matter. Metric names:
+
+    matchmaker_request_duration_seconds   histogram by route and action
+    matchmaker_requests_total             counter by route, action and status
+    matchmaker_request_sql_queries        histogram of SQL statements per request
+    matchmaker_request_sql_seconds        histogram of SQL time per request
+    matchmaker_sql_queries_total          every statement, requests or not
+    matchmaker_sql_seconds_total
+    matchmaker_next_game_seconds          time in the logic's next_game, by pairing
+    matchmaker_session_cookie_bytes       size of the session cookie sent in
+    matchmaker_event_state_bytes          size of the live event state written
+    matchmaker_active_events              events with a request in the last ACTIVE_WINDOW
+    matchmaker_page_cache_*               page cache hits, misses and size
+    matchmaker_live_subscribers           open /live streams
+
+The action label is "<route>:<action>" for POSTs that carry a known
+``action`` field (drawing:next, game_session:end, ...) and the route name
+otherwise, so label values stay a small fixed set.
+"""
+import bisect
+import contextvars
+import math
+import threading
+import time
+
+import sqlalchemy as sa
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+BYTES_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+ACTIVE_WINDOW = 15 * 60  # seconds
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# -------------------- Metric types --------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def lines(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values: [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def lines(self):
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), values):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.label_names, key, [('le', _number(bound))])} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, key)} {_number(values[-1])}"
+            yield f"{self.name}_count{_labels(self.label_names, key)} {cumulative}"
+
+
+class Callback:
+    """A gauge or counter read when scraped; ``read()`` returns a number."""
+
+    def __init__(self, name, kind, help, read):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.read = read
+
+    def lines(self):
+        yield f"{self.name} {_number(self.read())}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def callback(self, name, kind, help, read):
+        return self.register(Callback(name, kind, help, read))
+
+    def render(self):
+        out = []
+        for metric in self.metrics:
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.lines())
+        return "\n".join(out) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    "matchmaker_request_duration_seconds", "Time to build the response.", ("route", "action")
+)
+REQUESTS = registry.counter(
+    "matchmaker_requests_total", "Requests answered.", ("route", "action", "status")
+)
+REQUEST_SQL_QUERIES = registry.histogram(
+    "matchmaker_request_sql_queries", "SQL statements run by one request.", ("route", "action"), QUERY_BUCKETS
+)
+REQUEST_SQL_SECONDS = registry.histogram(
+    "matchmaker_request_sql_seconds", "Time in SQL statements for one request.", ("route", "action")
+)
+SQL_QUERIES = registry.counter("matchmaker_sql_queries_total", "SQL statements run.")
+SQL_SECONDS = registry.counter("matchmaker_sql_seconds_total", "Time in SQL statements.")
+NEXT_GAME_SECONDS = registry.histogram(
+    "matchmaker_next_game_seconds", "Time in the logic's next_game for one draw.", ("pairing",)
+)
+SESSION_BYTES = registry.histogram(
+    "matchmaker_session_cookie_bytes", "Size of the session cookie a request carries.", buckets=BYTES_BUCKETS
+)
+EVENT_STATE_BYTES = registry.histogram(
+    "matchmaker_event_state_bytes", "Size of the live event state saved to the event store.", buckets=BYTES_BUCKETS
+)
+
+
+# -------------------- Active events --------------------
+class ActiveEvents:
+    """Events that had a request in the last ``window`` seconds."""
+
+    def __init__(self, window=ACTIVE_WINDOW):
+        self.window = window
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def touch(self, game_id):
+        now = time.monotonic()
+        with self._lock:
+            self._seen[game_id] = now
+
+    def count(self):
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            for game_id in [g for g, seen in self._seen.items() if seen < cutoff]:
+                del self._seen[game_id]
+            return len(self._seen)
+
+
+active_events = ActiveEvents()
+registry.callback(
+    "matchmaker_active_events", "gauge", "Events with a request in the last 15 minutes.", active_events.count
+)
+
+
+# -------------------- Requests and SQL --------------------
+class RequestStats:
+    __slots__ = ("started", "queries", "sql_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+
+_current = contextvars.ContextVar("matchmaker_request_stats", default=None)
+
+
+def start_request():
+    """Start timing a request; SQL run in this context until it finishes is counted to it."""
+    stats = RequestStats()
+    _current.set(stats)
+    return stats
+
+
+def finish_request(stats, route, action, status):
+    """Record a finished request started by start_request."""
+    _current.set(None)
+    REQUEST_SECONDS.observe(time.perf_counter() - stats.started, route=route, action=action)
+    REQUESTS.inc(route=route, action=action, status=str(status))
+    REQUEST_SQL_QUERIES.observe(stats.queries, route=route, action=action)
+    REQUEST_SQL_SECONDS.observe(stats.sql_seconds, route=route, action=action)
+
+
+def action_label(route, action, known):
+    """"route:action" for an action in ``known``, "route:other" for any other, else the route."""
+    if not action:
+        return route
+    return f"{route}:{action if action in known else 'other'}"
+
+
+def instrument_engine(engine):
+    """Count and time every statement ``engine`` runs."""
+
+    @sa.event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @sa.event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _record(time.perf_counter() - conn.info["metrics_started"].pop())
+
+    @sa.event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            _record(time.perf_counter() - started.pop())
+
+
+def _record(seconds):
+    SQL_QUERIES.inc()
+    SQL_SECONDS.inc(seconds)
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.sql_seconds += seconds
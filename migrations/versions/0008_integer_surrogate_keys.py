@@ -0,0 +1,218 @@
+"""integer surrogate keys
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 19:29:50.180506
+
+Tables join on integer keys instead of the random public ids: each string
+reference becomes an integer column filled from the row it points at, and
+the public ids stay only on their own rows (gameinfo.game_id,
+players.player_id, drawing.match_id) as indexed lookup columns.
+
+Rows whose public id no longer resolves cannot be keyed and are dropped;
+drawing seats whose name is not on the roster keep a NULL player_pk.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+NEW_KEYS = {
+    'playground': ('event_pk',),
+    'players': ('event_pk',),
+    'drawing': ('event_pk', 'player_pk'),
+    'match_details': ('drawing_pk',),
+    'standings': ('event_pk', 'player_pk'),
+    'rally_log': ('event_pk',),
+}
+
+OLD_KEYS = {
+    'playground': (('game_id', 24),),
+    'players': (('game_id', 24),),
+    'drawing': (('game_id', 24), ('player_id', 10)),
+    'match_details': (('match_id', 32), ('player_id', 10)),
+    'standings': (('game_id', 24), ('player_id', 10)),
+    'rally_log': (('game_id', 24),),
+}
+
+EVENT_PK = "(SELECT gameinfo.id FROM gameinfo WHERE gameinfo.game_id = {table}.game_id)"
+GAME_ID = "(SELECT gameinfo.game_id FROM gameinfo WHERE gameinfo.id = {table}.event_pk)"
+
+
+def upgrade():
+    # 1. Integer key columns, nullable until they are filled
+    for table, columns in NEW_KEYS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.add_column(sa.Column(column, sa.Integer(), nullable=True))
+
+    # 2. Fill them from the public ids (match_details before drawing.player_id goes)
+    for table in ('playground', 'players', 'drawing', 'standings', 'rally_log'):
+        op.execute(f"UPDATE {table} SET event_pk = {EVENT_PK.format(table=table)}")
+    op.execute(
+        "UPDATE drawing SET player_pk = "
+        "(SELECT players.id FROM players WHERE players.player_id = drawing.player_id)"
+    )
+    op.execute(
+        "UPDATE standings SET player_pk = "
+        "(SELECT players.id FROM players WHERE players.player_id = standings.player_id)"
+    )
+    op.execute(
+        "UPDATE match_details SET drawing_pk = (SELECT MIN(drawing.id) FROM drawing "
+        "WHERE drawing.match_id = match_details.match_id "
+        "AND drawing.player_id = match_details.player_id)"
+    )
+
+    op.execute("DELETE FROM match_details WHERE drawing_pk IS NULL")
+    op.execute(
+        "DELETE FROM match_details WHERE id NOT IN "
+        "(SELECT MIN(id) FROM match_details GROUP BY drawing_pk)"
+    )
+    op.execute("DELETE FROM standings WHERE event_pk IS NULL OR player_pk IS NULL")
+    for table in ('playground', 'players', 'drawing', 'rally_log'):
+        op.execute(f"DELETE FROM {table} WHERE event_pk IS NULL")
+
+    # 3. Swap the keys: old indexes and columns out, NOT NULL and constraints in
+    with op.batch_alter_table('playground', schema=None) as batch_op:
+        batch_op.drop_index('ix_playground_game_id')
+        batch_op.drop_column('game_id')
+        batch_op.alter_column('event_pk', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index('ix_playground_event_pk', ['event_pk'], unique=False)
+        batch_op.create_foreign_key('fk_playground_event_pk', 'gameinfo', ['event_pk'], ['id'])
+
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_index('ix_players_game_code')
+        batch_op.drop_column('game_id')
+        batch_op.alter_column('event_pk', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index('ix_players_event_code', ['event_pk', 'player_code'], unique=False)
+        batch_op.create_foreign_key('fk_players_event_pk', 'gameinfo', ['event_pk'], ['id'])
+
+    with op.batch_alter_table('drawing', schema=None) as batch_op:
+        batch_op.drop_index('ix_drawing_game_no')
+        batch_op.drop_index('ix_drawing_match_player')
+        batch_op.drop_index('ix_drawing_player_id')
+        batch_op.drop_column('player_id')
+        batch_op.drop_column('game_id')
+        batch_op.alter_column('event_pk', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index('ix_drawing_event_game_no', ['event_pk', 'game_no'], unique=False)
+        batch_op.create_index('ix_drawing_match_id', ['match_id'], unique=False)
+        batch_op.create_index('ix_drawing_player_pk', ['player_pk'], unique=False)
+        batch_op.create_foreign_key('fk_drawing_event_pk', 'gameinfo', ['event_pk'], ['id'])
+        batch_op.create_foreign_key('fk_drawing_player_pk', 'players', ['player_pk'], ['id'])
+
+    with op.batch_alter_table('match_details', schema=None) as batch_op:
+        batch_op.drop_index('ix_match_details_match_player')
+        batch_op.drop_index('ix_match_details_player_id')
+        batch_op.drop_column('match_id')
+        batch_op.drop_column('player_id')
+        batch_op.alter_column('drawing_pk', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_unique_constraint('uq_match_details_drawing', ['drawing_pk'])
+        batch_op.create_foreign_key('fk_match_details_drawing_pk', 'drawing', ['drawing_pk'], ['id'])
+
+    with op.batch_alter_table('standings', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_standings_game_player', type_='unique')
+        batch_op.drop_index('ix_standings_rank')
+        batch_op.drop_column('player_id')
+        batch_op.drop_column('game_id')
+        batch_op.alter_column('event_pk', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('player_pk', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index('ix_standings_rank', ['event_pk', 'points', 'point_diff', 'wins'], unique=False)
+        batch_op.create_unique_constraint('uq_standings_event_player', ['event_pk', 'player_pk'])
+        batch_op.create_foreign_key('fk_standings_event_pk', 'gameinfo', ['event_pk'], ['id'])
+        batch_op.create_foreign_key('fk_standings_player_pk', 'players', ['player_pk'], ['id'])
+
+    with op.batch_alter_table('rally_log', schema=None) as batch_op:
+        batch_op.drop_column('game_id')
+        batch_op.alter_column('event_pk', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_rally_log_event_pk', 'gameinfo', ['event_pk'], ['id'])
+
+
+def downgrade():
+    # 1. Public id columns back, nullable until they are filled
+    for table, columns in OLD_KEYS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column, length in columns:
+                batch_op.add_column(sa.Column(column, sa.VARCHAR(length=length), nullable=True))
+
+    # 2. Fill them from the integer keys
+    for table in ('playground', 'players', 'drawing', 'standings', 'rally_log'):
+        op.execute(f"UPDATE {table} SET game_id = {GAME_ID.format(table=table)}")
+    for table in ('drawing', 'standings'):
+        op.execute(
+            f"UPDATE {table} SET player_id = "
+            f"(SELECT players.player_id FROM players WHERE players.id = {table}.player_pk)"
+        )
+    # Names that were never on the roster had an empty player_id before 0008
+    op.execute("UPDATE drawing SET player_id = '' WHERE player_id IS NULL")
+    op.execute(
+        "UPDATE match_details SET "
+        "match_id = (SELECT drawing.match_id FROM drawing WHERE drawing.id = match_details.drawing_pk), "
+        "player_id = (SELECT drawing.player_id FROM drawing WHERE drawing.id = match_details.drawing_pk)"
+    )
+
+    # 3. Swap back
+    with op.batch_alter_table('rally_log', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_rally_log_event_pk', type_='foreignkey')
+        batch_op.drop_column('event_pk')
+        batch_op.alter_column('game_id', existing_type=sa.VARCHAR(length=24), nullable=False)
+        batch_op.create_foreign_key('fk_rally_log_game_id', 'gameinfo', ['game_id'], ['game_id'])
+
+    with op.batch_alter_table('standings', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_standings_player_pk', type_='foreignkey')
+        batch_op.drop_constraint('fk_standings_event_pk', type_='foreignkey')
+        batch_op.drop_constraint('uq_standings_event_player', type_='unique')
+        batch_op.drop_index('ix_standings_rank')
+        batch_op.drop_column('player_pk')
+        batch_op.drop_column('event_pk')
+        batch_op.alter_column('game_id', existing_type=sa.VARCHAR(length=24), nullable=False)
+        batch_op.alter_column('player_id', existing_type=sa.VARCHAR(length=10), nullable=False)
+        batch_op.create_index('ix_standings_rank', ['game_id', 'points', 'point_diff', 'wins'], unique=False)
+        batch_op.create_unique_constraint('uq_standings_game_player', ['game_id', 'player_id'])
+        batch_op.create_foreign_key('fk_standings_game_id', 'gameinfo', ['game_id'], ['game_id'])
+
+    with op.batch_alter_table('match_details', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_match_details_drawing_pk', type_='foreignkey')
+        batch_op.drop_constraint('uq_match_details_drawing', type_='unique')
+        batch_op.drop_column('drawing_pk')
+        batch_op.alter_column('match_id', existing_type=sa.VARCHAR(length=32), nullable=False)
+        batch_op.alter_column('player_id', existing_type=sa.VARCHAR(length=10), nullable=False)
+        batch_op.create_index('ix_match_details_match_player', ['match_id', 'player_id'], unique=False)
+        batch_op.create_index('ix_match_details_player_id', ['player_id'], unique=False)
+        batch_op.create_foreign_key('fk_match_details_match_id', 'drawing', ['match_id'], ['match_id'])
+
+    with op.batch_alter_table('drawing', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_drawing_player_pk', type_='foreignkey')
+        batch_op.drop_constraint('fk_drawing_event_pk', type_='foreignkey')
+        batch_op.drop_index('ix_drawing_player_pk')
+        batch_op.drop_index('ix_drawing_match_id')
+        batch_op.drop_index('ix_drawing_event_game_no')
+        batch_op.drop_column('player_pk')
+        batch_op.drop_column('event_pk')
+        batch_op.alter_column('game_id', existing_type=sa.VARCHAR(length=24), nullable=False)
+        batch_op.alter_column('player_id', existing_type=sa.VARCHAR(length=10), nullable=False)
+        batch_op.create_index('ix_drawing_game_no', ['game_id', 'game_no'], unique=False)
+        batch_op.create_index('ix_drawing_match_player', ['match_id', 'player_id'], unique=False)
+        batch_op.create_index('ix_drawing_player_id', ['player_id'], unique=False)
+        batch_op.create_foreign_key('fk_drawing_game_id', 'gameinfo', ['game_id'], ['game_id'])
+
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_players_event_pk', type_='foreignkey')
+        batch_op.drop_index('ix_players_event_code')
+        batch_op.drop_column('event_pk')
+        batch_op.alter_column('game_id', existing_type=sa.VARCHAR(length=24), nullable=False)
+        batch_op.create_index('ix_players_game_code', ['game_id', 'player_code'], unique=False)
+        batch_op.create_foreign_key('fk_players_game_id', 'gameinfo', ['game_id'], ['game_id'])
+
+    with op.batch_alter_table('playground', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_playground_event_pk', type_='foreignkey')
+        batch_op.drop_index('ix_playground_event_pk')
+        batch_op.drop_column('event_pk')
+        batch_op.alter_column('game_id', existing_type=sa.VARCHAR(length=24), nullable=False)
+        batch_op.create_index('ix_playground_game_id', ['game_id'], unique=False)
+        batch_op.create_foreign_key('fk_playground_game_id', 'gameinfo', ['game_id'], ['game_id'])
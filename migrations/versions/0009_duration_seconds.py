@@ -0,0 +1,111 @@
+"""duration seconds
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 19:36:02.534845
+
+match_details.match_duration ("H:MM:SS", or "N days, H:MM:SS") becomes
+duration_seconds, and the time-on-court totals are filled from it:
+standings.seconds_played per player and event, gameinfo.matches_finished
+and gameinfo.court_seconds per event.
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def _seconds(value):
+    """Seconds in a str(timedelta) duration, or None when it does not parse."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    days = 0
+    if "day" in value:
+        day_part, _, value = value.partition(", ")
+        try:
+            days = int(day_part.split()[0])
+        except ValueError:
+            return None
+    try:
+        parts = [int(p) for p in value.split(":")]
+    except ValueError:
+        return None
+    parts = [0] * (3 - len(parts)) + parts[-3:]
+    hours, minutes, seconds = parts
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+
+def upgrade():
+    with op.batch_alter_table('gameinfo', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('matches_finished', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('court_seconds', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('standings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seconds_played', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('match_details', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('duration_seconds', sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, match_duration FROM match_details WHERE match_duration IS NOT NULL"
+    )).all()
+    parsed = [{"id": row.id, "seconds": _seconds(row.match_duration)} for row in rows]
+    parsed = [row for row in parsed if row["seconds"] is not None]
+    if parsed:
+        bind.execute(sa.text("UPDATE match_details SET duration_seconds = :seconds WHERE id = :id"), parsed)
+
+    with op.batch_alter_table('match_details', schema=None) as batch_op:
+        batch_op.drop_column('match_duration')
+
+    op.execute(
+        "UPDATE standings SET seconds_played = COALESCE(("
+        "SELECT SUM(md.duration_seconds) FROM match_details md "
+        "JOIN drawing d ON md.drawing_pk = d.id "
+        "WHERE d.event_pk = standings.event_pk AND d.player_pk = standings.player_pk), 0)"
+    )
+    # Every seat of a match carries its duration: count each match once
+    totals = bind.execute(sa.text(
+        "SELECT event_pk, COUNT(*) AS matches, COALESCE(SUM(seconds), 0) AS seconds FROM ("
+        "SELECT d.event_pk AS event_pk, MAX(md.duration_seconds) AS seconds "
+        "FROM match_details md JOIN drawing d ON md.drawing_pk = d.id "
+        "GROUP BY d.event_pk, d.match_id) AS finished GROUP BY event_pk"
+    )).all()
+    if totals:
+        bind.execute(
+            sa.text("UPDATE gameinfo SET matches_finished = :matches, court_seconds = :seconds WHERE id = :event_pk"),
+            [{"event_pk": row.event_pk, "matches": row.matches, "seconds": row.seconds} for row in totals],
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('match_details', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('match_duration', sa.VARCHAR(length=20), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, duration_seconds FROM match_details WHERE duration_seconds IS NOT NULL"
+    )).all()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE match_details SET match_duration = :duration WHERE id = :id"),
+            [{"id": row.id, "duration": str(timedelta(seconds=row.duration_seconds))} for row in rows],
+        )
+
+    with op.batch_alter_table('match_details', schema=None) as batch_op:
+        batch_op.drop_column('duration_seconds')
+
+    with op.batch_alter_table('standings', schema=None) as batch_op:
+        batch_op.drop_column('seconds_played')
+
+    with op.batch_alter_table('gameinfo', schema=None) as batch_op:
+        batch_op.drop_column('court_seconds')
+        batch_op.drop_column('matches_finished')
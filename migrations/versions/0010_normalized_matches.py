@@ -0,0 +1,157 @@
+"""normalized matches
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 19:39:33.565861
+
+
+A doubles match was four drawing rows plus four match_details rows, each
+repeating the match's game number, court, times, duration, and its side's
+score and result. They become one matches row, one match_sides row per
+side and a thin match_players row per seat.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('matches',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('event_pk', sa.Integer(), nullable=False),
+    sa.Column('match_id', sa.String(length=32), nullable=False),
+    sa.Column('game_no', sa.Integer(), nullable=False),
+    sa.Column('court_no', sa.String(length=5), nullable=False),
+    sa.Column('start_at', sa.DateTime(), nullable=True),
+    sa.Column('end_at', sa.DateTime(), nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['event_pk'], ['gameinfo.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('match_id')
+    )
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.create_index('ix_matches_event_game_no', ['event_pk', 'game_no'], unique=False)
+
+    op.create_table('match_sides',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('match_pk', sa.Integer(), nullable=False),
+    sa.Column('side', sa.String(length=1), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=True),
+    sa.Column('result', sa.String(length=1), nullable=True),
+    sa.ForeignKeyConstraint(['match_pk'], ['matches.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('match_pk', 'side', name='uq_match_sides_match_side')
+    )
+    op.create_table('match_players',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('side_pk', sa.Integer(), nullable=False),
+    sa.Column('player_pk', sa.Integer(), nullable=True),
+    sa.Column('player_code', sa.String(length=10), nullable=False),
+    sa.Column('player_match_number', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['player_pk'], ['players.id'], ),
+    sa.ForeignKeyConstraint(['side_pk'], ['match_sides.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('match_players', schema=None) as batch_op:
+        batch_op.create_index('ix_match_players_player_pk', ['player_pk'], unique=False)
+        batch_op.create_index('ix_match_players_side_pk', ['side_pk'], unique=False)
+
+    # A match is finished once any of its seats has a result row
+    op.execute(
+        "INSERT INTO matches (event_pk, match_id, game_no, court_no, start_at, end_at, duration_seconds) "
+        "SELECT MIN(d.event_pk), d.match_id, MIN(d.game_no), MIN(d.court_no), MIN(d.match_start_at), "
+        "CASE WHEN COUNT(md.id) > 0 THEN COALESCE(MAX(md.match_end_at), MIN(d.match_start_at)) END, "
+        "MAX(md.duration_seconds) "
+        "FROM drawing d LEFT JOIN match_details md ON md.drawing_pk = d.id "
+        "GROUP BY d.match_id ORDER BY MIN(d.id)"
+    )
+    op.execute(
+        "INSERT INTO match_sides (match_pk, side, score, result) "
+        "SELECT m.id, d.team_side, MAX(md.team_side_score), MAX(md.winner_flag) "
+        "FROM drawing d JOIN matches m ON m.match_id = d.match_id "
+        "LEFT JOIN match_details md ON md.drawing_pk = d.id "
+        "GROUP BY m.id, d.team_side ORDER BY m.id, d.team_side"
+    )
+    op.execute(
+        "INSERT INTO match_players (side_pk, player_pk, player_code, player_match_number) "
+        "SELECT s.id, d.player_pk, d.player_code, d.player_match_number "
+        "FROM drawing d JOIN matches m ON m.match_id = d.match_id "
+        "JOIN match_sides s ON s.match_pk = m.id AND s.side = d.team_side "
+        "ORDER BY d.id"
+    )
+
+    op.drop_table('match_details')
+    with op.batch_alter_table('drawing', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_drawing_event_game_no'))
+        batch_op.drop_index(batch_op.f('ix_drawing_match_id'))
+        batch_op.drop_index(batch_op.f('ix_drawing_player_pk'))
+
+    op.drop_table('drawing')
+
+
+def downgrade():
+    op.create_table('drawing',
+    sa.Column('id', sa.INTEGER(), nullable=False),
+    sa.Column('game_no', sa.INTEGER(), nullable=False),
+    sa.Column('court_no', sa.VARCHAR(length=5), nullable=False),
+    sa.Column('team_side', sa.VARCHAR(length=5), nullable=False),
+    sa.Column('player_code', sa.VARCHAR(length=10), nullable=False),
+    sa.Column('player_match_number', sa.INTEGER(), nullable=False),
+    sa.Column('match_id', sa.VARCHAR(length=32), nullable=False),
+    sa.Column('match_start_at', sa.DATETIME(), nullable=True),
+    sa.Column('event_pk', sa.INTEGER(), nullable=False),
+    sa.Column('player_pk', sa.INTEGER(), nullable=True),
+    sa.ForeignKeyConstraint(['event_pk'], ['gameinfo.id'], name=op.f('fk_drawing_event_pk')),
+    sa.ForeignKeyConstraint(['player_pk'], ['players.id'], name=op.f('fk_drawing_player_pk')),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('drawing', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_drawing_player_pk'), ['player_pk'], unique=False)
+        batch_op.create_index(batch_op.f('ix_drawing_match_id'), ['match_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_drawing_event_game_no'), ['event_pk', 'game_no'], unique=False)
+
+    op.create_table('match_details',
+    sa.Column('id', sa.INTEGER(), nullable=False),
+    sa.Column('team_side', sa.VARCHAR(length=5), nullable=False),
+    sa.Column('team_side_score', sa.INTEGER(), nullable=True),
+    sa.Column('winner_flag', sa.VARCHAR(length=1), nullable=True),
+    sa.Column('match_start_at', sa.DATETIME(), nullable=True),
+    sa.Column('match_end_at', sa.DATETIME(), nullable=True),
+    sa.Column('drawing_pk', sa.INTEGER(), nullable=False),
+    sa.Column('duration_seconds', sa.INTEGER(), nullable=True),
+    sa.ForeignKeyConstraint(['drawing_pk'], ['drawing.id'], name=op.f('fk_match_details_drawing_pk')),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('drawing_pk', name=op.f('uq_match_details_drawing'))
+    )
+    # Each seat becomes a drawing row under its match_players id
+    op.execute(
+        "INSERT INTO drawing (id, event_pk, game_no, court_no, team_side, player_code, player_pk, "
+        "player_match_number, match_id, match_start_at) "
+        "SELECT mp.id, m.event_pk, m.game_no, m.court_no, s.side, mp.player_code, mp.player_pk, "
+        "mp.player_match_number, m.match_id, m.start_at "
+        "FROM match_players mp JOIN match_sides s ON s.id = mp.side_pk JOIN matches m ON m.id = s.match_pk"
+    )
+    op.execute(
+        "INSERT INTO match_details (drawing_pk, team_side, team_side_score, winner_flag, "
+        "match_start_at, match_end_at, duration_seconds) "
+        "SELECT mp.id, s.side, s.score, s.result, m.start_at, m.end_at, m.duration_seconds "
+        "FROM match_players mp JOIN match_sides s ON s.id = mp.side_pk JOIN matches m ON m.id = s.match_pk "
+        "WHERE s.result IS NOT NULL"
+    )
+
+    with op.batch_alter_table('match_players', schema=None) as batch_op:
+        batch_op.drop_index('ix_match_players_side_pk')
+        batch_op.drop_index('ix_match_players_player_pk')
+
+    op.drop_table('match_players')
+    op.drop_table('match_sides')
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_index('ix_matches_event_game_no')
+
+    op.drop_table('matches')
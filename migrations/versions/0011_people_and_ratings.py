@@ -0,0 +1,150 @@
+"""people and ratings
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 19:45:19.298755
+
+A Person per host and distinct roster name (host email and name
+case-folded, name whitespace collapsed, as ratings.host_key/name_key), with
+every players row linked to it. The same name at two hosts is two people.
+Ratings start at the initial value; `flask rebuild-ratings` replays the
+finished matches into them once after upgrading.
+"""
+import secrets
+import string
+
+from alembic import op
+import sqlalchemy as sa
+
+ID_ALPHABET = string.ascii_letters + string.digits
+
+
+def _name_key(name):
+    return " ".join((name or "").split()).casefold()
+
+
+def _host_key(email):
+    return (email or "").strip().casefold()
+
+
+def _person_id(length=12):
+    n = secrets.randbelow(len(ID_ALPHABET) ** length)
+    chars = []
+    for _ in range(length):
+        n, digit = divmod(n, len(ID_ALPHABET))
+        chars.append(ID_ALPHABET[digit])
+    return "".join(chars)
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('people',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('person_id', sa.String(length=12), nullable=False),
+    sa.Column('display_name', sa.String(length=255), nullable=False),
+    sa.Column('host_key', sa.String(length=255), nullable=False),
+    sa.Column('name_key', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('rating', sa.Float(), server_default='1500', nullable=False),
+    sa.Column('rating_deviation', sa.Float(), server_default='350', nullable=False),
+    sa.Column('rated_matches', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('host_key', 'name_key', name='uq_people_host_name'),
+    sa.UniqueConstraint('person_id')
+    )
+    with op.batch_alter_table('people', schema=None) as batch_op:
+        batch_op.create_index('ix_people_rating', ['rating'], unique=False)
+
+    op.create_table('season_ratings',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('season', sa.String(length=7), nullable=False),
+    sa.Column('person_pk', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Float(), nullable=False),
+    sa.Column('rating_deviation', sa.Float(), nullable=False),
+    sa.Column('rank_score', sa.Float(), nullable=False),
+    sa.Column('matches', sa.Integer(), nullable=False),
+    sa.Column('rated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['person_pk'], ['people.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('season', 'person_pk', name='uq_season_ratings_season_person')
+    )
+    with op.batch_alter_table('season_ratings', schema=None) as batch_op:
+        batch_op.create_index('ix_season_ratings_rank', ['season', 'rank_score'], unique=False)
+
+    op.create_table('rating_snapshots',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('person_pk', sa.Integer(), nullable=False),
+    sa.Column('match_pk', sa.Integer(), nullable=False),
+    sa.Column('rated_at', sa.DateTime(), nullable=False),
+    sa.Column('rating', sa.Float(), nullable=False),
+    sa.Column('rating_deviation', sa.Float(), nullable=False),
+    sa.Column('delta', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['match_pk'], ['matches.id'], ),
+    sa.ForeignKeyConstraint(['person_pk'], ['people.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('person_pk', 'match_pk', name='uq_rating_snapshots_person_match')
+    )
+    with op.batch_alter_table('rating_snapshots', schema=None) as batch_op:
+        batch_op.create_index('ix_rating_snapshots_match_pk', ['match_pk'], unique=False)
+        batch_op.create_index('ix_rating_snapshots_person_rated_at', ['person_pk', 'rated_at'], unique=False)
+
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('person_pk', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_players_person_pk', ['person_pk'], unique=False)
+        batch_op.create_foreign_key('fk_players_person_pk', 'people', ['person_pk'], ['id'])
+
+    # The latest spelling of a name becomes the person's display name
+    bind = op.get_bind()
+    players = bind.execute(sa.text(
+        "SELECT players.id, players.player_name, gameinfo.host_email FROM players "
+        "JOIN gameinfo ON gameinfo.id = players.event_pk ORDER BY players.id"
+    )).all()
+    people = {}
+    for row in players:
+        key = (_host_key(row.host_email), _name_key(row.player_name))
+        if key[1]:
+            people.setdefault(key, {"host": key[0], "key": key[1], "players": []})
+            people[key]["name"] = " ".join(row.player_name.split())
+            people[key]["players"].append(row.id)
+    if people:
+        bind.execute(
+            sa.text(
+                "INSERT INTO people (person_id, display_name, host_key, name_key) "
+                "VALUES (:person_id, :name, :host, :key)"
+            ),
+            [{"person_id": _person_id(), "name": p["name"], "host": p["host"], "key": p["key"]}
+             for p in people.values()],
+        )
+        ids = {(host, key): pk for host, key, pk in bind.execute(sa.text("SELECT host_key, name_key, id FROM people"))}
+        bind.execute(
+            sa.text("UPDATE players SET person_pk = :person_pk WHERE id = :id"),
+            [{"person_pk": ids[key], "id": player_pk} for key, p in people.items() for player_pk in p["players"]],
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_players_person_pk', type_='foreignkey')
+        batch_op.drop_index('ix_players_person_pk')
+        batch_op.drop_column('person_pk')
+
+    with op.batch_alter_table('rating_snapshots', schema=None) as batch_op:
+        batch_op.drop_index('ix_rating_snapshots_person_rated_at')
+        batch_op.drop_index('ix_rating_snapshots_match_pk')
+
+    op.drop_table('rating_snapshots')
+    with op.batch_alter_table('season_ratings', schema=None) as batch_op:
+        batch_op.drop_index('ix_season_ratings_rank')
+
+    op.drop_table('season_ratings')
+    with op.batch_alter_table('people', schema=None) as batch_op:
+        batch_op.drop_index('ix_people_rating')
+
+    op.drop_table('people')
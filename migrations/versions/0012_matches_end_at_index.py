@@ -0,0 +1,27 @@
+"""matches end_at index
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 21:04:37.512208
+
+An import rates its matches by replaying the ratings from its earliest
+match's end on; the index finds those matches without a scan.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.create_index('ix_matches_end_at', ['end_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_index('ix_matches_end_at')
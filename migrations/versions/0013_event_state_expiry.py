@@ -0,0 +1,52 @@
+"""event state expiry
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 22:12:03.418736
+
+Rows saved before this revision expire three days (the default
+MATCHMAKER_EVENT_STORE_TTL) after their last update.
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+DEFAULT_TTL = datetime.timedelta(days=3)
+
+
+def upgrade():
+    with op.batch_alter_table('event_state', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_event_state_expires_at', ['expires_at'], unique=False)
+
+    event_state = sa.table(
+        'event_state',
+        sa.column('event_key', sa.String),
+        sa.column('updated_at', sa.DateTime),
+        sa.column('expires_at', sa.DateTime),
+    )
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(event_state.c.event_key, event_state.c.updated_at)
+        .where(event_state.c.updated_at.is_not(None))
+    ).all()
+    for key, updated_at in rows:
+        conn.execute(
+            event_state.update()
+            .where(event_state.c.event_key == key)
+            .values(expires_at=updated_at + DEFAULT_TTL)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('event_state', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_state_expires_at')
+        batch_op.drop_column('expires_at')
@@ -3,24 +3,38 @@ from flask_sqlalchemy import SQLAlchemy
 import secrets
 import string
 import datetime
-import pytz
+from zoneinfo import ZoneInfo
+
+import sqlalchemy as sa
 
 db = SQLAlchemy()
 
 # -------------------- Helpers --------------------
+# Public ids only appear in URLs and the session; tables join on integer keys.
+ID_ALPHABET = string.ascii_letters + string.digits
+
+def random_id(length):
+    """``length`` characters of [A-Za-z0-9] from a single CSPRNG draw."""
+    n = secrets.randbelow(len(ID_ALPHABET) ** length)
+    chars = []
+    for _ in range(length):
+        n, digit = divmod(n, len(ID_ALPHABET))
+        chars.append(ID_ALPHABET[digit])
+    return ''.join(chars)
+
 def generate_game_id(length=24):
-    chars = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(chars) for _ in range(length))
+    return random_id(length)
 
 def generate_player_id(length=10):
-    chars = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(chars) for _ in range(length))
+    return random_id(length)
 
 def generate_match_id(length=32):
-    chars = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(chars) for _ in range(length))
+    return random_id(length)
 
-JAKARTA_TZ = pytz.timezone("Asia/Jakarta")
+def generate_person_id(length=12):
+    return random_id(length)
+
+JAKARTA_TZ = ZoneInfo("Asia/Jakarta")
 
 def now_jakarta():
     """Return current time in Asia/Jakarta tz (naive for DB)."""
@@ -36,22 +50,31 @@ class GameInfo(db.Model):
     __tablename__ = "gameinfo"
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    game_id = db.Column(db.String(24), unique=True, default=generate_game_id)
+    game_id = db.Column(db.String(24), unique=True, default=generate_game_id)  # public id
     game_name = db.Column(db.String(255), nullable=False)
     game_place = db.Column(db.String(255), nullable=False)
     host_email = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=now_jakarta)
+    # Bumped with every Match/MatchSide/Player write; read views' ETags use it
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Finished matches and their summed durations (court time), kept up to date on each result
+    matches_finished = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    court_seconds = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     playground = db.relationship("Playground", backref="game", uselist=False, cascade="all, delete-orphan")
     players = db.relationship("Player", backref="game", cascade="all, delete-orphan")
-    drawings = db.relationship("Drawing", backref="game", cascade="all, delete-orphan")
+    matches = db.relationship("Match", backref="game", cascade="all, delete-orphan")
+    standings = db.relationship("Standing", backref="game", cascade="all, delete-orphan")
 
 
 class Playground(db.Model):
     __tablename__ = "playground"
+    __table_args__ = (
+        db.Index("ix_playground_event_pk", "event_pk"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    game_id = db.Column(db.String(24), db.ForeignKey("gameinfo.game_id"), nullable=False)
+    event_pk = db.Column(db.Integer, db.ForeignKey("gameinfo.id"), nullable=False)
 
     sport = db.Column(db.String(50), nullable=False)
     game_type = db.Column(db.String(50), nullable=False)
@@ -60,56 +83,200 @@ class Playground(db.Model):
     courts_count = db.Column(db.Integer, nullable=False)
 
 
+class Person(db.Model):
+    """One real player across a host's events; every event's Player row links to a Person."""
+    __tablename__ = "people"
+    __table_args__ = (
+        db.Index("ix_people_rating", "rating"),
+        db.UniqueConstraint("host_key", "name_key", name="uq_people_host_name"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    person_id = db.Column(db.String(12), nullable=False, unique=True, default=generate_person_id)  # public id
+    display_name = db.Column(db.String(255), nullable=False)
+    host_key = db.Column(db.String(255), nullable=False)  # see ratings.host_key
+    name_key = db.Column(db.String(255), nullable=False)  # see ratings.name_key
+    created_at = db.Column(db.DateTime, default=now_jakarta)
+
+    # Current Glicko rating, updated on every rated match (see ratings.py)
+    rating = db.Column(db.Float, nullable=False, default=1500.0, server_default="1500")
+    rating_deviation = db.Column(db.Float, nullable=False, default=350.0, server_default="350")
+    rated_matches = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rated_at = db.Column(db.DateTime, nullable=True)  # end of the last rated match
+
+    players = db.relationship("Player", backref="person")
+
+
 class Player(db.Model):
     __tablename__ = "players"
+    __table_args__ = (
+        db.Index("ix_players_event_code", "event_pk", "player_code"),
+        db.Index("ix_players_person_pk", "person_pk"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     player_code = db.Column(db.String(10), nullable=False)  # e.g. P-01
-    player_id = db.Column(db.String(10), nullable=False, unique=True, default=generate_player_id)
+    player_id = db.Column(db.String(10), nullable=False, unique=True, default=generate_player_id)  # public id
     player_name = db.Column(db.String(255), nullable=False)
-    game_id = db.Column(db.String(24), db.ForeignKey("gameinfo.game_id"), nullable=False)
+    event_pk = db.Column(db.Integer, db.ForeignKey("gameinfo.id"), nullable=False)
+    person_pk = db.Column(db.Integer, db.ForeignKey("people.id"), nullable=True)  # NULL until linked
 
 
-class Drawing(db.Model):
-    __tablename__ = "drawing"
+class Match(db.Model):
+    """One drawn game: two MatchSide rows, each with its MatchPlayer members."""
+    __tablename__ = "matches"
+    __table_args__ = (
+        db.Index("ix_matches_event_game_no", "event_pk", "game_no"),
+        db.Index("ix_matches_end_at", "end_at"),  # rating replays from a point in time
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    game_id = db.Column(db.String(24), db.ForeignKey("gameinfo.game_id"), nullable=False)
+    event_pk = db.Column(db.Integer, db.ForeignKey("gameinfo.id"), nullable=False)
+    match_id = db.Column(db.String(32), nullable=False, unique=True, default=generate_match_id)  # public id (score API)
 
     game_no = db.Column(db.Integer, nullable=False)
     court_no = db.Column(db.String(5), nullable=False)  # "A", "B", "C"
-    team_side = db.Column(db.String(5), nullable=False)  # "A" or "B"
 
+    start_at = db.Column(db.DateTime, default=now_jakarta)
+    end_at = db.Column(db.DateTime, nullable=True)  # NULL until the result is in
+    duration_seconds = db.Column(db.Integer, nullable=True)  # time in play
+
+    sides = db.relationship("MatchSide", backref="match", cascade="all, delete-orphan", order_by="MatchSide.side")
+
+    def end_match(self):
+        """Mark this match as ended and calculate duration."""
+        self.end_at = now_jakarta()
+        if self.start_at:
+            self.duration_seconds = int((self.end_at - self.start_at).total_seconds())
+        else:
+            self.duration_seconds = None
+
+
+class MatchSide(db.Model):
+    __tablename__ = "match_sides"
+    __table_args__ = (
+        db.UniqueConstraint("match_pk", "side", name="uq_match_sides_match_side"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    match_pk = db.Column(db.Integer, db.ForeignKey("matches.id"), nullable=False)
+    side = db.Column(db.String(1), nullable=False)  # "A" or "B"
+    score = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.String(1), nullable=True)  # W / L / T, NULL until finished
+
+    members = db.relationship("MatchPlayer", backref="side", cascade="all, delete-orphan")
+
+
+class MatchPlayer(db.Model):
+    """A player's seat on one side of a match."""
+    __tablename__ = "match_players"
+    __table_args__ = (
+        db.Index("ix_match_players_side_pk", "side_pk"),
+        db.Index("ix_match_players_player_pk", "player_pk"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    side_pk = db.Column(db.Integer, db.ForeignKey("match_sides.id"), nullable=False)
+    player_pk = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=True)  # NULL: name not on the roster
     player_code = db.Column(db.String(10), nullable=False)
-    player_id = db.Column(db.String(10), nullable=False)
     player_match_number = db.Column(db.Integer, nullable=False)
 
-    match_id = db.Column(db.String(32), nullable=False, default=generate_match_id)
-    match_start_at = db.Column(db.DateTime, default=now_jakarta)
 
-    match_details = db.relationship("MatchDetail", backref="drawing", cascade="all, delete-orphan")
+class Standing(db.Model):
+    """Per-event, per-player leaderboard totals, kept up to date on each result."""
+    __tablename__ = "standings"
+    __table_args__ = (
+        db.UniqueConstraint("event_pk", "player_pk", name="uq_standings_event_player"),
+        db.Index("ix_standings_rank", "event_pk", "points", "point_diff", "wins"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    event_pk = db.Column(db.Integer, db.ForeignKey("gameinfo.id"), nullable=False)
+    player_pk = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False)
+    player_code = db.Column(db.String(10), nullable=False)
+    player_name = db.Column(db.String(255), nullable=False)
 
+    games = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    losses = db.Column(db.Integer, nullable=False, default=0)
+    ties = db.Column(db.Integer, nullable=False, default=0)
+    points = db.Column(db.Integer, nullable=False, default=0)
+    point_diff = db.Column(db.Integer, nullable=False, default=0)
+    matches_drawn = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    seconds_played = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
-class MatchDetail(db.Model):
-    __tablename__ = "match_details"
+
+class RatingSnapshot(db.Model):
+    """A person's rating right after one rated match; "rating as of" reads the latest one."""
+    __tablename__ = "rating_snapshots"
+    __table_args__ = (
+        db.UniqueConstraint("person_pk", "match_pk", name="uq_rating_snapshots_person_match"),
+        db.Index("ix_rating_snapshots_person_rated_at", "person_pk", "rated_at"),
+        db.Index("ix_rating_snapshots_match_pk", "match_pk"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    match_id = db.Column(db.String(32), db.ForeignKey("drawing.match_id"), nullable=False)
+    person_pk = db.Column(db.Integer, db.ForeignKey("people.id"), nullable=False)
+    match_pk = db.Column(db.Integer, db.ForeignKey("matches.id"), nullable=False)
+    rated_at = db.Column(db.DateTime, nullable=False)  # the match's end
+    rating = db.Column(db.Float, nullable=False)
+    rating_deviation = db.Column(db.Float, nullable=False)
+    delta = db.Column(db.Float, nullable=False)
 
-    player_id = db.Column(db.String(10), nullable=False)
-    team_side = db.Column(db.String(5), nullable=False)  # "A" or "B"
-    team_side_score = db.Column(db.Integer, default=0)
-    winner_flag = db.Column(db.String(1), nullable=True)  # W / L / T
 
-    match_start_at = db.Column(db.DateTime, default=now_jakarta)
-    match_end_at = db.Column(db.DateTime, nullable=True)
-    match_duration = db.Column(db.String(20), nullable=True)  # HH:MM:SS
+class SeasonRating(db.Model):
+    """A person's latest rating within a season, kept up to date on each rated match."""
+    __tablename__ = "season_ratings"
+    __table_args__ = (
+        db.UniqueConstraint("season", "person_pk", name="uq_season_ratings_season_person"),
+        db.Index("ix_season_ratings_rank", "season", "rank_score"),
+    )
 
-    def end_match(self):
-        """Mark this match detail as ended and calculate duration."""
-        self.match_end_at = now_jakarta()
-        if self.match_start_at:
-            delta = self.match_end_at - self.match_start_at
-            self.match_duration = str(delta).split(".")[0]
-        else:
-            self.match_duration = None
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    season = db.Column(db.String(7), nullable=False)  # see ratings.season_of
+    person_pk = db.Column(db.Integer, db.ForeignKey("people.id"), nullable=False)
+    rating = db.Column(db.Float, nullable=False)
+    rating_deviation = db.Column(db.Float, nullable=False)
+    rank_score = db.Column(db.Float, nullable=False)  # rating less two deviations: season order
+    matches = db.Column(db.Integer, nullable=False, default=0)
+    rated_at = db.Column(db.DateTime, nullable=False)
+
+
+class RallyEntry(db.Model):
+    """One append-only step of a match's live score (point, undo or set)."""
+    __tablename__ = "rally_log"
+    __table_args__ = (
+        db.UniqueConstraint("match_id", "seq", name="uq_rally_log_match_seq"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    event_pk = db.Column(db.Integer, db.ForeignKey("gameinfo.id"), nullable=False)
+    match_id = db.Column(db.String(32), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(1), nullable=False)  # P=point, U=undo, S=set
+    side = db.Column(db.String(1))
+    delta = db.Column(db.Integer)
+    score_a = db.Column(db.Integer)
+    score_b = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=now_jakarta)
+
+
+class EventState(db.Model):
+    """Live per-event state for the SQL event store backend."""
+    __tablename__ = "event_state"
+
+    event_key = db.Column(db.String(64), primary_key=True)
+    payload = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=now_jakarta)
+    expires_at = db.Column(db.DateTime, index=True)  # None: kept until deleted
+
+
+# -------------------- Key lookups --------------------
+def event_pk(game_id):
+    """Integer key of the event with public id ``game_id``, as a scalar subquery."""
+    return sa.select(GameInfo.id).where(GameInfo.game_id == game_id).scalar_subquery()
+
+
+def resolve_event_pk(game_id):
+    """Integer key of the event with public id ``game_id``, or None."""
+    return db.session.scalar(sa.select(GameInfo.id).where(GameInfo.game_id == game_id))
@@ -0,0 +1,94 @@
+"""Event data versions, ETags and a cache of rendered read views.
+
+``gameinfo.data_version`` goes up in the same transaction as every write to
+an event's Match, MatchSide or Player rows (and each redraw). Read views
+derive their ETag from it, answer a matching ``If-None-Match`` with 304
+before running their queries, and keep the rendered page in ``PageCache``
+under (view, game_id, version, ...), so a repeat hit after a new version
+renders once per worker rather than once per poll.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import sqlalchemy as sa
+
+from models import db, GameInfo
+
+
+def bump_event_version(game_id):
+    """Mark the event's read views stale (no commit; rides the caller's transaction)."""
+    db.session.execute(
+        sa.update(GameInfo)
+        .where(GameInfo.game_id == game_id)
+        .values(data_version=GameInfo.data_version + 1)
+    )
+
+
+def _version_query(game_id):
+    return sa.select(GameInfo.data_version).where(GameInfo.game_id == game_id).limit(1)
+
+
+def event_version(game_id):
+    """The event's data version, or None when the event does not exist."""
+    return db.session.scalar(_version_query(game_id))
+
+
+async def event_version_async(session, game_id):
+    return await session.scalar(_version_query(game_id))
+
+
+def render_token(template_folder, asset_manifest):
+    """Digest of the templates and built assets, so a deploy changes every ETag."""
+    digest = hashlib.sha1(repr(sorted(asset_manifest.items())).encode("utf-8"))
+    for root, _, names in sorted(os.walk(template_folder)):
+        for name in sorted(names):
+            with open(os.path.join(root, name), "rb") as template:
+                digest.update(template.read())
+    return digest.hexdigest()[:8]
+
+
+def page_etag(key, token=""):
+    """Weak ETag for the page cached under ``key`` (its version stays readable)."""
+    view, game_id, version, *variant = key
+    digest = hashlib.sha1(repr((view, game_id, token, variant)).encode("utf-8")).hexdigest()[:12]
+    return f"{version}-{digest}"
+
+
+class PageCache:
+    """Bounded LRU of rendered pages; stale versions simply age out."""
+
+    def __init__(self, size=256):
+        self.size = size
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def set(self, key, page):
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.size:
+                self._pages.popitem(last=False)
+
+    def get_or_render(self, key, render):
+        page = self.get(key)
+        if page is None:
+            page = render()
+            self.set(key, page)
+        return page
+
+    def __len__(self):
+        return len(self._pages)
@@ -0,0 +1,117 @@
+import sqlalchemy as sa
+
+from models import db, Player, Match, MatchPlayer, MatchSide, event_pk
+from standings import player_standing, player_standing_async, ranked_standings, ranked_standings_async
+
+
+def _player_matches_query(game_id, player_id):
+    """Every seat of the player's finished matches, with its side's score and result."""
+    player_pk = (
+        sa.select(Player.id)
+        .where(Player.player_id == player_id, Player.event_pk == event_pk(game_id))
+        .scalar_subquery()
+    )
+    player_match_pks = (
+        sa.select(MatchSide.match_pk)
+        .join(MatchPlayer, MatchPlayer.side_pk == MatchSide.id)
+        .where(MatchPlayer.player_pk == player_pk, MatchSide.result.isnot(None))
+    )
+
+    return (
+        sa.select(
+            Match.id,
+            Match.game_no,
+            Match.duration_seconds,
+            MatchSide.side,
+            MatchSide.score,
+            MatchSide.result,
+            MatchPlayer.player_code,
+            Player.player_id,
+            Player.player_name,
+        )
+        .join(MatchSide, MatchSide.match_pk == Match.id)
+        .join(MatchPlayer, MatchPlayer.side_pk == MatchSide.id)
+        .outerjoin(Player, Player.id == MatchPlayer.player_pk)
+        .where(Match.id.in_(player_match_pks.scalar_subquery()))
+        .order_by(Match.game_no, Match.id, MatchSide.side, MatchPlayer.id)
+    )
+
+
+def player_matches(game_id, player_id):
+    """Return the player's finished matches with rosters, scores and durations (one query)."""
+    rows = db.session.execute(_player_matches_query(game_id, player_id)).all()
+    return _group_matches(rows, player_id)
+
+
+def _group_matches(rows, player_id):
+    """One dict per match, in game order, from its seat rows."""
+    matches = {}
+    for row in rows:
+        info = matches.get(row.id)
+        if info is None:
+            info = matches[row.id] = {
+                "game_no": row.game_no,
+                "team_a": [],
+                "team_b": [],
+                "score_a": None,
+                "score_b": None,
+                "duration": row.duration_seconds,
+                "player_side": None,
+                "player_duration": None,
+                "winner": None,
+            }
+        info["team_a" if row.side == "A" else "team_b"].append(row.player_name or row.player_code)
+        info["score_a" if row.side == "A" else "score_b"] = row.score or 0
+        if row.result == "W":
+            info["winner"] = row.side
+        elif row.result == "T":
+            info["winner"] = "T"
+        if row.player_id == player_id:
+            info["player_side"] = row.side
+            info["player_duration"] = row.duration_seconds
+
+    return list(matches.values())
+
+
+def load_player_stats(game_id, player_id, chip_count=10):
+    """Everything the player-stats page shows, in a fixed number of queries.
+
+    Returns None when the player has no standing in this event.
+    """
+    standing, total_players = player_standing(game_id, player_id)
+    if standing is None:
+        return None
+
+    rank_chips = ranked_standings(game_id, limit=chip_count)
+    if all(chip["player_id"] != player_id for chip in rank_chips):
+        rank_chips.append(standing)
+
+    return {
+        "standing": standing,
+        "total_players": total_players,
+        "rank_chips": rank_chips,
+        "matches": player_matches(game_id, player_id),
+    }
+
+
+async def load_player_stats_async(session, game_id, player_id, chip_count=10):
+    """load_player_stats on an AsyncSession.
+
+    Returns None when the player has no standing yet; the sync path then
+    rebuilds the event's standings.
+    """
+    standing, total_players = await player_standing_async(session, game_id, player_id)
+    if standing is None:
+        return None
+
+    rank_chips = await ranked_standings_async(session, game_id, limit=chip_count)
+    if all(chip["player_id"] != player_id for chip in rank_chips):
+        rank_chips.append(standing)
+
+    rows = (await session.execute(_player_matches_query(game_id, player_id))).all()
+    return {
+        "standing": standing,
+        "total_players": total_players,
+        "rank_chips": rank_chips,
+        "matches": _group_matches(rows, player_id),
+    }
@@ -0,0 +1,172 @@
+import datetime
+import os
+import re
+import tempfile
+
+import sqlalchemy as sa
+from sqlalchemy.orm import aliased
+
+from models import db, GameInfo, Playground, Player, Match, MatchPlayer, MatchSide, Standing, event_pk
+from ratings import rating_as_of_query, season_top_query
+from standings import RANK_ORDER
+
+SCAN_PATTERN = re.compile(r"\bSCAN (\w+)")
+
+
+def seed(engine, events=200, players=16, matches=40):
+    """Fill ``engine`` with ``events`` events of ``matches`` doubles matches each."""
+    db.metadata.create_all(engine)
+    start = datetime.datetime(2025, 1, 1, 19, 0)
+    match_pk = side_pk = 0
+    with engine.begin() as conn:
+        for e in range(events):
+            game_id = f"G{e:023d}"
+            event_key = e + 1
+            conn.execute(sa.insert(GameInfo), [{
+                "id": event_key, "game_id": game_id, "game_name": f"Event {e}", "game_place": "Club",
+                "host_email": "host@example.com", "created_at": start,
+            }])
+            conn.execute(sa.insert(Playground), [{
+                "event_pk": event_key, "sport": "Padel", "game_type": "Doubles",
+                "game_format": "Mexicano", "point_limit": 21, "courts_count": 1,
+            }])
+            pks = [e * players + p + 1 for p in range(players)]
+            conn.execute(sa.insert(Player), [
+                {"id": pk, "player_code": f"P-{p + 1:02}", "player_id": f"{e:05d}{p:05d}",
+                 "player_name": f"Player {p}", "event_pk": event_key}
+                for p, pk in enumerate(pks)
+            ])
+            conn.execute(sa.insert(Standing), [
+                {"event_pk": event_key, "player_pk": pk, "player_code": f"P-{p + 1:02}",
+                 "player_name": f"Player {p}", "games": 0, "wins": 0, "losses": 0,
+                 "ties": 0, "points": 0, "point_diff": 0}
+                for p, pk in enumerate(pks)
+            ])
+            matches_rows, sides, members = [], [], []
+            for m in range(matches):
+                match_pk += 1
+                matches_rows.append({
+                    "id": match_pk, "event_pk": event_key, "match_id": f"{e:016d}{m:016d}",
+                    "game_no": m + 1, "court_no": "A", "start_at": start, "end_at": start,
+                    "duration_seconds": 900,
+                })
+                seats = [pks[(m * 4 + k) % players] for k in range(4)]
+                for side, team in (("A", seats[:2]), ("B", seats[2:])):
+                    side_pk += 1
+                    sides.append({
+                        "id": side_pk, "match_pk": match_pk, "side": side,
+                        "score": 21 if side == "A" else 15, "result": "W" if side == "A" else "L",
+                    })
+                    members.extend(
+                        {"side_pk": side_pk, "player_pk": pk, "player_code": "P-00",
+                         "player_match_number": m // 4 + 1}
+                        for pk in team
+                    )
+            conn.execute(sa.insert(Match), matches_rows)
+            conn.execute(sa.insert(MatchSide), sides)
+            conn.execute(sa.insert(MatchPlayer), members)
+
+
+def route_queries(game_id, player_id):
+    """The statements the routes issue, keyed by a short name."""
+    event = event_pk(game_id)
+    opponent = aliased(MatchSide)
+    player = (
+        sa.select(Player.id)
+        .where(Player.player_id == player_id, Player.event_pk == event)
+        .scalar_subquery()
+    )
+    return {
+        "gameinfo_by_id": sa.select(GameInfo).where(GameInfo.game_id == game_id).limit(1),
+        "playground_by_event": sa.select(Playground).where(Playground.event_pk == event).limit(1),
+        "players_by_event": (
+            sa.select(Player).where(Player.event_pk == event).order_by(Player.player_code)
+        ),
+        "player_in_event": (
+            sa.select(Player)
+            .where(Player.event_pk == event, Player.player_id == player_id)
+            .limit(1)
+        ),
+        "matches_by_event": sa.select(Match).where(Match.event_pk == event),
+        "match_by_public_id": sa.select(Match.id).where(Match.match_id == f"{0:032d}").limit(1),
+        "standings_ranked": (
+            sa.select(Standing, Player.player_id)
+            .join(Player, Player.id == Standing.player_pk)
+            .where(Standing.event_pk == event)
+            .order_by(*RANK_ORDER)
+        ),
+        "standings_for_players": (
+            sa.select(Standing.player_pk)
+            .where(Standing.event_pk == event, Standing.player_pk.in_([1]))
+        ),
+        "standings_rebuild_join": (
+            sa.select(MatchPlayer.player_pk, Match.duration_seconds, MatchSide.score,
+                      MatchSide.result, opponent.score)
+            .join(MatchSide, MatchPlayer.side_pk == MatchSide.id)
+            .join(Match, MatchSide.match_pk == Match.id)
+            .outerjoin(opponent, (opponent.match_pk == Match.id) & (opponent.side != MatchSide.side))
+            .where(Match.event_pk == event, MatchSide.result.isnot(None))
+        ),
+        "standing_rank": (
+            sa.select(sa.func.count(Standing.id))
+            .where(Standing.event_pk == event, Standing.points > 0)
+        ),
+        "player_matches": (
+            sa.select(Match.id, Match.game_no, MatchSide.side, MatchSide.score, MatchSide.result,
+                      Player.player_name)
+            .join(MatchSide, MatchSide.match_pk == Match.id)
+            .join(MatchPlayer, MatchPlayer.side_pk == MatchSide.id)
+            .outerjoin(Player, Player.id == MatchPlayer.player_pk)
+            .where(Match.id.in_(
+                sa.select(MatchSide.match_pk)
+                .join(MatchPlayer, MatchPlayer.side_pk == MatchSide.id)
+                .where(MatchPlayer.player_pk == player, MatchSide.result.isnot(None))
+                .scalar_subquery()
+            ))
+            .order_by(Match.game_no, Match.id, MatchSide.side, MatchPlayer.id)
+        ),
+        "rating_as_of": rating_as_of_query(1, datetime.datetime(2025, 6, 1)),
+        "season_top": season_top_query("2025"),
+    }
+
+
+def explain(engine, statement):
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def check(engine, analyze=False):
+    """Return {query name: (plan lines, scanned tables)} for every route query."""
+    if analyze:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+    with engine.connect() as conn:
+        game_id = conn.execute(sa.select(GameInfo.game_id).limit(1)).scalar_one()
+        player_id = conn.execute(
+            sa.select(Player.player_id).where(Player.event_pk == event_pk(game_id)).limit(1)
+        ).scalar_one()
+
+    tables = set(db.metadata.tables)
+    report = {}
+    for name, statement in route_queries(game_id, player_id).items():
+        plan = explain(engine, statement)
+        scans = sorted({
+            match.group(1)
+            for line in plan
+            for match in SCAN_PATTERN.finditer(line)
+            if match.group(1) in tables
+        })
+        report[name] = (plan, scans)
+    return report
+
+
+def run(events=200, players=16, matches=40, analyze=False):
+    """Seed a temporary database and check every route query against it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sa.create_engine(f"sqlite:///{os.path.join(tmp, 'plans.db')}")
+        try:
+            seed(engine, events, players, matches)
+            return check(engine, analyze=analyze)
+        finally:
+            engine.dispose()
@@ -0,0 +1,434 @@
+"""Cross-event player identity and Glicko ratings.
+
+Every roster entry (Player) links to a Person by its host and normalized
+name, so the same name at two hosts' events is two people.
+finish_match rates each match as it is recorded: the people in it get a
+new rating, a RatingSnapshot row per person and an updated SeasonRating
+row, so "rating as of" and "top of the season" are single indexed reads.
+rebuild_ratings replays the history, whole for backfills or from a point in
+time for imports.
+"""
+import datetime
+import itertools
+import math
+
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
+
+from models import db, GameInfo, Match, MatchPlayer, MatchSide, Person, Player, RatingSnapshot, SeasonRating, event_pk
+
+# Glicko-1, one rating period per match
+Q = math.log(10) / 400
+INITIAL_RATING = 1500.0
+INITIAL_DEVIATION = 350.0
+MIN_DEVIATION = 30.0
+# Squared deviation gained per day without a match: a settled 50 is back to 350 after a year
+DEVIATION_GROWTH = (INITIAL_DEVIATION ** 2 - 50.0 ** 2) / 365
+
+SCORES = {"A": (1.0, 0.0), "B": (0.0, 1.0), "T": (0.5, 0.5)}
+
+
+# -------------------- Identity --------------------
+def name_key(name):
+    """The identity of a roster name: case-folded, whitespace collapsed."""
+    return " ".join((name or "").split()).casefold()
+
+
+def host_key(email):
+    """The host a person belongs to: names are only matched within one host's events."""
+    return (email or "").strip().casefold()
+
+
+def _event_hosts(event_pks):
+    if not event_pks:
+        return {}
+    select = sa.select(GameInfo.id, GameInfo.host_email).where(GameInfo.id.in_(list(event_pks)))
+    return {pk: host_key(email) for pk, email in db.session.execute(select)}
+
+
+def _people_by_key(keys):
+    if not keys:
+        return {}
+    return {
+        (p.host_key, p.name_key): p
+        for p in Person.query.filter(sa.tuple_(Person.host_key, Person.name_key).in_(list(keys)))
+    }
+
+
+def link_people(players):
+    """Point each Player at its host's Person of that name, creating new people (no commit).
+
+    Two hosts' players who share a name stay two people; nothing links
+    them automatically.
+    """
+    hosts = _event_hosts({p.event_pk for p in players})
+    keys = [(hosts[p.event_pk], name_key(p.player_name)) for p in players]
+    people = _people_by_key(set(keys))
+    new = {}
+    for player, key in zip(players, keys):
+        if key not in people and key not in new:
+            new[key] = Person(display_name=" ".join(player.player_name.split()), host_key=key[0], name_key=key[1])
+    for person in new.values():
+        try:
+            with db.session.begin_nested():
+                db.session.add(person)
+        except IntegrityError:
+            pass  # a concurrent roster created this person first
+    if new:
+        people = _people_by_key(set(keys))
+    for player, key in zip(players, keys):
+        player.person = people[key]
+        player.person.display_name = " ".join(player.player_name.split())
+
+
+def person_pks(entries):
+    """{(host_key, name_key): person key} for (host email, roster name) pairs, creating new people (no commit).
+
+    The bulk form of link_people, for imports: new people are inserted in
+    one statement, and existing people keep their display name.
+    """
+    wanted = {}
+    for host, name in entries:
+        wanted.setdefault((host_key(host), name_key(name)), " ".join(name.split()))
+    if not wanted:
+        return {}
+    select = sa.select(Person.host_key, Person.name_key, Person.id).where(
+        sa.tuple_(Person.host_key, Person.name_key).in_(list(wanted))
+    )
+
+    def found_people():
+        return {(host, key): pk for host, key, pk in db.session.execute(select)}
+
+    found = found_people()
+    missing = [
+        {"host_key": host, "name_key": key, "display_name": display}
+        for (host, key), display in wanted.items() if (host, key) not in found
+    ]
+    if missing:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(sa.insert(Person), missing)
+        except IntegrityError:
+            for row in missing:  # a concurrent roster created some of them first
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(sa.insert(Person), [row])
+                except IntegrityError:
+                    pass
+        found = found_people()
+    return found
+
+
+def find_people(name, host=None):
+    """People with a roster name, across hosts unless ``host`` is given."""
+    query = Person.query.filter(Person.name_key == name_key(name))
+    if host is not None:
+        query = query.filter(Person.host_key == host_key(host))
+    return query.order_by(Person.host_key).all()
+
+
+# -------------------- Rating --------------------
+def season_of(when):
+    """Season label of a match ending at ``when``: its calendar year."""
+    return str(when.year)
+
+
+def age_deviation(deviation, last_rated_at, rated_at):
+    """Deviation grown for the days between a person's last match and this one."""
+    if last_rated_at is None:
+        return deviation
+    days = max((rated_at - last_rated_at).total_seconds() / 86400, 0.0)
+    return min(math.sqrt(deviation ** 2 + DEVIATION_GROWTH * days), INITIAL_DEVIATION)
+
+
+def _g(deviation):
+    return 1 / math.sqrt(1 + 3 * (Q * deviation / math.pi) ** 2)
+
+
+def _team(members):
+    """A team as one player: mean rating, root-mean-square deviation."""
+    rating = sum(r for r, _ in members) / len(members)
+    deviation = math.sqrt(sum(d * d for _, d in members) / len(members))
+    return rating, deviation
+
+
+def rate(teams, winner):
+    """New (rating, deviation) for each member of two teams of (rating, deviation).
+
+    Every member plays one Glicko-1 game of their team against the other
+    team; ``winner`` is "A", "B" or "T" (a tie).
+    """
+    composites = [_team(members) for members in teams]
+    updated = []
+    for index, members in enumerate(teams):
+        own, _ = composites[index]
+        opponent, opponent_deviation = composites[1 - index]
+        g = _g(opponent_deviation)
+        expected = 1 / (1 + 10 ** (-g * (own - opponent) / 400))
+        inverse_d2 = Q * Q * g * g * expected * (1 - expected)
+        score = SCORES[winner][index]
+        team = []
+        for rating, deviation in members:
+            precision = 1 / deviation ** 2 + inverse_d2
+            team.append((
+                rating + Q / precision * g * (score - expected),
+                max(math.sqrt(1 / precision), MIN_DEVIATION),
+            ))
+        updated.append(team)
+    return updated
+
+
+def rank_score(rating, deviation):
+    """Season order: a rating the player is very likely above, so one lucky match ranks low."""
+    return rating - 2 * deviation
+
+
+def _rateable(teams):
+    """Both sides have someone rated and nobody holds two seats."""
+    people = [pk for team in teams for pk in team]
+    return all(teams) and len(set(people)) == len(people)
+
+
+def rate_match(match_pk, teams, winner, rated_at):
+    """Rate the people in a finished match (no commit); returns how many were rated.
+
+    ``teams`` holds the player keys of side A and side B. Seats with no
+    linked person are left out, and a match with nobody rated on one side
+    changes nothing. The people rows are locked (FOR UPDATE where the
+    database has it) so concurrent finalizations cannot lose an update.
+    """
+    player_pks = [pk for team in teams for pk in team if pk is not None]
+    if not player_pks:
+        return 0
+    rows = db.session.execute(
+        sa.select(Player.id, Person)
+        .join(Person, Person.id == Player.person_pk)
+        .where(Player.id.in_(player_pks))
+        .order_by(Person.id)
+        .with_for_update(of=Person)
+    ).all()
+    person_by_player = {player_pk: person for player_pk, person in rows}
+    seats = [[person_by_player[pk] for pk in team if pk in person_by_player] for team in teams]
+    if not _rateable([[p.id for p in team] for team in seats]):
+        return 0
+
+    updated = rate(
+        [[(p.rating, age_deviation(p.rating_deviation, p.rated_at, rated_at)) for p in team] for team in seats],
+        winner,
+    )
+    season = season_of(rated_at)
+    people = [p for team in seats for p in team]
+    season_rows = {
+        row.person_pk: row
+        for row in SeasonRating.query.filter(
+            SeasonRating.season == season, SeasonRating.person_pk.in_([p.id for p in people])
+        )
+    }
+    for person, (rating, deviation) in zip(people, itertools.chain.from_iterable(updated)):
+        db.session.add(RatingSnapshot(
+            person_pk=person.id, match_pk=match_pk, rated_at=rated_at,
+            rating=rating, rating_deviation=deviation, delta=rating - person.rating,
+        ))
+        person.rating = rating
+        person.rating_deviation = deviation
+        person.rated_matches += 1
+        person.rated_at = max(person.rated_at or rated_at, rated_at)
+
+        entry = season_rows.get(person.id)
+        if entry is None:
+            db.session.add(SeasonRating(
+                season=season, person_pk=person.id, rating=rating, rating_deviation=deviation,
+                rank_score=rank_score(rating, deviation), matches=1, rated_at=rated_at,
+            ))
+        else:
+            entry.rating = rating
+            entry.rating_deviation = deviation
+            entry.rank_score = rank_score(rating, deviation)
+            entry.matches += 1
+            entry.rated_at = max(entry.rated_at, rated_at)
+    return len(people)
+
+
+def _season_row(season, pk, rating, deviation, matches, rated_at):
+    return {
+        "season": season, "person_pk": pk, "rating": rating, "rating_deviation": deviation,
+        "rank_score": rank_score(rating, deviation), "matches": matches, "rated_at": rated_at,
+    }
+
+
+def _ratings_before(since, people, start=None):
+    """{person key: [rating, deviation, matches, rated_at]} from ``people``'s snapshots before ``since``.
+
+    ``start`` counts only the snapshots from then on (a season's).
+    """
+    window = {"partition_by": RatingSnapshot.person_pk}
+    ranked = (
+        sa.select(
+            RatingSnapshot.person_pk, RatingSnapshot.rating, RatingSnapshot.rating_deviation,
+            RatingSnapshot.rated_at, sa.func.count().over(**window).label("matches"),
+            sa.func.row_number().over(
+                order_by=(RatingSnapshot.rated_at.desc(), RatingSnapshot.id.desc()), **window
+            ).label("latest"),
+        )
+        .where(RatingSnapshot.rated_at < since, RatingSnapshot.person_pk.in_(people))
+    )
+    if start is not None:
+        ranked = ranked.where(RatingSnapshot.rated_at >= start)
+    ranked = ranked.subquery()
+    rows = db.session.execute(
+        sa.select(ranked.c.person_pk, ranked.c.rating, ranked.c.rating_deviation, ranked.c.matches, ranked.c.rated_at)
+        .where(ranked.c.latest == 1)
+    )
+    return {pk: [rating, deviation, matches, rated_at] for pk, rating, deviation, matches, rated_at in rows}
+
+
+def rebuild_ratings(since=None):
+    """Replay finished matches, oldest first, into fresh ratings (no commit).
+
+    Without ``since`` every match is replayed from scratch: for backfills
+    and after people are relinked. With ``since`` only the matches ending
+    at or after it are: their people restart from their last snapshot
+    before it and nothing earlier is touched, which is how an import rates
+    the matches it added. finish_match rates each live match as it is
+    recorded. Returns the number of matches rated.
+    """
+    replayed = Match.end_at.isnot(None) if since is None else Match.end_at >= since
+    seats = db.session.execute(
+        sa.select(Match.id, Match.end_at, MatchSide.side, MatchSide.result, Player.person_pk)
+        .join(MatchSide, MatchSide.match_pk == Match.id)
+        .join(MatchPlayer, MatchPlayer.side_pk == MatchSide.id)
+        .join(Player, Player.id == MatchPlayer.player_pk)
+        .where(replayed, MatchSide.result.isnot(None), Player.person_pk.isnot(None))
+        .order_by(Match.end_at, Match.id, MatchSide.side, MatchPlayer.id)
+    )
+
+    state = {}  # person key: [rating, deviation, matches, rated_at]
+    seasons = {}  # (season, person key): SeasonRating columns
+    if since is not None:
+        # Everyone seated in a replayed match or holding a snapshot of one
+        matches = sa.select(Match.id).where(replayed)
+        people = sa.union(
+            sa.select(Player.person_pk)
+            .join(MatchPlayer, MatchPlayer.player_pk == Player.id)
+            .join(MatchSide, MatchSide.id == MatchPlayer.side_pk)
+            .where(MatchSide.match_pk.in_(matches), Player.person_pk.isnot(None)),
+            sa.select(RatingSnapshot.person_pk).where(RatingSnapshot.match_pk.in_(matches)),
+        )
+        state = _ratings_before(since, people)
+        season = season_of(since)
+        season_start = datetime.datetime(since.year, 1, 1)  # seasons are calendar years
+        for pk, entry in _ratings_before(since, people, start=season_start).items():
+            seasons[(season, pk)] = _season_row(season, pk, *entry)
+    snapshots = []
+    rated = 0
+    for (match_pk, rated_at), rows in itertools.groupby(seats, key=lambda row: (row.id, row.end_at)):
+        teams = {"A": [], "B": []}
+        winner = "T"
+        for row in rows:
+            teams.setdefault(row.side, []).append(row.person_pk)
+            if row.result == "W":
+                winner = row.side
+        teams = [teams["A"], teams["B"]]
+        if not _rateable(teams):
+            continue
+
+        for pk in itertools.chain.from_iterable(teams):
+            state.setdefault(pk, [INITIAL_RATING, INITIAL_DEVIATION, 0, None])
+        updated = rate(
+            [[(state[pk][0], age_deviation(state[pk][1], state[pk][3], rated_at)) for pk in team] for team in teams],
+            winner,
+        )
+        season = season_of(rated_at)
+        for pk, (rating, deviation) in zip(itertools.chain.from_iterable(teams), itertools.chain.from_iterable(updated)):
+            entry = state[pk]
+            snapshots.append({
+                "person_pk": pk, "match_pk": match_pk, "rated_at": rated_at,
+                "rating": rating, "rating_deviation": deviation, "delta": rating - entry[0],
+            })
+            state[pk] = [rating, deviation, entry[2] + 1, rated_at]
+            row = seasons.setdefault((season, pk), {"season": season, "person_pk": pk, "matches": 0})
+            row.update(
+                rating=rating, rating_deviation=deviation, rank_score=rank_score(rating, deviation),
+                matches=row["matches"] + 1, rated_at=rated_at,
+            )
+        rated += 1
+
+    if since is None:
+        db.session.execute(sa.delete(RatingSnapshot))
+        db.session.execute(sa.delete(SeasonRating))
+        reset = sa.update(Person)
+    else:
+        db.session.execute(sa.delete(RatingSnapshot).where(RatingSnapshot.match_pk.in_(matches)))
+        db.session.execute(sa.delete(SeasonRating).where(
+            SeasonRating.season >= season_of(since), SeasonRating.person_pk.in_(people)
+        ))
+        reset = sa.update(Person).where(Person.id.in_(people))
+    db.session.execute(reset.values(
+        rating=INITIAL_RATING, rating_deviation=INITIAL_DEVIATION, rated_matches=0, rated_at=None,
+    ))
+    if state:
+        db.session.execute(sa.update(Person), [
+            {"id": pk, "rating": rating, "rating_deviation": deviation,
+             "rated_matches": matches, "rated_at": rated_at}
+            for pk, (rating, deviation, matches, rated_at) in state.items()
+        ])
+    # Core inserts: hundreds of thousands of snapshots skip the ORM's per-row bookkeeping
+    if snapshots:
+        db.session.connection().execute(sa.insert(RatingSnapshot.__table__), snapshots)
+    if seasons:
+        db.session.connection().execute(sa.insert(SeasonRating.__table__), list(seasons.values()))
+    return rated
+
+
+# -------------------- Lookups --------------------
+def rating_as_of_query(person_pk, when):
+    return (
+        sa.select(RatingSnapshot.rating, RatingSnapshot.rating_deviation, RatingSnapshot.rated_at)
+        .where(RatingSnapshot.person_pk == person_pk, RatingSnapshot.rated_at <= when)
+        .order_by(RatingSnapshot.rated_at.desc(), RatingSnapshot.id.desc())
+        .limit(1)
+    )
+
+
+def rating_as_of(person_pk, when):
+    """(rating, rating_deviation, rated_at) after the person's last match ending by ``when``, or None."""
+    return db.session.execute(rating_as_of_query(person_pk, when)).first()
+
+
+def event_ratings(game_id):
+    """{player name: current rating} for an event's roster; unlinked players get INITIAL_RATING."""
+    return {
+        name: INITIAL_RATING if rating is None else rating
+        for name, rating in db.session.execute(
+            sa.select(Player.player_name, Person.rating)
+            .outerjoin(Person, Person.id == Player.person_pk)
+            .where(Player.event_pk == event_pk(game_id))
+        )
+    }
+
+
+def season_top_query(season, limit=100):
+    return (
+        sa.select(SeasonRating, Person.person_id, Person.display_name)
+        .join(Person, Person.id == SeasonRating.person_pk)
+        .where(SeasonRating.season == season)
+        .order_by(SeasonRating.rank_score.desc())
+        .limit(limit)
+    )
+
+
+def season_top(season, limit=100):
+    """The season's best ``limit`` players by rank_score as dicts, best first."""
+    return [
+        {
+            "rank": rank,
+            "person_id": person_id,
+            "name": name,
+            "rating": row.rating,
+            "rating_deviation": row.rating_deviation,
+            "matches": row.matches,
+        }
+        for rank, (row, person_id, name) in enumerate(
+            db.session.execute(season_top_query(season, limit)).all(), start=1
+        )
+    ]
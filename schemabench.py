@@ -0,0 +1,329 @@
+"""Read cost and size of the match schema across its revisions.
+
+A season of events is seeded at revision 0007 with random public ids and
+the read queries are timed as they ran on string keys. The same file is
+then upgraded to 0008 (integer keys) and to 0010 (one matches row, a
+match_sides row per side and thin match_players seats), running each data
+migration, and the queries are timed again as written for that schema.
+Row counts and the vacuumed file size are taken at every step.
+
+    flask bench-joins
+"""
+import os
+import random
+import secrets
+import statistics
+import string
+import tempfile
+import time
+
+import sqlalchemy as sa
+from flask import Flask
+
+from dbconfig import engine_options, init_db, sqlite_pragmas
+from models import db, generate_game_id, generate_match_id, generate_player_id
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LEGACY_REVISION = "0007"
+KEYED_REVISION = "0008"
+NORMALIZED_REVISION = "0010"
+REVISIONS = (LEGACY_REVISION, KEYED_REVISION, NORMALIZED_REVISION)
+
+# Tables holding the matches at each revision; the first is one row per seat
+MATCH_TABLES = {
+    LEGACY_REVISION: ("drawing", "match_details"),
+    KEYED_REVISION: ("drawing", "match_details"),
+    NORMALIZED_REVISION: ("match_players", "matches", "match_sides"),
+}
+
+# name: (0007 string keys, 0008 integer keys, 0010 normalized matches)
+QUERIES = {
+    "standings_rebuild": (
+        """SELECT md.match_id, md.player_id, md.team_side, md.team_side_score, md.winner_flag
+           FROM match_details md
+           JOIN drawing d ON md.match_id = d.match_id AND md.player_id = d.player_id
+           WHERE d.game_id = :game_id""",
+        """SELECT d.match_id, d.player_pk, md.team_side, md.team_side_score, md.winner_flag
+           FROM match_details md
+           JOIN drawing d ON md.drawing_pk = d.id
+           WHERE d.event_pk = (SELECT id FROM gameinfo WHERE game_id = :game_id)""",
+        """SELECT m.match_id, mp.player_pk, s.side, s.score, s.result, o.score
+           FROM match_players mp
+           JOIN match_sides s ON s.id = mp.side_pk
+           JOIN matches m ON m.id = s.match_pk
+           LEFT JOIN match_sides o ON o.match_pk = m.id AND o.side != s.side
+           WHERE m.event_pk = (SELECT id FROM gameinfo WHERE game_id = :game_id)
+             AND s.result IS NOT NULL""",
+    ),
+    "player_matches": (
+        """SELECT d.match_id, d.game_no, d.team_side, d.player_id, p.player_name,
+                  md.team_side_score, md.winner_flag, md.match_duration
+           FROM drawing d
+           LEFT JOIN players p ON p.player_id = d.player_id
+           LEFT JOIN match_details md ON md.match_id = d.match_id AND md.player_id = d.player_id
+           WHERE d.match_id IN (
+               SELECT md2.match_id FROM match_details md2
+               JOIN drawing d2 ON md2.match_id = d2.match_id AND md2.player_id = d2.player_id
+               WHERE d2.game_id = :game_id AND md2.player_id = :player_id)
+           ORDER BY d.game_no, d.id""",
+        """SELECT d.match_id, d.game_no, d.team_side, p.player_id, p.player_name,
+                  md.team_side_score, md.winner_flag, md.match_duration
+           FROM drawing d
+           LEFT JOIN players p ON p.id = d.player_pk
+           LEFT JOIN match_details md ON md.drawing_pk = d.id
+           WHERE d.match_id IN (
+               SELECT d2.match_id FROM drawing d2
+               JOIN match_details md2 ON md2.drawing_pk = d2.id
+               WHERE d2.player_pk = (
+                   SELECT id FROM players WHERE player_id = :player_id
+                   AND event_pk = (SELECT id FROM gameinfo WHERE game_id = :game_id)))
+           ORDER BY d.game_no, d.id""",
+        """SELECT m.match_id, m.game_no, s.side, p.player_id, p.player_name,
+                  s.score, s.result, m.duration_seconds
+           FROM matches m
+           JOIN match_sides s ON s.match_pk = m.id
+           JOIN match_players mp ON mp.side_pk = s.id
+           LEFT JOIN players p ON p.id = mp.player_pk
+           WHERE m.id IN (
+               SELECT s2.match_pk FROM match_sides s2
+               JOIN match_players mp2 ON mp2.side_pk = s2.id
+               WHERE s2.result IS NOT NULL AND mp2.player_pk = (
+                   SELECT id FROM players WHERE player_id = :player_id
+                   AND event_pk = (SELECT id FROM gameinfo WHERE game_id = :game_id)))
+           ORDER BY m.game_no, m.id, s.side, mp.id""",
+    ),
+    "leaderboard": (
+        """SELECT s.* FROM standings s
+           WHERE s.game_id = :game_id
+           ORDER BY s.points DESC, s.point_diff DESC, s.wins DESC, s.player_code""",
+        """SELECT s.*, p.player_id FROM standings s
+           JOIN players p ON p.id = s.player_pk
+           WHERE s.event_pk = (SELECT id FROM gameinfo WHERE game_id = :game_id)
+           ORDER BY s.points DESC, s.point_diff DESC, s.wins DESC, s.player_code""",
+        """SELECT s.*, p.player_id FROM standings s
+           JOIN players p ON p.id = s.player_pk
+           WHERE s.event_pk = (SELECT id FROM gameinfo WHERE game_id = :game_id)
+           ORDER BY s.points DESC, s.point_diff DESC, s.wins DESC, s.player_code""",
+    ),
+    # The leaderboard straight from the results, as a rebuild computes it
+    "leaderboard_live": (
+        """SELECT d.player_id, COUNT(*) AS games,
+                  SUM(md.winner_flag = 'W') AS wins, SUM(md.team_side_score) AS points
+           FROM match_details md
+           JOIN drawing d ON md.match_id = d.match_id AND md.player_id = d.player_id
+           WHERE d.game_id = :game_id
+           GROUP BY d.player_id
+           ORDER BY points DESC, wins DESC""",
+        """SELECT d.player_pk, COUNT(*) AS games,
+                  SUM(md.winner_flag = 'W') AS wins, SUM(md.team_side_score) AS points
+           FROM match_details md
+           JOIN drawing d ON md.drawing_pk = d.id
+           WHERE d.event_pk = (SELECT id FROM gameinfo WHERE game_id = :game_id)
+           GROUP BY d.player_pk
+           ORDER BY points DESC, wins DESC""",
+        """SELECT mp.player_pk, COUNT(*) AS games,
+                  SUM(s.result = 'W') AS wins, SUM(s.score) AS points
+           FROM match_players mp
+           JOIN match_sides s ON s.id = mp.side_pk
+           JOIN matches m ON m.id = s.match_pk
+           WHERE m.event_pk = (SELECT id FROM gameinfo WHERE game_id = :game_id)
+             AND s.result IS NOT NULL
+           GROUP BY mp.player_pk
+           ORDER BY points DESC, wins DESC""",
+    ),
+    "season_points": (
+        """SELECT g.game_id, p.player_name, SUM(md.team_side_score)
+           FROM match_details md
+           JOIN drawing d ON md.match_id = d.match_id AND md.player_id = d.player_id
+           JOIN players p ON p.player_id = d.player_id
+           JOIN gameinfo g ON g.game_id = d.game_id
+           GROUP BY d.player_id""",
+        """SELECT g.game_id, p.player_name, SUM(md.team_side_score)
+           FROM match_details md
+           JOIN drawing d ON md.drawing_pk = d.id
+           JOIN players p ON p.id = d.player_pk
+           JOIN gameinfo g ON g.id = d.event_pk
+           GROUP BY d.player_pk""",
+        """SELECT g.game_id, p.player_name, SUM(s.score)
+           FROM match_players mp
+           JOIN match_sides s ON s.id = mp.side_pk
+           JOIN matches m ON m.id = s.match_pk
+           JOIN players p ON p.id = mp.player_pk
+           JOIN gameinfo g ON g.id = m.event_pk
+           GROUP BY mp.player_pk""",
+    ),
+}
+
+
+def _make_app(url):
+    from flask_migrate import Migrate
+
+    app = Flask("matchmaker-schemabench")
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(url)
+    app.config["SQLITE_PRAGMAS"] = sqlite_pragmas()
+    init_db(app)
+    Migrate(app, db, directory=os.path.join(HERE, "migrations"), render_as_batch=True)
+    return app
+
+
+# -------------------- Data --------------------
+def seed_legacy(conn, events, players, matches, rng):
+    """A season on the 0007 schema: every reference is a random public id."""
+    start = time.strftime("%Y-%m-%d %H:%M:%S")
+    for e in range(events):
+        game_id = generate_game_id()
+        conn.execute(sa.text(
+            "INSERT INTO gameinfo (game_id, game_name, game_place, host_email, created_at, data_version) "
+            "VALUES (:game_id, :name, 'Club', 'host@example.com', :start, 0)"
+        ), {"game_id": game_id, "name": f"Week {e + 1}", "start": start})
+
+        roster = [(f"P-{p + 1:02}", generate_player_id(), f"Player {e}-{p}") for p in range(players)]
+        conn.execute(sa.text(
+            "INSERT INTO players (player_code, player_id, player_name, game_id) "
+            "VALUES (:code, :player_id, :name, :game_id)"
+        ), [{"code": c, "player_id": pid, "name": n, "game_id": game_id} for c, pid, n in roster])
+
+        totals = {pid: [0, 0, 0, 0, 0] for _, pid, _ in roster}  # games, wins, losses, points, diff
+        drawings, details = [], []
+        for m in range(matches):
+            match_id = generate_match_id()
+            seats = rng.sample(roster, 4)
+            scores = {"A": 21, "B": rng.randint(5, 19)}
+            for k, (code, pid, _) in enumerate(seats):
+                side = "A" if k < 2 else "B"
+                score, opponent = scores[side], scores["B" if side == "A" else "A"]
+                drawings.append({
+                    "game_id": game_id, "game_no": m + 1, "court_no": "A", "side": side,
+                    "code": code, "player_id": pid, "number": m // 4 + 1, "match_id": match_id,
+                    "start": start,
+                })
+                details.append({
+                    "match_id": match_id, "player_id": pid, "side": side, "score": score,
+                    "flag": "W" if side == "A" else "L", "start": start,
+                })
+                entry = totals[pid]
+                entry[0] += 1
+                entry[1 if side == "A" else 2] += 1
+                entry[3] += score
+                entry[4] += score - opponent
+        conn.execute(sa.text(
+            "INSERT INTO drawing (game_id, game_no, court_no, team_side, player_code, player_id, "
+            "player_match_number, match_id, match_start_at) "
+            "VALUES (:game_id, :game_no, :court_no, :side, :code, :player_id, :number, :match_id, :start)"
+        ), drawings)
+        conn.execute(sa.text(
+            "INSERT INTO match_details (match_id, player_id, team_side, team_side_score, winner_flag, "
+            "match_start_at, match_end_at, match_duration) "
+            "VALUES (:match_id, :player_id, :side, :score, :flag, :start, :start, '0:15:00')"
+        ), details)
+        conn.execute(sa.text(
+            "INSERT INTO standings (game_id, player_id, player_code, player_name, games, wins, "
+            "losses, ties, points, point_diff, matches_drawn) "
+            "VALUES (:game_id, :player_id, :code, :name, :games, :wins, :losses, 0, :points, :diff, :games)"
+        ), [
+            {"game_id": game_id, "player_id": pid, "code": code, "name": name,
+             **dict(zip(("games", "wins", "losses", "points", "diff"), totals[pid]))}
+            for code, pid, name in roster
+        ])
+
+
+def _samples(conn, count, rng):
+    """(game_id, player_id) pairs spread over the season, fixed before either run."""
+    rows = conn.execute(sa.text(
+        "SELECT gameinfo.game_id, players.player_id FROM players "
+        "JOIN gameinfo ON gameinfo.game_id = players.game_id"
+    )).all()
+    return [tuple(row) for row in rng.sample(rows, min(count, len(rows)))]
+
+
+# -------------------- Timing --------------------
+def time_queries(conn, revision, samples, repeat):
+    """{query name: median ms per call} for the SQL written against ``revision``."""
+    which = REVISIONS.index(revision)
+    timings = {}
+    for name, variants in QUERIES.items():
+        statement = sa.text(variants[which])
+        params = [{"game_id": game_id, "player_id": player_id} for game_id, player_id in samples]
+        if ":game_id" not in variants[which]:
+            params = params[:1]  # season-wide: one call per repeat
+        conn.execute(statement, params[0]).all()  # warm the page cache
+        runs = []
+        for _ in range(repeat):
+            for bound in params:
+                started = time.perf_counter()
+                conn.execute(statement, bound).all()
+                runs.append(time.perf_counter() - started)
+        timings[name] = statistics.median(runs) * 1000
+    return timings
+
+
+def storage(conn, revision):
+    """Match rows per table and the database size in bytes once vacuumed."""
+    rows = {
+        table: conn.execute(sa.text(f"SELECT COUNT(*) FROM {table}")).scalar()
+        for table in MATCH_TABLES[revision]
+    }
+    conn.execute(sa.text("VACUUM"))
+    page_count = conn.execute(sa.text("PRAGMA page_count")).scalar()
+    page_size = conn.execute(sa.text("PRAGMA page_size")).scalar()
+    return {"rows": rows, "bytes": page_count * page_size}
+
+
+def _legacy_id(length):
+    """An id as generated before 0008: one CSPRNG call per character."""
+    chars = string.ascii_letters + string.digits
+    return "".join(secrets.choice(chars) for _ in range(length))
+
+
+def time_id_minting(count=20000):
+    """{generator: microseconds per 32-character match id}."""
+    timings = {}
+    for name, mint in (("per-character", lambda: _legacy_id(32)), ("single draw", generate_match_id)):
+        started = time.perf_counter()
+        for _ in range(count):
+            mint()
+        timings[name] = (time.perf_counter() - started) / count * 1e6
+    return timings
+
+
+def run(events=100, players=24, matches=60, samples=20, repeat=5, seed=0):
+    """Seed at 0007 and time; upgrade to 0008 and time; upgrade to 0010 and time.
+
+    Returns {"matches", "revisions": {revision: {"rows", "bytes", "migrate_s"}},
+    "queries": {name: {revision: ms}}, "ids"}. ``migrate_s`` is the time to reach
+    that revision from the one before it in REVISIONS (None for the seed).
+    """
+    from flask_migrate import upgrade
+
+    rng = random.Random(seed)
+    revisions, timings = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'season.db')}"
+        app = _make_app(url)
+        with app.app_context():
+            try:
+                upgrade(revision=LEGACY_REVISION)
+                with db.engine.begin() as conn:
+                    seed_legacy(conn, events, players, matches, rng)
+                with db.engine.connect() as conn:
+                    picked = _samples(conn, samples, rng)
+
+                for revision in REVISIONS:
+                    migrate_s = None
+                    if revision != LEGACY_REVISION:
+                        started = time.perf_counter()
+                        upgrade(revision=revision)
+                        migrate_s = time.perf_counter() - started
+                    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                        revisions[revision] = dict(storage(conn, revision), migrate_s=migrate_s)
+                        timings[revision] = time_queries(conn, revision, picked, repeat)
+            finally:
+                db.engine.dispose()
+
+    return {
+        "matches": events * matches,
+        "revisions": revisions,
+        "queries": {name: {revision: timings[revision][name] for revision in REVISIONS} for name in QUERIES},
+        "ids": time_id_minting(),
+    }
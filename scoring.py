@@ -0,0 +1,129 @@
+import sqlalchemy as sa
+
+from models import db, RallyEntry, event_pk
+
+# Rally log operations
+POINT, UNDO, SET = "P", "U", "S"
+SIDES = {"A", "B"}
+
+
+class VersionConflict(Exception):
+    """The caller's score version is behind the rally log."""
+
+    def __init__(self, score):
+        super().__init__(f"Score changed (now at version {score['version']}).")
+        self.score = score
+
+
+def _entries_query(match_id):
+    return (
+        sa.select(
+            RallyEntry.seq,
+            RallyEntry.op,
+            RallyEntry.side,
+            RallyEntry.delta,
+            RallyEntry.score_a,
+            RallyEntry.score_b,
+        )
+        .where(RallyEntry.match_id == match_id)
+        .order_by(RallyEntry.seq)
+    )
+
+
+def _entries(match_id):
+    return db.session.execute(_entries_query(match_id)).all()
+
+
+def _in_effect(entries):
+    """Entries left once each undo has cancelled the latest one before it."""
+    effective = []
+    for entry in entries:
+        if entry.op == UNDO:
+            if effective:
+                effective.pop()
+        else:
+            effective.append(entry)
+    return effective
+
+
+def replay(entries):
+    """Fold rally log entries (in seq order) into (score_a, score_b)."""
+    score_a = score_b = 0
+    for entry in _in_effect(entries):
+        if entry.op == SET:
+            score_a, score_b = entry.score_a, entry.score_b
+        elif entry.side == "A":
+            score_a = max(0, score_a + entry.delta)
+        else:
+            score_b = max(0, score_b + entry.delta)
+    return score_a, score_b
+
+
+def _as_score(entries):
+    score_a, score_b = replay(entries)
+    return {"scoreA": score_a, "scoreB": score_b, "version": entries[-1].seq if entries else 0}
+
+
+def match_score(match_id):
+    """Return {"scoreA", "scoreB", "version"} of a match from its rally log."""
+    return _as_score(_entries(match_id))
+
+
+async def match_score_async(session, match_id):
+    """match_score on an AsyncSession."""
+    return _as_score((await session.execute(_entries_query(match_id))).all())
+
+
+def _load(match_id, version):
+    entries = _entries(match_id)
+    score = _as_score(entries)
+    if version is not None and int(version) != score["version"]:
+        raise VersionConflict(score)
+    return entries, score
+
+
+def _append(game_id, match_id, entries, **fields):
+    """Add the next log entry (no commit); a racing writer trips uq_rally_log_match_seq."""
+    entry = RallyEntry(
+        event_pk=event_pk(game_id),
+        match_id=match_id,
+        seq=(entries[-1].seq if entries else 0) + 1,
+        **fields,
+    )
+    db.session.add(entry)
+    db.session.flush()
+    return _as_score(entries + [entry])
+
+
+def add_point(game_id, match_id, side, delta=1, version=None, limit=None):
+    """Move one side's score by ``delta``; a no-op at 0 or ``limit``."""
+    if side not in SIDES:
+        raise ValueError("Side must be 'A' or 'B'.")
+    if delta not in (1, -1):
+        raise ValueError("Delta must be 1 or -1.")
+
+    entries, score = _load(match_id, version)
+    new_value = score["score" + side] + delta
+    if new_value < 0 or (limit and new_value > limit):
+        return score
+    return _append(game_id, match_id, entries, op=POINT, side=side, delta=delta)
+
+
+def undo(game_id, match_id, version=None):
+    """Cancel the latest point or set still in effect."""
+    entries, score = _load(match_id, version)
+    if not _in_effect(entries):
+        return score
+    return _append(game_id, match_id, entries, op=UNDO)
+
+
+def set_score(game_id, match_id, score_a, score_b, version=None):
+    """Record an absolute score, e.g. a correction or the final result."""
+    score_a, score_b = int(score_a), int(score_b)
+    if score_a < 0 or score_b < 0:
+        raise ValueError("Scores cannot be negative.")
+
+    entries, score = _load(match_id, version)
+    if (score["scoreA"], score["scoreB"]) == (score_a, score_b):
+        return score
+    return _append(game_id, match_id, entries, op=SET, score_a=score_a, score_b=score_b)
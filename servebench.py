@@ -0,0 +1,259 @@
+"""Requests/sec and latency of the WSGI and ASGI serving modes on one box.
+
+Each mode runs in its own server process on a seeded temporary database;
+a small asyncio HTTP client drives the read views at a fixed concurrency,
+optionally while holding idle /live streams open.
+
+    python -m servebench serve --mode asgi --port 8001   # one server
+    flask bench-serving                                  # the comparison
+"""
+import argparse
+import asyncio
+import importlib.util
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import sqlalchemy as sa
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODES = ("wsgi", "asgi")
+
+
+# -------------------- Servers --------------------
+def serve(mode, port):
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    if mode == "wsgi":
+        from werkzeug.serving import make_server
+
+        from app import create_app
+
+        # The same threaded server app.run() uses, minus the debugger and reloader
+        make_server("127.0.0.1", port, create_app(), threaded=True).serve_forever()
+    else:
+        import uvicorn
+
+        uvicorn.run("asgi:application", host="127.0.0.1", port=port, log_level="warning")
+
+
+def mode_available(mode):
+    return mode == "wsgi" or all(
+        importlib.util.find_spec(name) for name in ("uvicorn", "asgiref", "aiosqlite")
+    )
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def start_server(mode, database_url):
+    port = _free_port()
+    env = dict(os.environ, MATCHMAKER_DATABASE_URL=database_url, MATCHMAKER_EVENT_STORE="sql")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "servebench", "serve", "--mode", mode, "--port", str(port)],
+        cwd=HERE,
+        env=env,
+    )
+    try:
+        _wait_for_port(port)
+    except RuntimeError:
+        process.kill()
+        raise
+    return process, port
+
+
+# -------------------- Data --------------------
+def seed_database(path, events):
+    """Seed ``path`` and return (targets, session payload) for the read views."""
+    import querycheck
+    from eventstore import SQLBackend, encode_state
+
+    game_id = f"G{0:023d}"
+    player_id = f"{0:05d}{0:05d}"
+    match_id = f"{0:016d}{0:016d}"
+    # A live game so the WSGI score route accepts the read too
+    state = {"players": [], "games": [], "pending_game": None,
+             "active_game": {"match_id": match_id, "game_no": 1, "teams": [], "status": "active"}}
+
+    engine = sa.create_engine(f"sqlite:///{path}")
+    try:
+        querycheck.seed(engine, events=events)
+        SQLBackend(lambda: engine).set(game_id, encode_state(state))
+    finally:
+        engine.dispose()
+
+    targets = {
+        "leaderboard": f"/leaderboard?game_id={game_id}",
+        "player-stats": f"/player-stats/{player_id}",
+        "score": f"/api/matches/{match_id}/score",
+    }
+    return targets, {"current_game_id": game_id, "event_completed": True}
+
+
+# -------------------- Client --------------------
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed")
+    version, status = status_line.split()[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+        keep_alive = version == b"HTTP/1.1" and headers.get("connection") != "close"
+    else:
+        await reader.read()
+        keep_alive = False
+    return int(status), keep_alive
+
+
+async def _worker(port, request, count, latencies, errors):
+    reader = writer = None
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await _read_response(reader)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            errors.append("connection")
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            errors.append(status)
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def _open_stream(port, path):
+    """Open a /live stream and wait for its first frame, so setup is not measured."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    while b"retry:" not in await reader.readline():
+        pass
+    return writer
+
+
+async def _hold_streams(port, path, count):
+    return await asyncio.gather(*(_open_stream(port, path) for _ in range(count)))
+
+
+def process_usage(pid):
+    """(resident MB, threads) of a server process, from /proc where available."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            fields = dict(line.split(":", 1) for line in status)
+    except OSError:
+        return None, None
+    return int(fields["VmRSS"].split()[0]) / 1024, int(fields["Threads"])
+
+
+async def _load(port, path, cookie, requests, concurrency, streams, stream_path, pid):
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: bench\r\nCookie: session={cookie}\r\n\r\n"
+    ).encode("latin-1")
+    held = await _hold_streams(port, stream_path, streams) if streams else []
+
+    latencies, errors = [], []
+    per_worker = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker(port, request, n, latencies, errors) for n in per_worker))
+    elapsed = time.perf_counter() - started
+    usage = process_usage(pid) if pid else (None, None)
+
+    for writer in held:
+        writer.close()
+    return latencies, errors, elapsed, usage
+
+
+def load(port, path, cookie, requests=2000, concurrency=32, streams=0, stream_path=None, pid=None):
+    latencies, errors, elapsed, (rss_mb, threads) = asyncio.run(
+        _load(port, path, cookie, requests, concurrency, streams, stream_path, pid)
+    )
+    latencies.sort()
+    return {
+        "rss_mb": rss_mb,
+        "threads": threads,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0,
+    }
+
+
+def compare(app, modes=MODES, events=50, requests=2000, concurrency=32, streams=0):
+    """Return {mode: {view: stats} or None when the mode's server is not installed}."""
+    cookie_serializer = app.session_interface.get_signing_serializer(app)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        targets, session_data = seed_database(path, events)
+        cookie = cookie_serializer.dumps(session_data)
+        stream_path = f"/live/{session_data['current_game_id']}"
+
+        for mode in modes:
+            if not mode_available(mode):
+                results[mode] = None
+                continue
+            process, port = start_server(mode, f"sqlite:///{path}")
+            try:
+                load(port, targets["leaderboard"], cookie, requests=50, concurrency=4)  # warm up
+                results[mode] = {
+                    view: load(port, target, cookie, requests, concurrency, streams, stream_path,
+                               pid=process.pid)
+                    for view, target in targets.items()
+                }
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Run one server for the benchmark.")
+    serve_parser.add_argument("--mode", choices=MODES, required=True)
+    serve_parser.add_argument("--port", type=int, required=True)
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args.mode, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import sqlalchemy as sa
+from sqlalchemy.orm import aliased
+
+from models import db, GameInfo, Player, Match, MatchPlayer, MatchSide, Standing, event_pk, resolve_event_pk
+
+# Leaderboard order: points, then point difference, then wins
+RANK_ORDER = (
+    Standing.points.desc(),
+    Standing.point_diff.desc(),
+    Standing.wins.desc(),
+    Standing.player_code,
+)
+
+
+def _empty_row(event_key, player_pk, player_code, player_name):
+    return {
+        "event_pk": event_key,
+        "player_pk": player_pk,
+        "player_code": player_code,
+        "player_name": player_name,
+        "games": 0,
+        "wins": 0,
+        "losses": 0,
+        "ties": 0,
+        "points": 0,
+        "point_diff": 0,
+        "matches_drawn": 0,
+        "seconds_played": 0,
+    }
+
+
+def seed_standings(game_id, players):
+    """Reset the event's standings to a zero row per player (no commit)."""
+    event_key = resolve_event_pk(game_id)
+    Standing.query.filter(Standing.event_pk == event_key).delete()
+    db.session.add_all(
+        Standing(**_empty_row(event_key, p.id, p.player_code, p.player_name))
+        for p in players
+    )
+
+
+def record_match_result(game_id, teams, score_a, score_b, winner, seconds=0):
+    """Add one finished match of ``seconds`` to the standings (no commit).
+
+    ``teams`` holds the player keys of side A and side B (None for names
+    not on the roster, which have no standing). Totals are bumped with
+    UPDATE ... SET col = col + n so concurrent finalizations cannot
+    overwrite each other.
+    """
+    db.session.execute(
+        sa.update(GameInfo)
+        .where(GameInfo.game_id == game_id)
+        .values(
+            matches_finished=GameInfo.matches_finished + 1,
+            court_seconds=GameInfo.court_seconds + seconds,
+        )
+    )
+    event_key = None
+    for side, player_pks in zip(("A", "B"), teams):
+        player_pks = [pk for pk in player_pks if pk is not None]
+        if not player_pks:
+            continue
+        score, opponent = (score_a, score_b) if side == "A" else (score_b, score_a)
+        flag = "T" if winner == "T" else ("W" if winner == side else "L")
+        updated = (
+            Standing.query
+            .filter(Standing.event_pk == event_pk(game_id), Standing.player_pk.in_(player_pks))
+            .update(
+                {
+                    Standing.games: Standing.games + 1,
+                    Standing.wins: Standing.wins + (1 if flag == "W" else 0),
+                    Standing.losses: Standing.losses + (1 if flag == "L" else 0),
+                    Standing.ties: Standing.ties + (1 if flag == "T" else 0),
+                    Standing.points: Standing.points + score,
+                    Standing.point_diff: Standing.point_diff + (score - opponent),
+                    Standing.seconds_played: Standing.seconds_played + seconds,
+                },
+                synchronize_session=False,
+            )
+        )
+        if updated == len(player_pks):
+            continue
+
+        # Players without a standings row (e.g. seeded before this table existed)
+        if event_key is None:
+            event_key = resolve_event_pk(game_id)
+        existing = {
+            row.player_pk
+            for row in Standing.query.with_entities(Standing.player_pk)
+            .filter(Standing.event_pk == event_key, Standing.player_pk.in_(player_pks))
+        }
+        missing = [pk for pk in player_pks if pk not in existing]
+        drawn = drawn_counts(game_id, missing)
+        for player in Player.query.filter(Player.id.in_(missing)):
+            row = _empty_row(event_key, player.id, player.player_code, player.player_name)
+            row.update(
+                games=1,
+                wins=1 if flag == "W" else 0,
+                losses=1 if flag == "L" else 0,
+                ties=1 if flag == "T" else 0,
+                points=score,
+                point_diff=score - opponent,
+                matches_drawn=drawn.get(player.id, 0),
+                seconds_played=seconds,
+            )
+            db.session.add(Standing(**row))
+
+
+def drawn_counts(game_id, player_pks=None):
+    """Return {player key: number of drawn matches} for an event."""
+    query = (
+        db.session.query(MatchPlayer.player_pk, sa.func.count(MatchPlayer.id))
+        .join(MatchSide, MatchPlayer.side_pk == MatchSide.id)
+        .join(Match, MatchSide.match_pk == Match.id)
+        .filter(Match.event_pk == event_pk(game_id), MatchPlayer.player_pk.isnot(None))
+    )
+    if player_pks is not None:
+        query = query.filter(MatchPlayer.player_pk.in_(player_pks))
+    return dict(query.group_by(MatchPlayer.player_pk).all())
+
+
+def rebuild_standings(game_id):
+    """Recompute an event's standings and court time from its finished matches (no commit)."""
+    event_key = resolve_event_pk(game_id)
+    players = Player.query.filter(Player.event_pk == event_key).order_by(Player.player_code).all()
+    rows = {
+        p.id: _empty_row(event_key, p.id, p.player_code, p.player_name)
+        for p in players
+    }
+
+    opponent = aliased(MatchSide)
+    seats = (
+        db.session.query(
+            MatchPlayer.player_pk,
+            Match.duration_seconds,
+            MatchSide.score,
+            MatchSide.result,
+            opponent.score.label("opponent_score"),
+        )
+        .join(MatchSide, MatchPlayer.side_pk == MatchSide.id)
+        .join(Match, MatchSide.match_pk == Match.id)
+        .outerjoin(opponent, (opponent.match_pk == Match.id) & (opponent.side != MatchSide.side))
+        .filter(Match.event_pk == event_key, MatchSide.result.isnot(None))
+        .all()
+    )
+    for seat in seats:
+        row = rows.get(seat.player_pk)
+        if row is None:  # not on the roster
+            continue
+        row["games"] += 1
+        flag = seat.result.upper()
+        if flag == "W":
+            row["wins"] += 1
+        elif flag == "L":
+            row["losses"] += 1
+        elif flag == "T":
+            row["ties"] += 1
+
+        score = seat.score or 0
+        row["points"] += score
+        row["point_diff"] += score - (seat.opponent_score or 0)
+        row["seconds_played"] += seat.duration_seconds or 0
+
+    for player_pk, count in drawn_counts(game_id).items():
+        if player_pk in rows:
+            rows[player_pk]["matches_drawn"] = count
+
+    Standing.query.filter(Standing.event_pk == event_key).delete()
+    db.session.add_all(Standing(**row) for row in rows.values())
+    matches_finished, court_seconds = (
+        db.session.query(sa.func.count(Match.id), sa.func.coalesce(sa.func.sum(Match.duration_seconds), 0))
+        .filter(Match.event_pk == event_key, Match.end_at.isnot(None))
+        .one()
+    )
+    db.session.execute(
+        sa.update(GameInfo)
+        .where(GameInfo.id == event_key)
+        .values(matches_finished=matches_finished, court_seconds=court_seconds)
+    )
+    return len(rows)
+
+
+def _as_row(standing, player_id, rank):
+    return {
+        "player_id": player_id,
+        "player_code": standing.player_code,
+        "player_name": standing.player_name,
+        "games": standing.games,
+        "wins": standing.wins,
+        "losses": standing.losses,
+        "ties": standing.ties,
+        "points": standing.points,
+        "point_diff": standing.point_diff,
+        "seconds_played": standing.seconds_played,
+        "rank": rank,
+    }
+
+
+def _ensure_standings(game_id):
+    """Rebuild once for events recorded before the standings table existed."""
+    if Standing.query.filter(Standing.event_pk == event_pk(game_id)).first():
+        return
+    if Player.query.filter(Player.event_pk == event_pk(game_id)).first():
+        rebuild_standings(game_id)
+        db.session.commit()
+
+
+def _with_player_id():
+    """Standing rows with their player's public id, for links."""
+    return sa.select(Standing, Player.player_id).join(Player, Player.id == Standing.player_pk)
+
+
+def _ranked_query(game_id, limit=None):
+    query = _with_player_id().where(Standing.event_pk == event_pk(game_id)).order_by(*RANK_ORDER)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def ranked_standings(game_id, limit=None):
+    """Return the ranked standings as dicts, best first."""
+    query = _ranked_query(game_id, limit)
+    standings = db.session.execute(query).all()
+    if not standings:
+        _ensure_standings(game_id)
+        standings = db.session.execute(query).all()
+    return [_as_row(s, player_id, rank) for rank, (s, player_id) in enumerate(standings, start=1)]
+
+
+async def ranked_standings_async(session, game_id, limit=None):
+    """ranked_standings on an AsyncSession; [] when the event still needs a rebuild."""
+    standings = (await session.execute(_ranked_query(game_id, limit))).all()
+    return [_as_row(s, player_id, rank) for rank, (s, player_id) in enumerate(standings, start=1)]
+
+
+def _ranks_ahead(s):
+    """SQL condition for rows ranked ahead of standing ``s`` (see RANK_ORDER)."""
+    return sa.or_(
+        Standing.points > s.points,
+        sa.and_(Standing.points == s.points, sa.or_(
+            Standing.point_diff > s.point_diff,
+            sa.and_(Standing.point_diff == s.point_diff, sa.or_(
+                Standing.wins > s.wins,
+                sa.and_(Standing.wins == s.wins, Standing.player_code < s.player_code),
+            )),
+        )),
+    )
+
+
+def _standing_query(game_id, player_id):
+    return (
+        _with_player_id()
+        .where(Standing.event_pk == event_pk(game_id), Player.player_id == player_id)
+        .limit(1)
+    )
+
+
+def _rank_query(standing):
+    """(players in the event, players ranked ahead of ``standing``)."""
+    return sa.select(
+        sa.func.count(Standing.id),
+        sa.func.coalesce(sa.func.sum(sa.case((_ranks_ahead(standing), 1), else_=0)), 0),
+    ).where(Standing.event_pk == standing.event_pk)
+
+
+def player_standing(game_id, player_id):
+    """Return (row with rank, total players) for one player, or (None, total)."""
+    standing = db.session.scalars(_standing_query(game_id, player_id)).first()
+    if standing is None:
+        _ensure_standings(game_id)
+        standing = db.session.scalars(_standing_query(game_id, player_id)).first()
+
+    if standing is None:
+        total = Standing.query.filter(Standing.event_pk == event_pk(game_id)).count()
+        return None, total
+
+    total, ahead = db.session.execute(_rank_query(standing)).one()
+    return _as_row(standing, player_id, ahead + 1), total
+
+
+async def player_standing_async(session, game_id, player_id):
+    """player_standing on an AsyncSession; (None, 0) when the player has no row yet."""
+    standing = (await session.scalars(_standing_query(game_id, player_id))).first()
+    if standing is None:
+        return None, 0
+    total, ahead = (await session.execute(_rank_query(standing))).one()
+    return _as_row(standing, player_id, ahead + 1), total
+
+
+def court_time_by_event(limit=None):
+    """Court time per event, newest first, from the stored totals (one query).
+
+    Rows: game_id, game_name, matches, court_seconds, avg_match_seconds,
+    players (with at least one finished match), avg_player_seconds.
+    """
+    played = Standing.games > 0
+    query = (
+        sa.select(
+            GameInfo.game_id,
+            GameInfo.game_name,
+            GameInfo.matches_finished.label("matches"),
+            GameInfo.court_seconds,
+            (GameInfo.court_seconds // sa.func.nullif(GameInfo.matches_finished, 0)).label("avg_match_seconds"),
+            sa.func.count(Standing.id).label("players"),
+            sa.func.avg(Standing.seconds_played).label("avg_player_seconds"),
+        )
+        .outerjoin(Standing, (Standing.event_pk == GameInfo.id) & played)
+        .group_by(GameInfo.id)
+        .order_by(GameInfo.created_at.desc(), GameInfo.id.desc())
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return db.session.execute(query).all()
@@ -0,0 +1,141 @@
+"""Cold-start cost of a worker: import time and time to the first response.
+
+Every sample runs in a fresh interpreter, as a worker scaled up from zero
+would, once with the Jinja bytecode cache disabled and once with the
+templates precompiled by ``flask build-assets``.
+
+    python -m startbench probe --path /game-plan   # one sample, as JSON
+    flask bench-startup                            # the comparison
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = "/game-plan"
+
+
+def probe(path):
+    """Time the stages of one cold start in this (fresh) interpreter."""
+    started = time.perf_counter()
+    import app as appmodule
+
+    imported = time.perf_counter()
+    app = appmodule.create_app()
+    created = time.perf_counter()
+    client = app.test_client()
+    status = client.get(path).status_code
+    first = time.perf_counter()
+    client.get(path)
+    second = time.perf_counter()
+    return {
+        "status": status,
+        "import": imported - started,
+        "create_app": created - imported,
+        "first_request": first - created,
+        "warm_request": second - first,
+    }
+
+
+def _env(database_url, jinja_cache_dir):
+    return dict(
+        os.environ,
+        MATCHMAKER_DATABASE_URL=database_url,
+        MATCHMAKER_JINJA_CACHE_DIR=jinja_cache_dir,
+    )
+
+
+def sample(path, env):
+    """One cold start: the in-process breakdown plus the wall time of the whole process."""
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "startbench", "probe", "--path", path],
+        cwd=HERE, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    stages = json.loads(output.strip().splitlines()[-1])
+    stages["process"] = time.perf_counter() - started
+    return stages
+
+
+def first_response(path, env):
+    """Seconds from spawning a WSGI server process to its first 200 for ``path``."""
+    from servebench import _free_port
+
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "servebench", "serve", "--mode", "wsgi", "--port", str(port)],
+        cwd=HERE, env=env,
+    )
+    try:
+        deadline = started + 60
+        while time.perf_counter() < deadline:
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+                connection.request("GET", path)
+                status = connection.getresponse().status
+            except OSError:
+                time.sleep(0.01)
+                continue
+            if status != 200:
+                raise RuntimeError(f"{path} answered {status}")
+            return time.perf_counter() - started
+        raise RuntimeError(f"No 200 from {path} within 60 s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def precompile(cache_dir):
+    env = dict(os.environ, MATCHMAKER_JINJA_CACHE_DIR=cache_dir)
+    code = "from app import create_app, precompile_templates; precompile_templates(create_app())"
+    subprocess.run([sys.executable, "-c", code], cwd=HERE, env=env, check=True)
+
+
+def _summary(samples, name):
+    values = sorted(s[name] for s in samples)
+    return {"median": statistics.median(values), "max": values[-1]}
+
+
+def run(path=DEFAULT_PATH, runs=5):
+    """{variant: {stage: {median, max}}} for the uncached and precompiled templates."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        cache_dir = os.path.join(tmp, "jinja-cache")
+        precompile(cache_dir)
+
+        for variant, jinja_cache_dir in (("no-cache", ""), ("precompiled", cache_dir)):
+            env = _env(database_url, jinja_cache_dir)
+            samples = [sample(path, env) for _ in range(runs)]
+            for entry in samples:
+                entry["first_response"] = first_response(path, env)
+            results[variant] = {
+                stage: _summary(samples, stage)
+                for stage in ("import", "create_app", "first_request", "warm_request", "process",
+                              "first_response")
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    probe_parser = commands.add_parser("probe", help="Time one cold start in this process.")
+    probe_parser.add_argument("--path", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+    if args.command == "probe":
+        print(json.dumps(probe(args.path)))
+
+
+if __name__ == "__main__":
+    main()
@@ -55,6 +55,31 @@ function renderScores() {
 }
 renderScores();
 
+let scoreVersion = initialScoreVersion || 0;
+let scoreQueue = Promise.resolve();
+
+function applyServerScore(data) {
+  if (!data || typeof data.version !== "number" || data.version < scoreVersion) return;
+  scoreA = data.scoreA;
+  scoreB = data.scoreB;
+  scoreVersion = data.version;
+  renderScores();
+}
+
+function sendScore(payload) {
+  if (!scoreUrl) return;
+  // Send one change at a time so each carries the version it was made on.
+  scoreQueue = scoreQueue
+    .then(() => fetch(scoreUrl, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ ...payload, version: scoreVersion }),
+    }))
+    .then((response) => response.json())
+    .then(applyServerScore)
+    .catch(() => {});
+}
+
 function changeScore(team, delta) {
   if (hasEnded) return;
   if (team === 'A') {
@@ -63,6 +88,12 @@ function changeScore(team, delta) {
     scoreB = Math.max(0, Math.min(limit, scoreB + delta));
   }
   renderScores();
+  sendScore({ action: "increment", side: team, delta });
+}
+
+function undoScore() {
+  if (hasEnded) return;
+  sendScore({ action: "undo" });
 }
 
 function prepareEndGame(evt) {
@@ -84,4 +115,5 @@ function prepareEndGame(evt) {
 }
 
 window.changeScore = changeScore;
+window.undoScore = undoScore;
 window.prepareEndGame = prepareEndGame;
@@ -0,0 +1,53 @@
+const wrapper = document.querySelector(".leaderboard-wrapper");
+const liveUrl = wrapper ? wrapper.dataset.liveUrl : null;
+
+function renderRow(row, rankIcon) {
+  const tr = document.createElement("tr");
+
+  const rank = document.createElement("td");
+  rank.className = "col-rank";
+  if (row.rank === 1) {
+    const img = document.createElement("img");
+    img.src = rankIcon;
+    img.alt = "Rank 1";
+    img.className = "rank-icon";
+    rank.appendChild(img);
+  } else {
+    rank.textContent = row.rank;
+  }
+
+  const cells = [
+    ["col-player", row.player_name],
+    ["col-record", `${row.games}-${row.wins}-${row.losses}`],
+    ["col-diff", (row.point_diff >= 0 ? "+" : "") + row.point_diff],
+    ["col-points", row.points],
+  ];
+  tr.appendChild(rank);
+  cells.forEach(([className, text]) => {
+    const td = document.createElement("td");
+    td.className = className;
+    td.textContent = text;
+    tr.appendChild(td);
+  });
+  return tr;
+}
+
+function renderLeaderboard(rows) {
+  if (!rows.length) return;
+  const tbody = wrapper.querySelector(".leaderboard-table tbody");
+  if (!tbody) {
+    // First result of the event: the page was rendered with the empty state.
+    window.location.reload();
+    return;
+  }
+  const rankIcon = wrapper.dataset.rankIcon;
+  tbody.replaceChildren(...rows.map((row) => renderRow(row, rankIcon)));
+}
+
+if (liveUrl && window.EventSource) {
+  const source = new EventSource(liveUrl);
+  source.addEventListener("leaderboard", (evt) => {
+    renderLeaderboard(JSON.parse(evt.data).rows || []);
+  });
+  source.addEventListener("wrap-up", () => source.close());
+}
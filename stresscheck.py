@@ -0,0 +1,168 @@
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+import sqlalchemy as sa
+from flask import Flask
+
+from dbconfig import engine_options, init_db, sqlite_pragmas
+from matches import finish_match, lock_match
+from models import db, GameInfo, Playground, Player, Match, MatchSide, Person, RatingSnapshot, Standing, now_jakarta
+from ratings import link_people
+from standings import seed_standings
+
+
+def _make_app(url):
+    app = Flask("matchmaker-stress")
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(url)
+    app.config["SQLITE_PRAGMAS"] = sqlite_pragmas()
+    init_db(app)
+    return app
+
+
+def _seed(game_id, players, matches, rng):
+    """One event whose ``matches`` locked games share ``players`` new people."""
+    event = GameInfo(game_id=game_id, game_name="Stress", game_place="Local",
+                     host_email="stress@example.com")
+    db.session.add(event)
+    db.session.flush()
+    db.session.add(Playground(event_pk=event.id, sport="Padel", game_type="Doubles",
+                              game_format="Mexicano", point_limit=21, courts_count=1))
+    roster = [
+        Player(event_pk=event.id, player_code=f"P-{i + 1:02}", player_name=f"Stress {game_id[:8]} {i + 1}")
+        for i in range(players)
+    ]
+    db.session.add_all(roster)
+    db.session.flush()
+    link_people(roster)
+    seed_standings(game_id, roster)
+
+    by_name = {p.player_name: p for p in roster}
+    games = []
+    for game_no in range(1, matches + 1):
+        names = rng.sample(sorted(by_name), 4)
+        game = {"game_no": game_no, "match_id": os.urandom(16).hex(), "teams": [names[:2], names[2:]]}
+        lock_match(game_id, game, by_name, now_jakarta())
+        games.append(game)
+    db.session.commit()
+    return games
+
+
+def _expected(games, results):
+    """{player_name: [games, points]} the standings must hold afterwards."""
+    totals = {}
+    for game, scores in zip(games, results):
+        for team, score in zip(game["teams"], scores):
+            for name in team:
+                entry = totals.setdefault(name, [0, 0])
+                entry[0] += 1
+                entry[1] += score
+    return totals
+
+
+def run(url=None, workers=16, players=8, seed=0):
+    """Finalize ``workers`` games at once and check every write landed.
+
+    Without ``url`` a throwaway SQLite file is used; otherwise point it at a
+    scratch database. Returns a report dict; ``report["ok"]`` is the verdict.
+    """
+    tmp = None
+    if url is None:
+        tmp = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmp.name, 'stress.db')}"
+
+    rng = random.Random(seed)
+    app = _make_app(url)
+    game_id = os.urandom(12).hex()
+    try:
+        with app.app_context():
+            db.create_all()
+            games = _seed(game_id, players, workers, rng)
+
+        results = [(21, rng.randint(0, 19)) for _ in games]
+        barrier = threading.Barrier(len(games))
+        errors, latencies = [], []
+
+        def finalize(game, result):
+            with app.app_context():
+                barrier.wait()
+                started = time.perf_counter()
+                try:
+                    outcome = {"scoreA": result[0], "scoreB": result[1], "winner": "A"}
+                    end_dt = now_jakarta()
+                    finish_match(game_id, game, outcome, end_dt, end_dt, 600)
+                    db.session.commit()
+                except Exception as exc:  # reported, not raised: the check counts them
+                    db.session.rollback()
+                    errors.append(f"game {game['game_no']}: {exc}")
+                finally:
+                    latencies.append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=finalize, args=pair) for pair in zip(games, results)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        with app.app_context():
+            results_stored = MatchSide.query.join(Match, MatchSide.match_pk == Match.id).filter(
+                Match.match_id.in_([game["match_id"] for game in games]), MatchSide.result.isnot(None)
+            ).count()
+            stored = {
+                s.player_name: [s.games, s.points]
+                for s in Standing.query.join(GameInfo, GameInfo.id == Standing.event_pk)
+                .filter(GameInfo.game_id == game_id)
+            }
+            rated = dict(
+                db.session.query(Player.player_name, Person.rated_matches)
+                .join(Person, Person.id == Player.person_pk)
+                .join(GameInfo, GameInfo.id == Player.event_pk)
+                .filter(GameInfo.game_id == game_id)
+            )
+            snapshots = RatingSnapshot.query.join(Match, RatingSnapshot.match_pk == Match.id).filter(
+                Match.match_id.in_([game["match_id"] for game in games])
+            ).count()
+            journal_mode = None
+            if db.engine.dialect.name == "sqlite":
+                journal_mode = db.session.execute(db.text("PRAGMA journal_mode")).scalar()
+
+        expected = _expected(games, results)
+        lost = {
+            name: (stored.get(name), totals)
+            for name, totals in expected.items()
+            if stored.get(name) != totals
+        }
+        lost_ratings = {
+            name: (rated.get(name), totals[0])
+            for name, totals in expected.items()
+            if rated.get(name) != totals[0]
+        }
+        return {
+            "ok": (not errors and not lost and not lost_ratings
+                   and results_stored == len(games) * 2 and snapshots == len(games) * 4),
+            "backend": sa.engine.make_url(url).get_backend_name(),
+            "journal_mode": journal_mode,
+            "finalizations": len(games),
+            "errors": errors,
+            "side_results": results_stored,
+            "expected_results": len(games) * 2,
+            "lost_standings": lost,
+            "rating_snapshots": snapshots,
+            "expected_snapshots": len(games) * 4,
+            "lost_ratings": lost_ratings,
+            "elapsed": elapsed,
+            "p50": statistics.median(latencies),
+            "max": max(latencies),
+        }
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        if tmp is not None:
+            tmp.cleanup()
+
@@ -0,0 +1,178 @@
+import fnmatch
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Schedule tables are cached on disk at import time; keep them out of the checkout
+os.environ.setdefault("MATCHMAKER_SCHEDULE_CACHE", os.path.join(tempfile.mkdtemp(), "schedules"))
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    """Speaks enough RESP for RedisBackend and livefeed.RedisBus.
+
+    AUTH, SELECT, GET, SET [EX], DEL, EXPIRE, INCR, HSET, HGETALL, PUBLISH
+    and PSUBSCRIBE.
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, password=None):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.password = password
+        self.data = {}
+        self.expiry = {}
+        self.commands = []
+        self.clients = []
+        self.subscribers = []  # (pattern, handler)
+        self.publish_lock = threading.Lock()
+
+    def drop_clients(self):
+        for client in self.clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:  # its handler has already closed it
+                pass
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+def bulk(value):
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        assert line[:1] == b"*"
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        server = self.server
+        server.clients.append(self.request)
+        authed = server.password is None
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            name = args[0].decode().upper()
+            server.commands.append(name)
+            if name == "AUTH":
+                authed = args[1].decode() == server.password
+                self.wfile.write(b"+OK\r\n" if authed else b"-WRONGPASS invalid password\r\n")
+            elif not authed:
+                self.wfile.write(b"-NOAUTH Authentication required\r\n")
+            elif name == "SELECT":
+                self.wfile.write(b"+OK\r\n")
+            elif name == "GET":
+                self.wfile.write(bulk(server.data.get(args[1])))
+            elif name == "SET":
+                server.data[args[1]] = args[2]
+                if len(args) > 4 and args[3].upper() == b"EX":
+                    server.expiry[args[1]] = int(args[4])
+                self.wfile.write(b"+OK\r\n")
+            elif name == "DEL":
+                self.wfile.write(b":%d\r\n" % int(server.data.pop(args[1], None) is not None))
+            elif name == "EXPIRE":
+                server.expiry[args[1]] = int(args[2])
+                self.wfile.write(b":%d\r\n" % int(args[1] in server.data))
+            elif name == "INCR":
+                server.data[args[1]] = b"%d" % (int(server.data.get(args[1], b"0")) + 1)
+                self.wfile.write(b":%s\r\n" % server.data[args[1]])
+            elif name == "HSET":
+                server.data.setdefault(args[1], {})[args[2]] = args[3]
+                self.wfile.write(b":1\r\n")
+            elif name == "HGETALL":
+                fields = server.data.get(args[1], {})
+                self.wfile.write(b"*%d\r\n" % (2 * len(fields)) + b"".join(
+                    bulk(key) + bulk(value) for key, value in fields.items()
+                ))
+            elif name == "PUBLISH":
+                channel, message = args[1], args[2]
+                with server.publish_lock:
+                    receivers = [
+                        (pattern, handler) for pattern, handler in server.subscribers
+                        if fnmatch.fnmatchcase(channel.decode(), pattern.decode())
+                    ]
+                    for pattern, handler in receivers:
+                        handler.wfile.write(b"*4\r\n" + bulk(b"pmessage") + bulk(pattern) + bulk(channel) + bulk(message))
+                self.wfile.write(b":%d\r\n" % len(receivers))
+            elif name == "PSUBSCRIBE":
+                with server.publish_lock:
+                    server.subscribers.append((args[1], self))
+                    self.wfile.write(b"*3\r\n" + bulk(b"psubscribe") + bulk(args[1]) + b":1\r\n")
+                try:
+                    while self.read_command() is not None:
+                        pass
+                finally:
+                    with server.publish_lock:
+                        server.subscribers.remove((args[1], self))
+                return
+            elif name == "QUIT":
+                return
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+@pytest.fixture
+def fake_redis():
+    server = FakeRedis(password="secret")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.drop_clients()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'matchmaker.db'}",
+        "EVENT_STORE_URL": "sql",
+        "JINJA_CACHE_DIR": "",
+        "BUNDLED_ASSETS": False,
+    })
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def start_event(client, players, courts=1, game_format="Mexicano", host="host@example.com"):
+    """Walk the setup pages: game plan, playground and roster."""
+    client.post("/game-plan", data={"game_name": "Club night", "game_place": "Hall", "host_email": host})
+    client.post("/playground", data={
+        "sport": "Padel", "game_type": "Doubles", "game_format": game_format,
+        "point_limit": "21", "courts_count": str(courts),
+    })
+    client.post("/players", data={f"player_{i}": name for i, name in enumerate(players)})
+    with client.session_transaction() as sess:
+        return sess["current_game_id"]
@@ -0,0 +1,82 @@
+import asyncio
+import importlib
+import json
+
+import pytest
+
+from conftest import start_event
+from models import db
+
+pytest.importorskip("asgiref")
+pytest.importorskip("aiosqlite")
+
+PLAYERS = ["Ana", "Budi", "Citra", "Dewi", "Eka"]
+
+
+@pytest.fixture(scope="module")
+def asgi(tmp_path_factory):
+    env = {
+        "MATCHMAKER_DATABASE_URL": f"sqlite:///{tmp_path_factory.mktemp('asgi') / 'matchmaker.db'}",
+        "MATCHMAKER_EVENT_STORE": "sql",
+        "MATCHMAKER_JINJA_CACHE_DIR": "",
+        "MATCHMAKER_BUNDLED_ASSETS": "0",
+    }
+    with pytest.MonkeyPatch.context() as patch:
+        for name, value in env.items():
+            patch.setenv(name, value)
+        module = importlib.import_module("asgi")
+    module.app.config["TESTING"] = True
+    with module.app.app_context():
+        db.create_all()
+    return module
+
+
+def call(asgi, path, cookie):
+    """GET ``path`` through the ASGI application; returns (status, body)."""
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "root_path": "",
+        "scheme": "http", "query_string": b"", "http_version": "1.1",
+        "headers": [(b"host", b"localhost"), (b"cookie", f"session={cookie}".encode())],
+        "server": ("localhost", 80), "client": ("127.0.0.1", 1234),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi.application(scope, receive, send))
+    status = next(m["status"] for m in messages if m["type"] == "http.response.start")
+    return status, b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+
+
+def both(asgi, client, path):
+    flask = client.get(path)
+    async_status, async_body = call(asgi, path, client.get_cookie("session").value)
+    return (flask.status_code, flask.get_data()), (async_status, async_body)
+
+
+def test_score_reads_answer_the_same_matches_on_both_apps(asgi):
+    client = asgi.app.test_client()
+    start_event(client, PLAYERS)
+    client.get("/drawing")
+    client.post("/drawing", data={"action": "next"})
+    page = client.get("/game-session").get_data(as_text=True)
+    first = page.split("const scoreUrl = ")[1].split(";")[0].strip('"')
+    client.post(first, json={"action": "increment", "side": "A"})
+
+    flask, async_ = both(asgi, client, first)
+    assert flask[0] == async_[0] == 200
+    assert json.loads(flask[1]) == json.loads(async_[1]) == {"scoreA": 1, "scoreB": 0, "version": 1}
+
+    # Once the next game is live the first one is no longer served by either
+    client.post("/game-session", data={"action": "end", "scoreA": "21", "scoreB": "15"})
+    client.post("/game-session", data={"action": "next"})
+    client.post("/drawing", data={"action": "next"})
+    flask, async_ = both(asgi, client, first)
+    assert flask[0] == async_[0] == 404
+
+    flask, async_ = both(asgi, client, "/api/matches/not-a-match/score")
+    assert flask[0] == async_[0] == 404
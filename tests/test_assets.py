@@ -0,0 +1,63 @@
+import re
+import shutil
+
+import pytest
+
+from app import create_app
+from assets import DIST_DIR, build, load_manifest
+from conftest import ROOT, start_event
+from models import db
+
+pytest.importorskip("fontTools")
+pytest.importorskip("brotli")
+
+
+@pytest.fixture
+def bundled_client(tmp_path):
+    """A client of an app serving `flask build-assets` output built into a copy of static/."""
+    static = tmp_path / "static"
+    shutil.copytree(f"{ROOT}/static", static, ignore=shutil.ignore_patterns(DIST_DIR))
+    build(str(static), f"{ROOT}/templates")
+
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'matchmaker.db'}",
+        "JINJA_CACHE_DIR": "",
+        "BUNDLED_ASSETS": False,  # the checkout's static/ may have no build; point at the copy
+    })
+    app.static_folder = str(static)
+    app.config["ASSET_MANIFEST"] = load_manifest(app.static_folder)
+    app.jinja_env.globals["assets_bundled"] = True
+    with app.app_context():
+        db.create_all()
+    return app.test_client()
+
+
+def static_urls(page):
+    return re.findall(r"""(?:href|src)="(/static/[^"]+)"|url\('(/static/[^']+)'\)""", page)
+
+
+def test_pages_link_built_assets_that_are_served(bundled_client):
+    client = bundled_client
+    start_event(client, ["Ana", "Budi", "Citra", "Dewi"])
+    client.get("/drawing")
+    client.post("/drawing", data={"action": "next"})
+
+    for path in ("/", "/game-session"):
+        page = client.get(path).get_data(as_text=True)
+        urls = [href or url for href, url in static_urls(page)]
+        sheets = [url for url in urls if url.endswith(".css")]
+        assert len(sheets) == 1  # one bundled sheet per page
+        assert all(re.search(rf"/static/{DIST_DIR}/.+\.[0-9a-f]{{10}}\.\w+$", url) for url in urls), urls
+        if path == "/game-session":
+            assert any(url.endswith(".js") for url in urls)
+
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == 200, url
+            assert "immutable" in response.headers["Cache-Control"]
+            if url.endswith(".css"):  # and the subset fonts the sheet loads
+                fonts = re.findall(r"""url\(["']?([^"')]+\.woff2)""", response.get_data(as_text=True))
+                assert fonts
+                for font in fonts:
+                    assert client.get(font).status_code == 200, font
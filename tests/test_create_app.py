@@ -0,0 +1,68 @@
+from flask import Flask
+
+from app import create_app, precompile_templates
+from conftest import start_event
+from eventstore import MemoryBackend, SQLBackend
+from models import GameInfo, db
+
+
+def make_app(tmp_path, name, **config):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / f'{name}.db'}",
+        "JINJA_CACHE_DIR": "",
+        "BUNDLED_ASSETS": False,
+        **config,
+    })
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def test_two_apps_keep_their_own_config_database_and_stores(tmp_path):
+    first = make_app(tmp_path, "first", EXPORT_TOKEN="first-token", JINJA_CACHE_DIR=str(tmp_path / "jinja"))
+    second = make_app(tmp_path, "second", EVENT_STORE_URL="memory://?size=4")
+
+    assert (first.config["EXPORT_TOKEN"], second.config["EXPORT_TOKEN"]) == ("first-token", "")
+    assert isinstance(first.extensions["event_store"].backend, SQLBackend)
+    assert isinstance(second.extensions["event_store"].backend, MemoryBackend)
+    assert first.jinja_env is not second.jinja_env
+    assert first.jinja_env.bytecode_cache is not None and second.jinja_env.bytecode_cache is None
+    assert "bytecode_cache" not in Flask.jinja_options
+
+    start_event(first.test_client(), ["Ana", "Budi", "Citra", "Dewi"])
+    with first.app_context():
+        assert GameInfo.query.count() == 1
+        first_url = db.engine.url
+    with second.app_context():
+        assert GameInfo.query.count() == 0
+        assert db.engine.url != first_url
+
+    # Each app answers by its own settings: export is on in one and off in the other
+    assert first.test_client().get("/export/matches.csv").status_code == 401
+    assert second.test_client().get("/export/matches.csv").status_code == 404
+
+    for app in (first, second):
+        with app.app_context():
+            db.engine.dispose()
+
+
+def test_templates_compile_once_into_the_bytecode_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "jinja"
+    builder = make_app(tmp_path, "builder", JINJA_CACHE_DIR=str(cache_dir))
+    compiled = precompile_templates(builder)
+    assert compiled and len(list(cache_dir.glob("__jinja2_*.cache"))) == compiled
+
+    worker = make_app(tmp_path, "worker", JINJA_CACHE_DIR=str(cache_dir))
+    cache = worker.jinja_env.bytecode_cache
+    hits = []
+    load = cache.load_bytecode
+
+    def spy(bucket):
+        load(bucket)
+        hits.append(bucket.code is not None)
+
+    monkeypatch.setattr(cache, "load_bytecode", spy)
+    assert worker.test_client().get("/").status_code == 200
+    assert hits and all(hits)  # loaded from the builder's files, nothing compiled
+    assert len(list(cache_dir.glob("__jinja2_*.cache"))) == compiled
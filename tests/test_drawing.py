@@ -0,0 +1,51 @@
+import re
+
+from conftest import start_event
+from models import Match, MatchPlayer, MatchSide, db, event_pk
+
+PLAYERS = [f"Player {i:02}" for i in range(12)]
+
+
+def test_three_courts_draw_one_game_per_court(app, client):
+    game_id = start_event(client, PLAYERS, courts=3)
+
+    page = client.get("/drawing").get_data(as_text=True)
+    assert re.findall(r"\(Court (\w)\)", page) == ["A", "B", "C"]
+
+    assert client.post("/drawing", data={"action": "next"}).status_code == 302
+    with app.app_context():
+        matches = Match.query.filter(Match.event_pk == event_pk(game_id)).order_by(Match.game_no).all()
+        assert [(m.game_no, m.court_no) for m in matches] == [(1, "A"), (2, "B"), (3, "C")]
+        seated = db.session.query(MatchPlayer.player_pk).join(MatchSide).filter(
+            MatchSide.match_pk.in_([m.id for m in matches])
+        ).all()
+        assert len({pk for pk, in seated}) == 12  # nobody is on two courts
+
+
+def test_results_are_entered_court_by_court_before_the_next_round(client):
+    start_event(client, PLAYERS, courts=3)
+    client.get("/drawing")
+    client.post("/drawing", data={"action": "next"})
+
+    for court in "ABC":
+        page = client.get("/game-session").get_data(as_text=True)
+        assert f"(Court {court})" in page
+        client.post("/game-session", data={"action": "end", "scoreA": "21", "scoreB": "15"})
+        response = client.post("/game-session", data={"action": "next"})
+        assert response.status_code == 302
+    assert response.location.endswith("/drawing")
+
+    page = client.get("/drawing").get_data(as_text=True)
+    assert re.findall(r"Game #(\d+)", page) == ["4", "5", "6"]
+
+
+def test_scheduler_states_of_idle_events_are_evicted(monkeypatch):
+    import app as appmod
+
+    monkeypatch.setattr(appmod._scheduler_states, "max_events", 2)
+    for game_id in ("first", "second", "third"):
+        appmod.get_scheduler_state(game_id, PLAYERS, [])
+    assert appmod._scheduler_states.get("first") is None
+    assert appmod._scheduler_states.get("third") is not None
+    # An evicted event gets its state back from its games
+    assert appmod.get_scheduler_state("first", PLAYERS, []).matches(PLAYERS, [])
@@ -0,0 +1,116 @@
+import datetime
+import logging
+
+import pytest
+import sqlalchemy as sa
+
+from app import create_app
+from eventstore import (
+    MemoryBackend,
+    RedisBackend,
+    RedisError,
+    SQLBackend,
+    create_event_store,
+    decode_state,
+    encode_state,
+    new_event_state,
+)
+from models import db, now_jakarta
+
+
+def test_redis_backend_round_trips_event_state(fake_redis):
+    store = create_event_store(f"redis://:secret@127.0.0.1:{fake_redis.port}/2", ttl=60)
+    state = new_event_state()
+    state["players"] = ["Ana", "Budi", "Citra", "Dewi"]
+    state["active_game"] = {"game_no": 1, "teams": [["Ana", "Budi"], ["Citra", "Dewi"]]}
+
+    size = store.save("game-1", state)
+
+    assert fake_redis.data[b"matchmaker:event:game-1"] == encode_state(state)
+    assert size == len(encode_state(state))
+    assert fake_redis.expiry[b"matchmaker:event:game-1"] == 60
+    assert store.load("game-1") == state
+    assert fake_redis.commands[:2] == ["AUTH", "SELECT"]
+
+    store.delete("game-1")
+    assert store.load("game-1") == new_event_state()
+
+
+def test_redis_backend_reconnects_after_the_server_drops_it(fake_redis):
+    backend = RedisBackend(port=fake_redis.port, password="secret")
+    backend.set("game-1", b"{}")
+    fake_redis.drop_clients()
+
+    assert backend.get("game-1") == b"{}"
+    assert fake_redis.commands.count("AUTH") == 2
+
+
+def test_redis_backend_raises_server_errors(fake_redis):
+    backend = RedisBackend(port=fake_redis.port, password="wrong")
+    with pytest.raises(RedisError, match="WRONGPASS"):
+        backend.get("game-1")
+
+
+def test_redis_backend_drops_a_connection_whose_auth_failed(fake_redis):
+    backend = RedisBackend(port=fake_redis.port, db=2, password="rotated")
+    with pytest.raises(RedisError, match="WRONGPASS"):
+        backend.get("game-1")
+    assert backend._local.sock is None
+
+    backend.password = "secret"
+    assert backend.get("game-1") is None  # a fresh connection, authenticated and on db 2
+    assert fake_redis.commands == ["AUTH", "AUTH", "SELECT", "GET"]
+
+
+def test_sql_is_the_default_event_store():
+    assert isinstance(create_event_store(None, get_engine=lambda: None).backend, SQLBackend)
+
+
+def test_sql_event_state_expires_and_is_purged(app):
+    backend = app.extensions["event_store"].backend
+    table = backend.table
+    assert isinstance(backend, SQLBackend) and backend.ttl == app.config["EVENT_STORE_TTL"]
+
+    with app.app_context():
+        backend.set("old", b"{}")
+        backend.set("live", b"{}")
+        with db.engine.begin() as conn:
+            conn.execute(
+                sa.update(table).where(table.c.event_key == "old")
+                .values(expires_at=now_jakarta() - datetime.timedelta(seconds=1))
+            )
+        assert backend.get("old") is None
+        assert backend.get("live") == b"{}"
+
+        backend._purged_at -= datetime.timedelta(seconds=backend.purge_every)
+        backend.set("live", b"[]")  # an overdue purge runs with the next save
+        with db.engine.connect() as conn:
+            assert conn.execute(sa.select(table.c.event_key)).scalars().all() == ["live"]
+
+        with db.engine.begin() as conn:
+            conn.execute(sa.update(table).values(expires_at=now_jakarta()))
+    result = app.test_cli_runner().invoke(args=["purge-event-state"])
+    assert "Purged 1 expired event state row(s)" in result.output
+
+
+def test_memory_event_store_is_opt_in_and_warned_about(tmp_path, caplog):
+    with caplog.at_level(logging.WARNING):
+        app = create_app({
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'matchmaker.db'}",
+            "EVENT_STORE_URL": "memory://?size=8",
+            "JINJA_CACHE_DIR": "",
+            "BUNDLED_ASSETS": False,
+        })
+
+    backend = app.extensions["event_store"].backend
+    assert isinstance(backend, MemoryBackend) and backend.max_events == 8
+    assert "process memory" in caplog.text
+
+
+def test_state_encoding_keeps_queued_courts():
+    state = new_event_state()
+    state["players"] = ["Ana", "Budi", "Citra", "Dewi"]
+    state["queued_games"] = [{"game_no": 2, "court_no": 2, "teams": [["Ana", "Citra"], ["Budi", "Dewi"]]}]
+
+    assert decode_state(encode_state(state)) == state
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+import export
+from conftest import start_event
+from export import parse_when, stream_export
+from models import GameInfo, Match, db
+
+PLAYERS = ["Ana", "Budi", "Citra", "Dewi"]
+
+
+def play_event(client, host, games):
+    game_id = start_event(client, PLAYERS, host=host)
+    for _ in range(games):
+        client.get("/drawing")
+        client.post("/drawing", data={"action": "next"})
+        client.post("/game-session", data={"action": "end", "scoreA": "21", "scoreB": "15"})
+        client.post("/game-session", data={"action": "next"})
+    return game_id
+
+
+@pytest.fixture
+def events(app, client):
+    """A January event of two games and a February event of one, by different hosts."""
+    january = play_event(client, "Host@Example.com", 2)
+    february = play_event(client, "other@example.com", 1)
+    with app.app_context():
+        for game_id, when in ((january, datetime(2026, 1, 10, 19)), (february, datetime(2026, 2, 10, 19))):
+            event = GameInfo.query.filter_by(game_id=game_id).one()
+            event.created_at = when
+            db.session.execute(sa.update(Match).where(Match.event_pk == event.id).values(start_at=when))
+        db.session.commit()
+    return january, february
+
+
+def read(app, dataset, fmt, **filters):
+    """The export's rows as dicts of strings, CSV and JSON Lines alike."""
+    with app.app_context():
+        data = b"".join(stream_export(dataset, fmt, chunk_size=3, **filters)).decode()
+    if fmt == "csv":
+        return list(csv.DictReader(io.StringIO(data)))
+    rows = [json.loads(line) for line in data.splitlines()]
+    return [{k: "" if v is None else str(v) for k, v in row.items()} for row in rows]
+
+
+@pytest.mark.parametrize("dataset, count", [("seats", 12), ("matches", 3), ("standings", 8)])
+def test_csv_and_jsonl_carry_the_same_rows(app, events, dataset, count):
+    rows = read(app, dataset, "csv")
+    assert len(rows) == count
+    assert read(app, dataset, "jsonl") == rows
+    assert {row["event_id"] for row in rows} == set(events)
+
+    if dataset == "matches":
+        assert {(row["score_a"], row["score_b"], row["winner"]) for row in rows} == {("21", "15", "A")}
+    elif dataset == "standings":
+        assert sorted(int(row["games"]) for row in rows) == [1] * 4 + [2] * 4
+
+
+def test_filters_narrow_the_export(app, events):
+    january, february = events
+
+    def event_ids(**filters):
+        return sorted({row["event_id"] for row in read(app, "matches", "jsonl", **filters)})
+
+    assert event_ids(host=" host@EXAMPLE.com") == [january]
+    assert event_ids(since=parse_when("2026-02-01")) == [february]
+    assert event_ids(until=parse_when("2026-01-10", end=True)) == [january]  # the whole day
+    assert event_ids(until=parse_when("2026-01-09", end=True)) == []
+    assert event_ids(game_id=february) == [february]
+    assert len(read(app, "seats", "csv", host="HOST@example.com", since=parse_when("2026-01-01"))) == 8
+
+
+def test_unknown_dataset_or_format_fails_before_reading(app, monkeypatch):
+    read_rows = []
+    monkeypatch.setattr(export, "row_chunks", lambda *args, **kwargs: read_rows.append(args))
+
+    with app.app_context():
+        with pytest.raises(ValueError, match="Unknown dataset"):
+            stream_export("courts", "csv")
+        with pytest.raises(ValueError, match="Unknown format"):
+            stream_export("seats", "xlsx")
+    assert read_rows == []
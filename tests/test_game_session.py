@@ -0,0 +1,109 @@
+import sqlalchemy as sa
+
+from conftest import start_event
+from matches import finish_match
+from models import Match, MatchPlayer, MatchSide, Player, RatingSnapshot, Standing, db
+
+PLAYERS = ["Ana", "Budi", "Citra", "Dewi"]
+
+
+def start_game(client):
+    start_event(client, PLAYERS)
+    client.get("/drawing")
+    client.post("/drawing", data={"action": "next"})
+
+
+def test_undo_button_takes_back_the_last_point(client):
+    start_game(client)
+    page = client.get("/game-session").get_data(as_text=True)
+    assert 'onclick="undoScore()"' in page
+
+    score_url = page.split("const scoreUrl = ")[1].split(";")[0].strip('"')
+    client.post(score_url, json={"action": "increment", "side": "A"})
+    client.post(score_url, json={"action": "increment", "side": "B"})
+    score = client.post(score_url, json={"action": "undo"}).get_json()
+    assert (score["scoreA"], score["scoreB"]) == (1, 0)
+
+
+def test_wrap_up_drops_the_retained_live_frames(client):
+    import app as appmod
+
+    start_game(client)
+    client.post("/game-session", data={"action": "end", "scoreA": "21", "scoreB": "15"})
+    with client.session_transaction() as sess:
+        game_id = sess["current_game_id"]
+    assert appmod.live_feed._latest.get(game_id)
+    viewer = appmod.live_feed.subscribe(game_id)
+
+    client.post("/wrap-up")
+
+    assert game_id not in appmod.live_feed._latest
+    assert appmod._scheduler_states.get(game_id) is None
+    frames = []
+    while (frame := viewer.get(timeout=0)) is not None:
+        frames.append(frame)
+    assert b"event: wrap-up" in frames[-1]
+    appmod.live_feed.unsubscribe(viewer)
+
+
+def end_game(app, client):
+    """Start a game and score it 21-15; returns (game_id, the event state before it is finalized)."""
+    start_game(client)
+    client.post("/game-session", data={"action": "end", "scoreA": "21", "scoreB": "15"})
+    with client.session_transaction() as sess:
+        game_id = sess["current_game_id"]
+    with app.app_context():
+        return game_id, app.extensions["event_store"].load(game_id)
+
+
+def test_a_game_is_written_as_one_match_with_its_sides_and_seats(app, client):
+    game_id, event = end_game(app, client)
+    teams = event["active_game"]["teams"]
+    assert client.post("/game-session", data={"action": "next"}).status_code == 302
+
+    with app.app_context():
+        match = db.session.scalars(sa.select(Match)).one()
+        assert match.end_at is not None
+        assert [(side.side, side.score, side.result) for side in match.sides] == [("A", 21, "W"), ("B", 15, "L")]
+        names = dict(db.session.execute(sa.select(Player.id, Player.player_name)).all())
+        seated = db.session.execute(
+            sa.select(MatchSide.side, MatchPlayer.player_pk, MatchPlayer.player_match_number)
+            .join(MatchPlayer, MatchPlayer.side_pk == MatchSide.id)
+            .order_by(MatchPlayer.id)
+        ).all()
+        assert [[names[pk] for side, pk, _ in seated if side == s] for s in "AB"] == teams
+        assert {number for _, _, number in seated} == {1}
+
+        standings = {row.player_name: (row.games, row.wins, row.points) for row in Standing.query}
+        for name in teams[0]:
+            assert standings[name] == (1, 1, 21)
+        for name in teams[1]:
+            assert standings[name] == (1, 0, 15)
+
+        # A second finish of the same match changes nothing
+        result = {"winner": "B", "scoreA": 0, "scoreB": 21}
+        assert not finish_match(game_id, {"match_id": match.match_id}, result, match.end_at, match.end_at, 60)
+        db.session.rollback()
+        assert [side.score for side in db.session.get(Match, match.id).sides] == [21, 15]
+        assert {row.player_name: (row.games, row.wins, row.points) for row in Standing.query} == standings
+
+
+def test_finalizing_an_already_saved_result_again_is_a_conflict(app, client):
+    def recorded():
+        with app.app_context():
+            return (
+                sorted((row.player_name, row.games, row.points) for row in Standing.query),
+                db.session.scalar(sa.select(sa.func.count(RatingSnapshot.id))),
+            )
+
+    game_id, stale = end_game(app, client)  # the state a second tab still holds
+    assert client.post("/game-session", data={"action": "next"}).status_code == 302
+    before = recorded()
+
+    with app.app_context():
+        app.extensions["event_store"].save(game_id, stale)
+    response = client.post("/game-session", data={"action": "next"})
+
+    assert response.status_code == 409
+    assert "already saved" in response.get_data(as_text=True)
+    assert recorded() == before
@@ -0,0 +1,92 @@
+import io
+
+import sqlalchemy as sa
+
+from conftest import start_event
+from importer import MatchImporter
+from models import Match, MatchPlayer, MatchSide, Person, Player, RatingSnapshot, db, event_pk
+from ratings import rebuild_ratings
+
+PLAYERS = ["Ana", "Budi", "Citra", "Dewi", "Eko", "Fajar"]
+
+
+def test_roster_import_replaces_the_roster_before_the_first_draw(app, client):
+    game_id = start_event(client, PLAYERS)
+
+    response = client.post("/players/import", data={
+        "roster": (io.BytesIO(b"name\nGita\nHadi\nIndra\nJoko\n"), "roster.csv"),
+    })
+
+    assert response.status_code == 302
+    with app.app_context():
+        names = [p.player_name for p in Player.query.filter(Player.event_pk == event_pk(game_id))]
+        assert sorted(names) == ["Gita", "Hadi", "Indra", "Joko"]
+
+
+def test_roster_cannot_be_replaced_once_a_match_is_drawn(app, client):
+    game_id = start_event(client, PLAYERS)
+    client.get("/drawing")
+    client.post("/drawing", data={"action": "next"})
+
+    upload = client.post("/players/import", data={
+        "roster": (io.BytesIO(b"name\nGita\nHadi\nIndra\nJoko\n"), "roster.csv"),
+    })
+    form = client.post("/players", data={"player_0": "Gita", "player_1": "Hadi"})
+    command = app.test_cli_runner().invoke(args=[
+        "import", "roster", "-", "--format", "csv", "--game-id", game_id,
+    ], input="name\nGita\nHadi\n")
+
+    assert upload.status_code == form.status_code == 409
+    assert "already has drawn matches" in upload.get_data(as_text=True)
+    assert command.exit_code != 0 and "already has drawn matches" in command.output
+    with app.app_context():
+        names = [p.player_name for p in Player.query.filter(Player.event_pk == event_pk(game_id))]
+        assert sorted(names) == sorted(PLAYERS)
+        seats = db.session.query(MatchPlayer).join(MatchSide).join(Match).filter(
+            Match.event_pk == event_pk(game_id)
+        ).count()
+        assert seats == 4
+
+
+def test_an_import_rates_its_matches_and_leaves_earlier_ratings_alone(app):
+    def record(event, start_at, team_a, team_b, score_a=21, score_b=15):
+        return {"event": event, "host": "host@example.com", "start_at": start_at, "duration_seconds": 600,
+                "team_a": team_a, "team_b": team_b, "score_a": score_a, "score_b": score_b}
+
+    def snapshots():
+        return db.session.execute(sa.select(
+            RatingSnapshot.id, RatingSnapshot.person_pk, RatingSnapshot.match_pk,
+            RatingSnapshot.rated_at, RatingSnapshot.rating, RatingSnapshot.rating_deviation,
+        ).order_by(RatingSnapshot.id)).all()
+
+    def ratings():
+        return {p.id: (p.rating, p.rating_deviation, p.rated_matches, p.rated_at) for p in Person.query}
+
+    with app.app_context():
+        MatchImporter().run(enumerate([
+            record("club", "2026-01-10T09:00", ["Ana", "Budi"], ["Citra", "Dewi"]),
+            record("club", "2026-01-10T09:15", ["Ana", "Citra"], ["Budi", "Dewi"], 15, 21),
+            record("club", "2026-01-10T09:30", ["Eko", "Fajar"], ["Ana", "Dewi"]),
+        ], start=1))
+        db.session.commit()
+        earlier_snapshots, earlier_ratings = snapshots(), ratings()
+
+        MatchImporter().run(enumerate([
+            record("league", "2026-02-07T10:00", ["Ana", "Budi"], ["Gita", "Hadi"], 18, 21),
+        ], start=1))
+        db.session.commit()
+
+        later = snapshots()
+        assert later[:len(earlier_snapshots)] == earlier_snapshots
+        assert len(later) == len(earlier_snapshots) + 4
+        untouched = {pk for pk, in db.session.query(Player.person_pk).filter(
+            Player.player_name.in_(["Citra", "Dewi", "Eko", "Fajar"]))}
+        assert {pk: ratings()[pk] for pk in untouched} == {pk: earlier_ratings[pk] for pk in untouched}
+        ana = Player.query.filter_by(player_name="Ana").first().person_pk
+        assert ratings()[ana][2] == earlier_ratings[ana][2] + 1
+        assert ratings()[ana][0] < earlier_ratings[ana][0]  # a loss, from her January rating on
+
+        # The same as replaying the whole history
+        imported = ratings(), [row[1:] for row in later]
+        rebuild_ratings()
+        assert (ratings(), [row[1:] for row in snapshots()]) == imported
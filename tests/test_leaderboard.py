@@ -0,0 +1,197 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+
+from conftest import start_event
+from logic.schedule import build_schedule
+from logic.state import SchedulerState
+from player_stats import load_player_stats
+from models import GameInfo, Match, MatchPlayer, MatchSide, Player, Standing, db
+from standings import rebuild_standings
+
+PLAYERS = ["Ana", "Budi", "Citra", "Dewi"]
+EIGHT = PLAYERS + ["Eka", "Fajar", "Gita", "Hadi"]
+
+
+def test_leaderboard_cache_keeps_only_whether_the_referrer_is_ours(client):
+    start_event(client, PLAYERS)
+    client.get("/drawing")
+    client.post("/drawing", data={"action": "next"})
+    client.post("/game-session", data={"action": "end", "scoreA": "21", "scoreB": "15"})
+
+    def get(referrer):
+        return client.get("/leaderboard", headers={"Referer": referrer})
+
+    first = get("https://mail.example.org/inbox/12345?token=secret")
+    second = get("https://other.example.net/feed")
+    own = get("http://localhost/game-session")
+
+    assert first.status_code == own.status_code == 200
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert own.headers["ETag"] != first.headers["ETag"]
+    assert b"secret" not in first.get_data()
+    assert b"history.back()" in own.get_data()
+    assert b"history.back()" not in first.get_data()
+
+
+def test_routes_take_public_ids_not_integer_keys(app, client):
+    game_id = start_event(client, PLAYERS)
+    client.get("/drawing")
+    client.post("/drawing", data={"action": "next"})
+    with app.app_context():
+        match = Match.query.one()
+        player = Player.query.filter_by(player_name="Ana").one()
+        keys = {"event": GameInfo.query.filter_by(game_id=game_id).one().id, "match": match.id, "player": player.id}
+        public = {"event": game_id, "match": match.match_id, "player": player.player_id}
+
+    assert client.get(f"/api/matches/{public['match']}/score").status_code == 200
+    assert client.get(f"/api/matches/{keys['match']}/score").status_code == 404
+
+    stream = client.get(f"/live/{public['event']}", buffered=False)
+    assert stream.status_code == 200
+    stream.close()
+    assert client.get(f"/live/{keys['event']}").status_code == 404
+
+    client.post("/game-session", data={"action": "end", "scoreA": "21", "scoreB": "15"})
+    client.post("/wrap-up")
+    assert client.get(f"/player-stats/{public['player']}").status_code == 200
+    assert client.get(f"/player-stats/{keys['player']}").status_code == 404
+
+
+def test_seconds_played_add_up_over_finished_matches(app, client):
+    game_id = start_event(client, PLAYERS)
+    store = app.extensions["event_store"]
+    for minutes in (10, 5):
+        client.get("/drawing")
+        client.post("/drawing", data={"action": "next"})
+        with app.app_context():  # the game started ``minutes`` ago
+            event = store.load(game_id)
+            started = datetime.fromisoformat(event["active_game"]["start_time"]) - timedelta(minutes=minutes)
+            event["active_game"]["start_time"] = event["active_game"]["resume_time"] = started.isoformat()
+            store.save(game_id, event)
+        client.post("/game-session", data={"action": "end", "scoreA": "21", "scoreB": "15"})
+        client.post("/game-session", data={"action": "next"})
+
+    with app.app_context():
+        durations = sorted(match.duration_seconds for match in Match.query)
+        assert 600 <= durations[1] <= 602 and 300 <= durations[0] <= 302
+        event = GameInfo.query.filter_by(game_id=game_id).one()
+        assert (event.matches_finished, event.court_seconds) == (2, sum(durations))
+        assert {row.player_name: row.seconds_played for row in Standing.query} == dict.fromkeys(PLAYERS, sum(durations))
+
+
+def play_game(client, score_a, score_b):
+    """Enter the next game's result, drawing a new round first when none is waiting."""
+    if client.get("/game-session").status_code == 302:
+        client.get("/drawing")
+        client.post("/drawing", data={"action": "next"})
+    client.post("/game-session", data={"action": "end", "scoreA": str(score_a), "scoreB": str(score_b)})
+    assert client.post("/game-session", data={"action": "next"}).status_code == 302
+
+
+def test_standings_kept_game_by_game_match_a_rebuild(app, client):
+    game_id = start_event(client, EIGHT, courts=2, game_format="Americano")
+
+    def totals():
+        event = GameInfo.query.filter_by(game_id=game_id).one()
+        return (event.matches_finished, event.court_seconds), sorted(
+            (row.player_name, row.games, row.wins, row.losses, row.ties, row.points, row.point_diff,
+             row.matches_drawn, row.seconds_played)
+            for row in Standing.query
+        )
+
+    for game in range(8):
+        play_game(client, *((21, 10 + game) if game % 3 else (17, 21)))
+        with app.app_context():
+            kept = totals()
+            rebuild_standings(game_id)
+            db.session.flush()
+            assert totals() == kept, f"after game {game + 1}"
+            db.session.rollback()
+
+    # The rounds were served from the cached schedule table, which is the table a fresh build gives
+    with app.app_context():
+        players = app.extensions["event_store"].load(game_id)["players"]
+        seats = db.session.execute(
+            sa.select(Match.game_no, MatchSide.side, Player.player_name)
+            .join(MatchSide, MatchSide.match_pk == Match.id)
+            .join(MatchPlayer, MatchPlayer.side_pk == MatchSide.id)
+            .join(Player, Player.id == MatchPlayer.player_pk)
+            .order_by(Match.game_no, MatchSide.side, MatchPlayer.id)
+        ).all()
+    drawn = {}
+    for game_no, side, name in seats:
+        drawn.setdefault(game_no, ([], []))["AB".index(side)].append(name)
+    fresh = [
+        tuple([players[i] for i in team] for team in match)
+        for games in build_schedule(len(EIGHT), 2, "americano") for match in games
+    ]
+    assert [drawn[no] for no in sorted(drawn)] == fresh[:8]
+
+
+def tallies(state):
+    return {
+        "round_no": state.round_no,
+        "games_recorded": state.games_recorded,
+        "last_round": state.last_round,
+        "last_players": state.last_players(),
+        "consecutive": state.consecutive,
+        "played": dict(state.played),
+        "last_rest": state.last_rest,
+        "partners": dict(state.partners),
+        "opponents": dict(state.opponents),
+    }
+
+
+def stats_from_games(players, games, codes):
+    """Each player's totals, rank and matches, straight from the event's finished games."""
+    totals = {name: {"games": 0, "wins": 0, "losses": 0, "ties": 0, "points": 0, "point_diff": 0} for name in players}
+    matches = {name: [] for name in players}
+    for game in sorted(games, key=lambda g: g["game_no"]):
+        if game.get("status") != "completed":
+            continue
+        scores = {"A": game["scoreA"], "B": game["scoreB"]}
+        for side, team in zip("AB", game["teams"]):
+            other = "B" if side == "A" else "A"
+            for name in team:
+                row = totals[name]
+                row["games"] += 1
+                row[{"T": "ties", side: "wins"}.get(game["winner"], "losses")] += 1
+                row["points"] += scores[side]
+                row["point_diff"] += scores[side] - scores[other]
+                matches[name].append((game["game_no"], game["teams"], scores["A"], scores["B"], game["winner"]))
+    order = sorted(players, key=lambda n: (-totals[n]["points"], -totals[n]["point_diff"], -totals[n]["wins"], codes[n]))
+    for rank, name in enumerate(order, start=1):
+        totals[name]["rank"] = rank
+    return totals, matches
+
+
+def test_incremental_draw_state_and_player_stats_match_a_fresh_count(app, client):
+    import app as appmod
+
+    players = PLAYERS + ["Eka", "Fajar", "Gita", "Hadi", "Indra"]
+    game_id = start_event(client, players, courts=2)
+    with app.app_context():
+        codes = {p.player_name: p.player_code for p in Player.query}
+        ids = {p.player_name: p.player_id for p in Player.query}
+
+    for game in range(8):
+        play_game(client, *((21, 12 + game) if game % 3 else (15, 21)))
+        with app.app_context():
+            event = app.extensions["event_store"].load(game_id)
+            kept = appmod._scheduler_states.get(game_id)
+            assert kept is not None and kept.matches(event["players"], event["games"])
+            assert tallies(kept) == tallies(SchedulerState.from_games(event["players"], event["games"]))
+            seated = [team for g in event["games"] for team in g["teams"]]
+            assert dict(kept.played) == Counter(name for team in seated for name in team)
+            assert dict(kept.partners) == Counter(tuple(sorted(team)) for team in seated)
+
+            totals, matches = stats_from_games(event["players"], event["games"], codes)
+            for name in players:
+                loaded = load_player_stats(game_id, ids[name])
+                assert {key: loaded["standing"][key] for key in totals[name]} == totals[name], name
+                assert [
+                    (m["game_no"], [m["team_a"], m["team_b"]], m["score_a"], m["score_b"], m["winner"])
+                    for m in loaded["matches"]
+                ] == matches[name], name
@@ -0,0 +1,73 @@
+import logging
+
+import pytest
+
+from app import create_app, live_feed
+from livefeed import Publisher, create_bus
+
+
+@pytest.fixture
+def workers(fake_redis):
+    """Two workers' publishers sharing one Redis."""
+    url = f"redis://:secret@127.0.0.1:{fake_redis.port}/0"
+    first, second = Publisher(create_bus(url)), Publisher(create_bus(url))
+    yield first, second
+    first.use(None)
+    second.use(None)
+
+
+def test_frames_published_by_one_worker_reach_another_workers_streams(workers):
+    first, second = workers
+    viewer = second.subscribe("game-1")
+
+    assert first.publish("game-1", "score", {"scoreA": 3, "scoreB": 1}) == 0
+    frame = viewer.get(timeout=2)
+    assert b"event: score" in frame and b'"scoreA":3' in frame
+    assert second.subscribe("game-2").get(timeout=0.2) is None  # other events stay quiet
+
+
+def test_a_new_stream_on_any_worker_starts_from_the_latest_frames(workers):
+    first, second = workers
+    first.publish("game-1", "score", {"scoreA": 1, "scoreB": 0})
+    first.publish("game-1", "score", {"scoreA": 2, "scoreB": 0})
+    first.publish("game-1", "leaderboard", {"rows": []})
+
+    viewer = second.subscribe("game-1")
+    frames = [viewer.get(timeout=1), viewer.get(timeout=1)]
+    assert b'"scoreA":2' in frames[0] and b"event: leaderboard" in frames[1]
+
+    first.forget("game-1")
+    assert second.subscribe("game-1").get(timeout=0.2) is None
+
+
+def test_the_bus_falls_back_to_this_worker_when_redis_is_gone(fake_redis):
+    publisher = Publisher(create_bus(f"redis://:secret@127.0.0.1:{fake_redis.port}/0"))
+    publisher._relaying = publisher.bus  # no relay thread: only the fallback can deliver
+    viewer = publisher.subscribe("game-1")
+    fake_redis.shutdown()
+    fake_redis.server_close()
+    fake_redis.drop_clients()
+
+    assert publisher.publish("game-1", "score", {"scoreA": 1, "scoreB": 0}) == 1
+    assert b'"scoreA":1' in viewer.get(timeout=1)
+
+
+def test_in_process_feed_is_warned_about_outside_the_cli(tmp_path, fake_redis, caplog):
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'matchmaker.db'}",
+        "JINJA_CACHE_DIR": "",
+        "BUNDLED_ASSETS": False,
+    }
+    with caplog.at_level(logging.WARNING):
+        create_app({**config, "LIVE_FEED_URL": "local"})
+    assert "with more than one worker" in caplog.text
+    assert live_feed.bus is None
+
+    caplog.clear()
+    try:
+        with caplog.at_level(logging.WARNING):
+            create_app({**config, "EVENT_STORE_URL": f"redis://:secret@127.0.0.1:{fake_redis.port}/0"})
+        assert "with more than one worker" not in caplog.text
+        assert live_feed.bus is not None  # the event store's Redis carries the feed too
+    finally:
+        live_feed.use(None)
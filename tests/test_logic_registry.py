@@ -0,0 +1,59 @@
+import logging
+from importlib.metadata import EntryPoint
+
+import pytest
+
+import logic.loader
+from logic.engine import Engine
+from logic.loader import ENTRY_POINT_GROUP, LogicRegistry
+
+NOT_A_FACTORY = 42
+
+
+def king_of_the_court(game_type, game_format, courts_count):
+    """A plugin's strategy factory, as a third-party package would ship it."""
+    return Engine(game_type, courts_count)
+
+
+@pytest.fixture
+def plugins(monkeypatch):
+    """Entry points of one working plugin and two broken ones."""
+    installed = [
+        EntryPoint("king of the court", f"{__name__}:king_of_the_court", ENTRY_POINT_GROUP),
+        EntryPoint("missing", "matchmaker_no_such_plugin:factory", ENTRY_POINT_GROUP),
+        EntryPoint("not callable", f"{__name__}:NOT_A_FACTORY", ENTRY_POINT_GROUP),
+    ]
+    groups = []
+
+    def entry_points(group):
+        groups.append(group)
+        return installed if group == ENTRY_POINT_GROUP else []
+
+    monkeypatch.setattr(logic.loader, "entry_points", entry_points)
+    return groups
+
+
+def test_entry_point_formats_are_registered_and_drawn(plugins):
+    registry = LogicRegistry()
+    registry.discover()
+    assert plugins == [ENTRY_POINT_GROUP]
+
+    strategy = registry.get("Doubles", "King of the Court", 8, 2)
+    assert isinstance(strategy, Engine) and strategy.courts_count == 2
+    games = strategy.next_round([f"Player {i}" for i in range(8)], [])
+    assert len(games) == 2
+    assert registry.get("doubles", "king of the court", 8, 2) is strategy  # cached, not rebuilt
+
+
+def test_broken_plugins_are_skipped_with_a_warning(plugins, caplog):
+    registry = LogicRegistry()
+    with caplog.at_level(logging.WARNING, logger="logic.loader"):
+        registry.discover()
+
+    assert "Skipping logic entry point missing" in caplog.text
+    assert "Skipping logic entry point not callable" in caplog.text
+    assert registry.get("doubles", "missing", 8, 2) is None
+    assert registry.get("doubles", "not callable", 8, 2) is None
+    # The rest of discovery went ahead
+    assert registry.get("doubles", "king of the court", 8, 2) is not None
+    assert registry.get("doubles", "mexicano", 6, 1).__name__ == "logic.doubles.mexicano.6p1c"
@@ -0,0 +1,39 @@
+from conftest import start_event
+
+PLAYERS = ["Ana", "Budi", "Citra", "Dewi"]
+
+
+def scrape(client):
+    """{'name{labels}': value} of every sample /metrics serves."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.get_data(as_text=True).splitlines():
+        if line and not line.startswith("#"):
+            key, _, value = line.rpartition(" ")
+            samples[key] = float(value)
+    return samples
+
+
+def test_a_request_and_a_draw_show_up_in_the_scrape(client):
+    # The registry lives as long as the worker: compare before and after
+    before = scrape(client)
+    start_event(client, PLAYERS)
+    client.get("/drawing")
+    assert client.post("/drawing", data={"action": "next"}).status_code == 302
+    after = scrape(client)
+
+    def grew(key, by=None):
+        delta = after.get(key, 0) - before.get(key, 0)
+        return delta == by if by is not None else delta > 0
+
+    labels = '{route="drawing",action="drawing:next"'
+    assert grew('matchmaker_requests_total' + labels + ',status="302"}', by=1)
+    assert grew("matchmaker_request_duration_seconds_count" + labels + "}", by=1)
+    assert grew("matchmaker_request_sql_queries_count" + labels + "}", by=1)
+    assert grew("matchmaker_request_sql_queries_sum" + labels + "}")
+    assert grew("matchmaker_request_sql_seconds_count" + labels + "}", by=1)
+    assert grew("matchmaker_sql_queries_total")
+    assert grew('matchmaker_next_game_seconds_count{pairing="random"}')
+    assert grew('matchmaker_next_game_seconds_bucket{pairing="random",le="+Inf"}')
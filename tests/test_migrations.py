@@ -0,0 +1,143 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+
+from conftest import ROOT
+
+PLAYERS = ["Ana", "Budi", "Citra", "Dewi", "Eka", "Fajar"]
+START = datetime(2026, 3, 1, 19, 0)
+
+
+def flask_db(url, *args):
+    """Run ``flask db ...`` against ``url`` in its own process, as a deploy would."""
+    env = {**os.environ, "MATCHMAKER_DATABASE_URL": url, "FLASK_APP": "wsgi.py"}
+    subprocess.run(
+        [sys.executable, "-m", "flask", "db", *args],
+        cwd=ROOT, env=env, check=True, capture_output=True,
+    )
+
+
+def baseline_match(no):
+    """The teams and result of seeded game ``no`` (1-10)."""
+    seats = [PLAYERS[(no + i) % len(PLAYERS)] for i in range(4)]
+    return {
+        "match_id": f"m{no:02}",
+        "teams": {"A": seats[:2], "B": seats[2:]},
+        "scores": {"A": 21, "B": 10 + no},
+        "winner": "A",
+        "start": START + timedelta(minutes=15 * (no - 1)),
+        "duration": f"0:{10 + no}:05",
+    }
+
+
+def seed_baseline(engine):
+    """One event, its roster and ten finished doubles games, as the 0001 app wrote them."""
+    with engine.begin() as conn:
+        conn.execute(sa.text(
+            "INSERT INTO gameinfo (game_id, game_name, game_place, host_email, created_at) "
+            "VALUES ('g1', 'Club night', 'Hall', 'host@example.com', :at)"
+        ), {"at": START})
+        conn.execute(sa.text(
+            "INSERT INTO players (player_code, player_id, player_name, game_id) VALUES (:code, :pid, :name, 'g1')"
+        ), [{"code": f"P-{i:02}", "pid": f"p{i:02}", "name": name} for i, name in enumerate(PLAYERS, start=1)])
+        player_ids = {name: f"p{i:02}" for i, name in enumerate(PLAYERS, start=1)}
+        drawn = dict.fromkeys(PLAYERS, 0)
+        for no in range(1, 11):
+            match = baseline_match(no)
+            end = match["start"] + timedelta(minutes=10 + no, seconds=5)
+            for side, team in match["teams"].items():
+                for name in team:
+                    drawn[name] += 1
+                    conn.execute(sa.text(
+                        "INSERT INTO drawing (game_id, game_no, court_no, team_side, player_code, player_id, "
+                        "player_match_number, match_id, match_start_at) "
+                        "VALUES ('g1', :no, 'A', :side, :code, :pid, :number, :mid, :start)"
+                    ), {
+                        "no": no, "side": side, "code": f"P-{PLAYERS.index(name) + 1:02}", "pid": player_ids[name],
+                        "number": drawn[name], "mid": match["match_id"], "start": match["start"],
+                    })
+                    conn.execute(sa.text(
+                        "INSERT INTO match_details (match_id, player_id, team_side, team_side_score, winner_flag, "
+                        "match_start_at, match_end_at, match_duration) "
+                        "VALUES (:mid, :pid, :side, :score, :flag, :start, :end, :duration)"
+                    ), {
+                        "mid": match["match_id"], "pid": player_ids[name], "side": side,
+                        "score": match["scores"][side], "flag": "W" if side == match["winner"] else "L",
+                        "start": match["start"], "end": end, "duration": match["duration"],
+                    })
+
+
+def test_upgrading_a_baseline_database_keeps_every_match(tmp_path):
+    url = f"sqlite:///{tmp_path / 'matchmaker.db'}"
+    engine = sa.create_engine(url)
+    flask_db(url, "upgrade", "0001")
+    seed_baseline(engine)
+
+    flask_db(url, "upgrade")
+
+    with engine.connect() as conn:
+        counts = [conn.scalar(sa.text(f"SELECT COUNT(*) FROM {table}"))
+                  for table in ("matches", "match_sides", "match_players")]
+        assert counts == [10, 20, 40]
+
+        expected = baseline_match(7)
+        match = conn.execute(sa.text(
+            "SELECT id, game_no, court_no, end_at IS NOT NULL AS finished, duration_seconds "
+            "FROM matches WHERE match_id = 'm07'"
+        )).one()
+        assert (match.game_no, match.court_no, match.finished, match.duration_seconds) == (7, "A", 1, 17 * 60 + 5)
+
+        sides = conn.execute(sa.text(
+            "SELECT side, score, result FROM match_sides WHERE match_pk = :pk ORDER BY side"
+        ), {"pk": match.id}).all()
+        assert [tuple(side) for side in sides] == [("A", 21, "W"), ("B", 17, "L")]
+
+        seats = conn.execute(sa.text(
+            "SELECT s.side, p.player_name FROM match_players mp "
+            "JOIN match_sides s ON s.id = mp.side_pk JOIN players p ON p.id = mp.player_pk "
+            "WHERE s.match_pk = :pk ORDER BY mp.id"
+        ), {"pk": match.id}).all()
+        teams = {"A": [], "B": []}
+        for side, name in seats:
+            teams[side].append(name)
+        assert teams == expected["teams"]
+    engine.dispose()
+
+
+def test_duration_strings_become_seconds_and_time_on_court_totals(tmp_path):
+    url = f"sqlite:///{tmp_path / 'matchmaker.db'}"
+    engine = sa.create_engine(url)
+    flask_db(url, "upgrade", "0001")
+    seed_baseline(engine)
+    odd = {"m09": ("n/a", None), "m10": ("1 day, 0:00:05", 86405)}  # unparseable, and over a day
+    with engine.begin() as conn:
+        for match_id, (duration, _) in odd.items():
+            conn.execute(sa.text("UPDATE match_details SET match_duration = :d WHERE match_id = :m"),
+                         {"d": duration, "m": match_id})
+    flask_db(url, "upgrade", "0002")
+    with engine.begin() as conn:  # the standings table starts out filled for the roster
+        conn.execute(sa.text(
+            "INSERT INTO standings (game_id, player_id, player_code, player_name, games, wins, losses, ties, "
+            "points, point_diff) SELECT game_id, player_id, player_code, player_name, 0, 0, 0, 0, 0, 0 FROM players"
+        ))
+
+    flask_db(url, "upgrade")
+
+    seconds, played = {}, dict.fromkeys(PLAYERS, 0)
+    for no in range(1, 11):
+        match = baseline_match(no)
+        duration = odd[match["match_id"]][1] if match["match_id"] in odd else (10 + no) * 60 + 5
+        seconds[match["match_id"]] = duration
+        for name in match["teams"]["A"] + match["teams"]["B"]:
+            played[name] += duration or 0
+
+    with engine.connect() as conn:
+        assert dict(conn.execute(sa.text("SELECT match_id, duration_seconds FROM matches")).all()) == seconds
+        assert dict(conn.execute(sa.text("SELECT player_name, seconds_played FROM standings")).all()) == played
+        totals = conn.execute(sa.text("SELECT matches_finished, court_seconds FROM gameinfo")).one()
+        # A match without a readable duration still finished; it adds no court time
+        assert tuple(totals) == (10, sum(played.values()) // 4)
+    engine.dispose()
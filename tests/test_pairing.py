@@ -0,0 +1,77 @@
+import itertools
+import random
+import statistics
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from logic.engine import Engine  # noqa: E402
+from logic.pairing import BalancedPairer  # noqa: E402
+from logic.state import SchedulerState  # noqa: E402
+
+PLAYERS = [f"Player {i:02}" for i in range(14)]
+
+
+def spread(ratings, court):
+    """Gap between the two teams' mean ratings."""
+    team_a, team_b = court
+    return abs(statistics.mean(ratings[p] for p in team_a) - statistics.mean(ratings[p] for p in team_b))
+
+
+def test_balanced_rounds_seat_every_court_once_each():
+    seed = 3
+    rng = random.Random(seed)
+    ratings = {name: rng.uniform(1200, 1800) for name in PLAYERS}
+    engine = Engine("doubles", courts_count=3)
+    state = SchedulerState(PLAYERS)
+    pairer = BalancedPairer(ratings, state.partners, state.opponents, seed=seed)
+
+    for _ in range(12):
+        games = engine.next_round(PLAYERS, [], state=state, pairer=pairer)
+        assert len(games) == 3
+        seated = [p for game in games for team in game["teams"] for p in team]
+        assert len(seated) == len(set(seated)) == 12
+        assert all(len(team) == 2 for game in games for team in game["teams"])
+        for game in games:
+            game["winner"] = rng.choice("AB")
+            state.record(game)
+    # The pairer only picks among players the rules left tied: games stay even
+    assert max(state.played.values()) - min(state.played[p] for p in PLAYERS) <= 1
+
+
+def test_balanced_teams_are_no_further_apart_than_a_shuffle():
+    balanced, shuffled = [], []
+    for seed in range(20):
+        rng = random.Random(seed)
+        players = rng.sample(PLAYERS, 8)
+        ratings = {name: rng.uniform(1200, 1800) for name in players}
+
+        courts = BalancedPairer(ratings, seed=seed).assign([[], []], players, [], 2)
+        balanced.append(sum(spread(ratings, court) for court in courts))
+
+        order = players[:]
+        rng.shuffle(order)  # the default draw: a shuffled fill
+        shuffled.append(sum(spread(ratings, (order[i:i + 2], order[i + 2:i + 4])) for i in (0, 4)))
+
+    assert all(b <= s + 1e-9 for b, s in zip(balanced, shuffled))
+    assert statistics.mean(balanced) < statistics.mean(shuffled) / 4
+
+
+def test_a_large_pool_is_seated_within_the_budget():
+    rng = random.Random(5)
+    players = [f"Player {i:02}" for i in range(40)]
+    ratings = {name: rng.uniform(1200, 1800) for name in players}
+    # Every pair has history, so no seating is free and the search runs to its deadline
+    partners = {pair: rng.randint(1, 3) for pair in itertools.combinations(players, 2)}
+    pairer = BalancedPairer(ratings, partners, partners, budget_ms=20, seed=5)
+
+    started = time.perf_counter()
+    courts = pairer.assign([[]] * 5, [], players, 2)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert not pairer.last_search["exhaustive"]
+    assert elapsed_ms < 20 + 30  # the budget, plus one improvement step and setup
+    seated = [p for court in courts for team in court for p in team]
+    assert len(seated) == len(set(seated)) == 20
@@ -0,0 +1,24 @@
+import pytest
+
+import querycheck
+from conftest import start_event
+from models import db
+
+
+def scans(report):
+    return {name: scanned for name, (_, scanned) in report.items() if scanned}
+
+
+@pytest.mark.parametrize("analyze", [False, True])
+def test_route_queries_use_indexes_on_a_seeded_database(analyze):
+    assert scans(querycheck.run(events=20, analyze=analyze)) == {}
+
+
+def test_route_queries_use_indexes_on_an_event_played_through_the_app(app, client):
+    start_event(client, [f"Player {i:02}" for i in range(8)], courts=2)
+    client.get("/drawing")
+    client.post("/drawing", data={"action": "next"})
+    client.post("/game-session", data={"action": "end", "scoreA": "21", "scoreB": "15"})
+
+    with app.app_context():
+        assert scans(querycheck.check(db.engine)) == {}
@@ -0,0 +1,42 @@
+from conftest import start_event
+from importer import MatchImporter
+from models import GameInfo, Player, db, event_pk
+
+
+def people_of(game_id):
+    return {
+        player.player_name: player.person_pk
+        for player in Player.query.filter(Player.event_pk == event_pk(game_id))
+    }
+
+
+def test_same_name_at_two_hosts_is_two_people(app):
+    hosts = ["first@example.com", "second@example.com", " First@Example.com"]
+    game_ids = [
+        start_event(app.test_client(), ["Ana", "Budi", "Citra", "Dewi"], host=host)
+        for host in hosts
+    ]
+
+    with app.app_context():
+        first, second, first_again = (people_of(game_id) for game_id in game_ids)
+        assert first["Ana"] != second["Ana"]
+        assert first["Ana"] == first_again["Ana"]
+
+
+def test_imports_link_people_within_the_host(app):
+    def record(event, host):
+        return {"event": event, "host": host, "start_at": "2026-01-10T09:00", "duration_seconds": 600,
+                "team_a": ["Ana", "Budi"], "team_b": ["Citra", "Dewi"], "score_a": 21, "score_b": 15}
+
+    with app.app_context():
+        summary = MatchImporter().run(enumerate([
+            record("club", "first@example.com"),
+            record("open", "second@example.com"),
+            record("club-2", "FIRST@example.com"),
+        ], start=1))
+        db.session.commit()
+
+        club, open_, club_2 = (summary["events_created"][key] for key in ("club", "open", "club-2"))
+        assert people_of(club)["Ana"] != people_of(open_)["Ana"]
+        assert people_of(club)["Ana"] == people_of(club_2)["Ana"]
+        assert GameInfo.query.count() == 3
@@ -0,0 +1,45 @@
+from collections import Counter
+
+import pytest
+
+from logic.schedule import build_schedule
+
+
+@pytest.mark.parametrize("players, courts", [
+    (8, 2), (9, 2), (10, 2), (12, 3), (13, 3), (16, 3), (16, 4), (18, 4), (24, 5), (24, 6),
+])
+def test_americano_rounds_fill_every_court(players, courts):
+    rounds = build_schedule(players, courts, "americano")
+
+    in_play = min(courts, players // 4)
+    assert [len(games) for games in rounds[:-1]] == [in_play] * (len(rounds) - 1)
+    for games in rounds:
+        seated = [player for game in games for team in game for player in team]
+        assert len(seated) == len(set(seated))
+
+    partners = Counter(tuple(sorted(team)) for games in rounds for game in games for team in game)
+    pairs = players * (players - 1) // 2
+    assert len(partners) == pairs  # everyone partners everyone
+    assert sum(partners.values()) == pairs + pairs % 2  # once, bar one replay for an odd count
+
+
+@pytest.mark.parametrize("players", [8, 12, 16, 24])
+def test_full_house_americano_is_a_whist_table(players):
+    rounds = build_schedule(players, players // 4, "americano")
+
+    opponents = Counter(
+        tuple(sorted((a, b))) for games in rounds for team_a, team_b in games for a in team_a for b in team_b
+    )
+    assert len(rounds) == players - 1
+    assert set(opponents.values()) == {2}
+
+
+@pytest.mark.parametrize("players, courts, team_size", [(12, 2, 2), (16, 3, 2), (9, 4, 1), (10, 3, 1)])
+def test_team_rounds_fill_every_court(players, courts, team_size):
+    rounds = build_schedule(players, courts, "fixed partner", team_size)
+
+    in_play = min(courts, players // (2 * team_size))
+    assert [len(games) for games in rounds[:-1]] == [in_play] * (len(rounds) - 1)
+    meetings = Counter(tuple(sorted(map(tuple, game))) for games in rounds for game in games)
+    teams = players // team_size
+    assert len(meetings) == teams * (teams - 1) // 2 and set(meetings.values()) == {1}
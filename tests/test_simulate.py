@@ -0,0 +1,40 @@
+import random
+
+from logic.loader import load_logic
+from logic.simulate import METRICS, simulate_events
+
+STREAK = METRICS.index("max_consecutive")
+
+
+def test_consecutive_limit_leaves_the_logic_module_alone():
+    module = load_logic("doubles", "Mexicano", 6, 1)
+    config = ("doubles", "Mexicano", 6, 1)
+
+    limited = simulate_events(config, 10, 30, max_consecutive=3, workers=1)
+    default = simulate_events(config, 10, 30, workers=1)
+
+    assert max(event[STREAK] for event in limited) == 3
+    assert max(event[STREAK] for event in default) == 2
+    assert module.MAX_CONSECUTIVE == 2
+
+
+def test_multi_court_events_are_drawn_a_round_at_a_time():
+    # 12 players on 3 courts: every round seats everyone, as /drawing does
+    results = simulate_events(("doubles", "Mexicano", 12, 3), 5, 30, workers=1)
+
+    for event in results:
+        assert event[METRICS.index("games_min")] == event[METRICS.index("games_max")] == 30 * 4 // 12
+        assert event[METRICS.index("max_rest_gap")] == 0
+
+
+def test_simulations_leave_the_global_random_state_alone():
+    def outcomes(results):  # everything but the timings
+        return [event[:METRICS.index("draws_per_sec")] for event in results]
+
+    random.seed(1234)
+    before = random.getstate()
+    first = simulate_events(("doubles", "Mexicano", 9, 2), 4, 20, seed=7, workers=1)
+    assert random.getstate() == before
+
+    second = simulate_events(("doubles", "Mexicano", 9, 2), 4, 20, seed=7, workers=1)
+    assert outcomes(first) == outcomes(second)
@@ -0,0 +1,13 @@
+import stresscheck
+
+
+def test_simultaneous_finalizations_lose_no_write(tmp_path):
+    # A file rather than :memory:, since WAL and busy_timeout only apply to a real database file
+    report = stresscheck.run(url=f"sqlite:///{tmp_path / 'stress.db'}", workers=16)
+
+    assert report["ok"], report
+    assert report["journal_mode"] == "wal"
+    assert report["errors"] == []
+    assert report["lost_standings"] == {} and report["lost_ratings"] == {}
+    assert report["side_results"] == report["expected_results"] == 32
+    assert report["rating_snapshots"] == report["expected_snapshots"] == 64
@@ -0,0 +1,15 @@
+import importlib
+import sys
+
+from flask import Flask
+
+
+def test_wsgi_module_exposes_an_app_for_servers(monkeypatch, tmp_path):
+    monkeypatch.setenv("MATCHMAKER_DATABASE_URL", f"sqlite:///{tmp_path / 'matchmaker.db'}")
+    monkeypatch.setenv("MATCHMAKER_JINJA_CACHE_DIR", "")
+    monkeypatch.delitem(sys.modules, "wsgi", raising=False)
+
+    wsgi = importlib.import_module("wsgi")
+
+    assert isinstance(wsgi.app, Flask)
+    assert "main.drawing" in wsgi.app.view_functions
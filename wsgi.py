@@ -0,0 +1,12 @@
+"""WSGI entry point: the app built once from the MATCHMAKER_* environment.
+
+    gunicorn wsgi:app --workers 4 --threads 8
+    flask run                      # finds wsgi.py before app.py
+    flask db upgrade
+
+app.py only defines the factory, so importing it (tests, asgi.py, the
+bench scripts) never builds an app as a side effect.
+"""
+from app import create_app
+
+app = create_app()